@@ -0,0 +1,25 @@
+from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+
+class ApiConfig(AppConfig):
+    """Конфигурация приложения API"""
+
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "api"
+
+    def ready(self):
+        # Подключение обработчиков сигналов моделей
+        from . import signals  # noqa: F401
+        from .search import ensure_index_after_migrate
+
+        # Миграции, пересоздающие api_room на SQLite, удаляют триггеры поиска
+        post_migrate.connect(ensure_index_after_migrate, sender=self)
+
+        if settings.API_METRICS:
+            from .metrics import instrument_new_connection
+
+            # Учёт SQL-запросов на каждом новом соединении с БД
+            connection_created.connect(instrument_new_connection)
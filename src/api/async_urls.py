@@ -0,0 +1,23 @@
+from django.urls import path
+
+from . import async_views
+
+app_name = "api"
+
+# Те же URL и имена, что в urls.py, но с асинхронными представлениями
+urlpatterns = [
+    # Room endpoints
+    path("rooms/create", async_views.room_create, name="room_create"),
+    path("rooms/delete", async_views.room_delete, name="room_delete"),
+    path("rooms/list", async_views.room_list, name="room_list"),
+    path("rooms/available", async_views.room_available, name="room_available"),
+    path("rooms/search", async_views.room_search, name="room_search"),
+    # Booking endpoints
+    path("bookings/create", async_views.booking_create, name="booking_create"),
+    path("bookings/bulk_create", async_views.booking_bulk_create, name="booking_bulk_create"),
+    path("bookings/delete", async_views.booking_delete, name="booking_delete"),
+    path("bookings/list", async_views.booking_list, name="booking_list"),
+    path("bookings/status", async_views.booking_status, name="booking_status"),
+    # Reports
+    path("occupancy", async_views.occupancy, name="occupancy"),
+]
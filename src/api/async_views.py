@@ -0,0 +1,372 @@
+"""
+Асинхронные представления API для запуска под ASGI (uvicorn, daphne).
+
+URL и формат ответов совпадают с синхронными представлениями из views.py.
+Чтение идёт через асинхронный интерфейс ORM (aget, aexists, aiterator). В
+Django он сам выполняет запросы в пуле потоков через sync_to_async: каждый
+такой вызов - один переход в поток, зато event loop не блокируется.
+Транзакционная запись брони (bookings.create_booking) выполняется в одном
+sync_to_async-вызове: асинхронных транзакций в Django нет.
+
+Включаются переменной окружения API_ASYNC_VIEWS=true.
+"""
+
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from . import calendars, ingest
+from .bookings import RoomAlreadyBookedError, RoomNotFoundError, create_booking, room_bookings
+from .bulk import bulk_create_bookings
+from .cache import (
+    ROOMS_SCOPE,
+    acached_json_response,
+    bump_version,
+    room_bookings_scope,
+)
+from .calendars import afree_room_rows, afree_room_rows_on, available_rooms
+from .metrics import timed_serialization
+from .models import Booking, Room
+from .occupancy import occupancy_report
+from .pagination import InvalidCursorError, KeysetPagination
+from .representations import (
+    BOOKING_COLUMNS,
+    ROOM_COLUMNS,
+    booking_to_dict,
+    encode,
+    json_response,
+    room_to_dict,
+)
+from .room_cache import room_cache
+from .rooms import delete_room, start_room_delete
+from .search import search_rooms
+from .serializers import (
+    BookingInputSerializer,
+    BookingListQuerySerializer,
+    OccupancyQuerySerializer,
+    RoomAvailabilityQuerySerializer,
+    RoomCreateSerializer,
+    RoomListQuerySerializer,
+    RoomSearchQuerySerializer,
+)
+from .streaming import astream_response, is_stream_requested
+from .views import filter_rooms, get_room_ordering, is_flag_set
+
+abump_version = sync_to_async(bump_version)
+
+
+def _response(data, status=200):
+    return json_response(encode(data).encode(), status=status)
+
+
+def _error(message, status=400):
+    return _response({"error": message}, status=status)
+
+
+class _ParseError(ValueError):
+    """Некорректное тело запроса"""
+
+
+def _request_data(request):
+    """Тело запроса: JSON или данные формы (как парсеры DRF в настройках)"""
+    if request.content_type == "application/json":
+        try:
+            return json.loads(request.body or b"{}")
+        except ValueError as exc:
+            raise _ParseError(f"JSON parse error - {exc}") from exc
+    return request.POST
+
+
+def _not_found(model):
+    # Формат ответа DRF для get_object_or_404
+    return _response(
+        {"detail": f"No {model._meta.object_name} matches the given query."}, status=404
+    )
+
+
+def _parses_body(view):
+    """Ответ 400 в формате DRF при некорректном JSON"""
+
+    @wraps(view)
+    async def wrapper(request):
+        try:
+            return await view(request, _request_data(request))
+        except _ParseError as exc:
+            return _response({"detail": str(exc)}, status=400)
+
+    return wrapper
+
+
+async def _render_rows(queryset, to_dict):
+    with timed_serialization():
+        return encode([to_dict(row) async for row in queryset]).encode()
+
+
+async def _render_page(paginator, queryset, request, to_dict):
+    page = await paginator.apaginate_queryset(queryset, request)
+    return encode(paginator.get_paginated_data([to_dict(row) for row in page])).encode()
+
+
+@csrf_exempt
+@require_POST
+@_parses_body
+async def room_create(request, data):
+    """Создание комнаты"""
+    serializer = RoomCreateSerializer(data=data)
+    if not serializer.is_valid():
+        return _error(str(serializer.errors))
+
+    data = dict(serializer.validated_data)
+    data.pop("text", None)
+    room = await Room.objects.acreate(**data)
+    await abump_version(ROOMS_SCOPE)
+    room_cache.invalidate(room.id)
+    return _response({"room_id": room.id})
+
+
+@csrf_exempt
+@require_POST
+@_parses_body
+async def room_delete(request, data):
+    """Удаление комнаты"""
+    room_id = data.get("room_id")
+    if not room_id:
+        return _error("room_id is required")
+
+    try:
+        room_id = int(room_id)
+        if is_flag_set(data.get("background")):
+            await sync_to_async(start_room_delete)(room_id)
+            return _response({"ok": True, "background": True}, status=202)
+        await sync_to_async(delete_room)(room_id)
+    except (RoomNotFoundError, ValueError):
+        return _not_found(Room)
+    return _response({"ok": True})
+
+
+@require_GET
+async def room_list(request):
+    """Список комнат с сортировкой и фильтрами по цене и дате создания"""
+    query = RoomListQuerySerializer(data=request.GET)
+    if not query.is_valid():
+        return _error(str(query.errors))
+
+    filters = query.validated_data
+    ordering = get_room_ordering(request.GET)
+    rooms = filter_rooms(Room.objects.all(), filters).order_by(ordering)
+
+    if is_stream_requested(request):
+        return astream_response(request, rooms, ROOM_COLUMNS, room_to_dict)
+
+    rows = rooms.values_list(*ROOM_COLUMNS)
+    paginator = KeysetPagination(ordering, columns=ROOM_COLUMNS)
+    paginate = paginator.is_requested(request)
+
+    async def abuild():
+        if not paginate:
+            return await _render_rows(rows, room_to_dict)
+        return await _render_page(paginator, rows, request, room_to_dict)
+
+    try:
+        key_parts = ("list", ordering, sorted(filters.items()))
+        if paginate:
+            key_parts += (paginator.get_page_size(request), request.GET.get("cursor"))
+        return await acached_json_response(request, ROOMS_SCOPE, key_parts, abuild)
+    except InvalidCursorError as exc:
+        return _error(str(exc))
+
+
+@require_GET
+async def room_search(request):
+    """Полнотекстовый поиск комнат по описанию"""
+    query = RoomSearchQuerySerializer(data=request.GET)
+    if not query.is_valid():
+        return _error(str(query.errors))
+
+    params = query.validated_data
+    limit = params.get("limit", settings.API_PAGINATION["DEFAULT_PAGE_SIZE"])
+    ordering = get_room_ordering(request.GET) if "sort_by" in request.GET else None
+    # Выбор способа поиска при первом вызове читает схему БД (синхронно)
+    rooms = await sync_to_async(search_rooms)(
+        params["q"], params.get("min_price"), params.get("max_price"), ordering
+    )
+
+    async def abuild():
+        return await _render_rows(rooms.values_list(*ROOM_COLUMNS)[:limit], room_to_dict)
+
+    key_parts = (
+        "search",
+        params["q"],
+        params.get("min_price"),
+        params.get("max_price"),
+        ordering,
+        limit,
+    )
+    return await acached_json_response(request, ROOMS_SCOPE, key_parts, abuild)
+
+
+@require_GET
+async def room_available(request):
+    """Список комнат, свободных на заданные даты"""
+    query = RoomAvailabilityQuerySerializer(data=request.GET)
+    if not query.is_valid():
+        return _error(str(query.errors))
+
+    dates = query.validated_data.get("dates")
+    max_price = query.validated_data.get("max_price")
+    ordering = get_room_ordering(request.GET)
+
+    if dates:
+        rooms = available_rooms(dates[0], dates[-1], max_price).order_by(ordering)
+        rows = await afree_room_rows_on(rooms, dates)
+    else:
+        date_start = query.validated_data["date_start"]
+        date_end = query.validated_data["date_end"]
+        rooms = available_rooms(date_start, date_end, max_price).order_by(ordering)
+        rows = await afree_room_rows(rooms, date_start, date_end)
+    with timed_serialization():
+        return json_response(encode([room_to_dict(row) for row in rows]).encode())
+
+
+@csrf_exempt
+@require_POST
+@_parses_body
+async def booking_create(request, data):
+    """Создание бронирования"""
+    room_id = data.get("room_id")
+    date_start = data.get("date_start")
+    date_end = data.get("date_end")
+
+    if not room_id or not date_start or not date_end:
+        return _error("room_id, date_start and date_end are required")
+
+    serializer = BookingInputSerializer(
+        data={"room_id": room_id, "date_start": date_start, "date_end": date_end}
+    )
+    if not serializer.is_valid():
+        return _error(str(serializer.errors))
+
+    data = serializer.validated_data
+    try:
+        if settings.API_BOOKING_QUEUE and calendars.covers(data["date_start"], data["date_end"]):
+            # Период резервируется в памяти, запись в БД - фоновым потоком
+            token = await sync_to_async(ingest.booking_queue.submit)(**data)
+            return _response({"token": token, "status": ingest.PENDING}, status=202)
+        # Блокировка комнаты, проверка пересечений и вставка - одна транзакция
+        booking = await sync_to_async(create_booking)(**data)
+    except RoomNotFoundError:
+        return _error("room not found", status=404)
+    except RoomAlreadyBookedError:
+        return _error("room is already booked on given dates")
+    return _response({"booking_id": booking.id})
+
+
+@require_GET
+async def booking_status(request):
+    """Статус брони, принятой в очередь отложенной записи"""
+    token = request.GET.get("token")
+    if not token:
+        return _error("token is required")
+
+    booking_status = ingest.booking_queue.status(token)
+    if booking_status is None:
+        return _error("token not found", status=404)
+    return _response({"token": token, **booking_status})
+
+
+@csrf_exempt
+@require_POST
+@_parses_body
+async def booking_bulk_create(request, items):
+    """Пакетное создание бронирований"""
+    if not isinstance(items, list) or not items:
+        return _error("a non-empty JSON array of bookings is required")
+
+    max_items = settings.API_BULK_CREATE_MAX_ITEMS
+    if len(items) > max_items:
+        return _error(f"at most {max_items} bookings per request")
+
+    return _response(await sync_to_async(bulk_create_bookings)(items))
+
+
+@csrf_exempt
+@require_POST
+@_parses_body
+async def booking_delete(request, data):
+    """Удаление бронирования"""
+    booking_id = data.get("booking_id")
+    if not booking_id:
+        return _error("booking_id is required")
+
+    try:
+        booking = await Booking.objects.aget(id=booking_id)
+    except (Booking.DoesNotExist, ValueError):
+        return _not_found(Booking)
+    await booking.adelete()
+    await abump_version(room_bookings_scope(booking.room_id))
+    return _response({"ok": True})
+
+
+@require_GET
+async def booking_list(request):
+    """Список бронирований для комнаты (все или пересекающиеся с окном from/to)"""
+    room_id = request.GET.get("room_id")
+    if not room_id:
+        return _error("room_id is required")
+
+    try:
+        room_id = int(room_id)
+    except ValueError:
+        return _error("room not found", status=404)
+
+    window = BookingListQuerySerializer.from_query_params(request.GET)
+    if not window.is_valid():
+        return _error(str(window.errors))
+    date_from = window.validated_data.get("date_from")
+    date_to = window.validated_data.get("date_to")
+    bookings = room_bookings(room_id, date_from, date_to)
+
+    if is_stream_requested(request):
+        if not await room_cache.aexists(room_id):
+            return _error("room not found", status=404)
+        return astream_response(request, bookings, BOOKING_COLUMNS, booking_to_dict)
+
+    rows = bookings.values_list(*BOOKING_COLUMNS)
+    paginator = KeysetPagination("date_start", columns=BOOKING_COLUMNS)
+    paginate = paginator.is_requested(request)
+
+    async def abuild():
+        if not await room_cache.aexists(room_id):
+            raise Room.DoesNotExist
+        if not paginate:
+            return await _render_rows(rows, booking_to_dict)
+        return await _render_page(paginator, rows, request, booking_to_dict)
+
+    try:
+        key_parts = ("list", date_from, date_to)
+        if paginate:
+            key_parts += (paginator.get_page_size(request), request.GET.get("cursor"))
+        return await acached_json_response(request, room_bookings_scope(room_id), key_parts, abuild)
+    except InvalidCursorError as exc:
+        return _error(str(exc))
+    except Room.DoesNotExist:
+        return _error("room not found", status=404)
+
+
+@require_GET
+async def occupancy(request):
+    """Занятость и выручка по дням из таблицы RoomNight"""
+    query = OccupancyQuerySerializer.from_query_params(request.GET)
+    if not query.is_valid():
+        return _error(str(query.errors))
+
+    report = await sync_to_async(occupancy_report)(
+        query.validated_data["date_from"],
+        query.validated_data["date_to"],
+        room_id=query.validated_data.get("room_id"),
+    )
+    return _response(report)
@@ -0,0 +1,99 @@
+"""
+Создание одной брони с фиксированным бюджетом запросов.
+
+Проверка и запись брони в одной транзакции:
+
+1. ``SELECT ... FOR UPDATE`` календаря комнаты (calendars.py) - проверка
+   существования комнаты, блокировка и проверка пересечений побитовым И
+   одним обращением к БД. Для дат вне календаря (calendars.covers) вместо календаря
+   используется подзапрос ``EXISTS`` по пересекающимся броням;
+2. ``INSERT`` брони без ``full_clean()``: даты уже проверены сериализатором,
+   комната - первым запросом;
+3. ``UPDATE`` календаря комнаты.
+
+Обработчик post_save добавляет вставку дней брони в таблицу занятости
+RoomNight (см. occupancy.py).
+
+Плюс начало и фиксация транзакции (на SQLite - BEGIN IMMEDIATE, который и
+сериализует запись вместо FOR UPDATE).
+
+room_bookings() - брони комнаты, пересекающиеся с окном дат (bookings/list).
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Subquery
+
+from . import calendars
+from .models import Booking, Room
+
+
+class RoomNotFoundError(LookupError):
+    """Комната не найдена"""
+
+
+class RoomAlreadyBookedError(ValueError):
+    """Комната уже забронирована на пересекающиеся даты"""
+
+
+def create_booking(room_id, date_start, date_end):
+    """Создание брони на проверенные даты, возвращает Booking"""
+    rooms = Room.objects.select_for_update().filter(pk=room_id)
+
+    with transaction.atomic():
+        if calendars.covers(date_start, date_end):
+            # Пересечения - побитовое И с календарём комнаты, без чтения броней
+            calendar = rooms.values_list("calendar", flat=True).first()
+            if calendar is None:
+                raise RoomNotFoundError(room_id)
+            is_busy = not calendars.is_free(calendar, date_start, date_end)
+        else:
+            calendar = None
+            overlapping = Booking.objects.filter(
+                room_id=OuterRef("pk"), date_start__lte=date_end, date_end__gte=date_start
+            )
+            is_busy = rooms.annotate(is_busy=Exists(overlapping))
+            is_busy = is_busy.values_list("is_busy", flat=True).first()
+            if is_busy is None:
+                raise RoomNotFoundError(room_id)
+        if is_busy:
+            raise RoomAlreadyBookedError(room_id)
+
+        booking = Booking(room_id=room_id, date_start=date_start, date_end=date_end)
+        # Календарь уже прочитан под блокировкой: сигнал post_save его не трогает
+        booking._calendar_synced = calendar is not None
+        try:
+            # Сигнал post_save обновляет версию кэша броней и таблицу занятости
+            booking.save(full_clean=False)
+        except IntegrityError as exc:
+            # Нарушение ограничения booking_no_overlap в PostgreSQL
+            raise RoomAlreadyBookedError(room_id) from exc
+
+        if calendar is not None:
+            calendar = calendars.with_range(calendar, date_start, date_end)
+            Room.objects.filter(pk=room_id).update(calendar=calendar)
+
+    return booking
+
+
+def room_bookings(room_id, date_from=None, date_to=None):
+    """
+    Брони комнаты, пересекающиеся с окном [date_from, date_to], по date_start.
+
+    Брони одной комнаты не пересекаются (это проверяется при каждой записи),
+    поэтому в порядке date_start они упорядочены и по date_end: пересекающиеся
+    с окном брони идут подряд, начиная с первой брони, заканчивающейся не
+    раньше date_from. Её date_start находится по индексу (room, date_end), а
+    сами брони читаются диапазоном индекса (room, date_start): число
+    прочитанных строк не зависит от длины истории комнаты.
+    """
+    bookings = Booking.objects.filter(room_id=room_id)
+    if date_from is not None:
+        first_start = (
+            Booking.objects.filter(room_id=room_id, date_end__gte=date_from)
+            .order_by("date_end")
+            .values("date_start")[:1]
+        )
+        bookings = bookings.filter(date_start__gte=Subquery(first_start), date_end__gte=date_from)
+    if date_to is not None:
+        bookings = bookings.filter(date_start__lte=date_to)
+    return bookings.order_by("date_start")
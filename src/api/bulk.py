@@ -0,0 +1,179 @@
+"""
+Пакетное создание бронирований.
+
+Вместо трёх запросов на каждую бронь (поиск комнаты, проверка пересечений,
+вставка) пакет обрабатывается за фиксированное число запросов: одна выборка
+комнат вместе с их календарями занятости (calendars.py), пакетная вставка
+броней, вставка их дней в таблицу занятости (RoomNight) и обновление
+календарей. Для дат вне календаря (calendars.covers) пересечения проверяются по
+существующим броням, выбранным одним запросом.
+
+Конфликты внутри пакета находятся сортировкой с проходом по интервалам
+(sort-and-sweep) в Python.
+"""
+
+from bisect import bisect_right
+from collections import defaultdict
+from itertools import accumulate
+
+from django.db import transaction
+
+from . import calendars
+from .cache import bump_version, room_bookings_scope
+from .ingest import booking_queue
+from .models import Booking, Room
+from .occupancy import add_bookings
+from .serializers import BookingInputSerializer
+
+ERROR_ROOM_NOT_FOUND = "room not found"
+ERROR_ROOM_ALREADY_BOOKED = "room is already booked on given dates"
+ERROR_BATCH_CONFLICT = "conflicts with another booking in the batch"
+
+
+class _ExistingIntervals:
+    """Существующие брони комнаты: начала по возрастанию и префиксный максимум концов"""
+
+    def __init__(self, rows):
+        rows = sorted(rows)
+        self.starts = [row[0] for row in rows]
+        self.max_ends = list(accumulate((row[1] for row in rows), max))
+
+    def overlaps(self, date_start, date_end):
+        i = bisect_right(self.starts, date_end) - 1
+        return i >= 0 and self.max_ends[i] >= date_start
+
+
+def _sweep(candidates):
+    """
+    Проход по заявкам одной комнаты, отсортированным по дате начала.
+
+    Заявка принимается, если начинается после окончания последней принятой;
+    при равных датах приоритет у заявки, стоящей в пакете раньше.
+    Возвращает индексы отклонённых заявок.
+    """
+    rejected = []
+    last_end = None
+    for date_start, index, date_end in sorted(candidates):
+        if last_end is not None and date_start <= last_end:
+            rejected.append(index)
+            continue
+        last_end = date_end
+    return rejected
+
+
+def bulk_create_bookings(items):
+    """
+    Создание пакета бронирований.
+
+    Возвращает результат для каждого элемента пакета в исходном порядке:
+    ``{"index": i, "booking_id": id}`` или ``{"index": i, "error": "..."}``.
+    """
+    results = [None] * len(items)
+    valid = []
+
+    for index, item in enumerate(items):
+        serializer = BookingInputSerializer(data=item)
+        if serializer.is_valid():
+            data = serializer.validated_data
+            valid.append((index, data["room_id"], data["date_start"], data["date_end"]))
+        else:
+            results[index] = {"index": index, "error": str(serializer.errors)}
+
+    if valid:
+        with transaction.atomic():
+            _create_valid(valid, results)
+
+    return results
+
+
+def _create_valid(valid, results):
+    room_ids = {room_id for _, room_id, _, _ in valid}
+    date_from = min(date_start for _, _, date_start, _ in valid)
+    date_to = max(date_end for _, _, _, date_end in valid)
+
+    # Блокировка всех комнат пакета одним запросом (на SQLite - BEGIN IMMEDIATE)
+    prices = {}
+    room_calendars = {}
+    rooms = Room.objects.select_for_update().filter(id__in=room_ids)
+    for room_id, price, calendar in rooms.values_list("id", "price", "calendar"):
+        prices[room_id] = price
+        room_calendars[room_id] = calendar
+    existing_rooms = prices.keys()
+
+    if calendars.covers(date_from, date_to):
+        # Пересечения с существующими бронями - по календарям комнат, без чтения броней
+        def is_busy(room_id, date_start, date_end):
+            return not calendars.is_free(room_calendars[room_id], date_start, date_end)
+
+    else:
+        # Все существующие брони, которые могут пересечься с пакетом, одним запросом
+        existing_rows = defaultdict(list)
+        rows = Booking.objects.filter(
+            room_id__in=existing_rooms, date_start__lte=date_to, date_end__gte=date_from
+        ).values_list("room_id", "date_start", "date_end")
+        for room_id, date_start, date_end in rows:
+            existing_rows[room_id].append((date_start, date_end))
+        existing = {room_id: _ExistingIntervals(rows) for room_id, rows in existing_rows.items()}
+
+        def is_busy(room_id, date_start, date_end):
+            return room_id in existing and existing[room_id].overlaps(date_start, date_end)
+
+    candidates = defaultdict(list)
+    for index, room_id, date_start, date_end in valid:
+        if room_id not in existing_rooms:
+            results[index] = {"index": index, "error": ERROR_ROOM_NOT_FOUND}
+        elif is_busy(room_id, date_start, date_end):
+            results[index] = {"index": index, "error": ERROR_ROOM_ALREADY_BOOKED}
+        else:
+            candidates[room_id].append((date_start, index, date_end))
+
+    for room_candidates in candidates.values():
+        for index in _sweep(room_candidates):
+            results[index] = {"index": index, "error": ERROR_BATCH_CONFLICT}
+
+    accepted = [
+        (index, room_id, date_start, date_end)
+        for index, room_id, date_start, date_end in valid
+        if results[index] is None
+    ]
+    if not accepted:
+        return
+
+    # bulk_create не вызывает Booking.save()/full_clean(): всё уже проверено выше
+    bookings = Booking.objects.bulk_create(
+        [
+            Booking(room_id=room_id, date_start=date_start, date_end=date_end)
+            for _, room_id, date_start, date_end in accepted
+        ]
+    )
+    for (index, _, _, _), booking in zip(accepted, bookings, strict=True):
+        results[index] = {"index": index, "booking_id": booking.id}
+    add_bookings(bookings, prices)
+
+    # Календари комнат пакета одним запросом
+    bits = {}
+    for _, room_id, date_start, date_end in accepted:
+        bits[room_id] = bits.get(room_id, 0) | calendars.range_mask(date_start, date_end)
+    Room.objects.bulk_update(
+        [
+            Room(
+                pk=room_id,
+                calendar=calendars.to_bytes(calendars.to_int(room_calendars[room_id]) | value),
+            )
+            for room_id, value in bits.items()
+        ],
+        ["calendar"],
+    )
+
+    # bulk_create не отправляет сигналы post_save: таблица занятости и календари
+    # обновлены выше, остальные производные данные сбрасываем явно
+    touched = {room_id for _, room_id, _, _ in accepted}
+
+    def invalidate():
+        for room_id in touched:
+            booking_queue.reservations.invalidate(room_id)
+
+    invalidate()
+    transaction.on_commit(invalidate)
+    for room_id in touched:
+        bump_version(room_bookings_scope(room_id))
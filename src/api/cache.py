@@ -0,0 +1,136 @@
+"""
+Кэш ответов API с версионированием.
+
+Для каждой области данных (таблица комнат, брони отдельной комнаты) в кэше
+хранится версия - момент последнего изменения в наносекундах. Версия входит
+в ключ закэшированного ответа, поэтому инвалидация сводится к смене версии:
+старые записи просто перестают читаться и вытесняются по таймауту. Версия
+также служит основой для заголовков ETag и Last-Modified.
+
+Для нескольких воркеров нужен общий бэкенд кэша (file, redis, memcached):
+с locmem каждый процесс видит только собственные изменения, и после записи
+в одном воркере остальные отдают устаревшие ответы до API_CACHE_TIMEOUT.
+locmem безопасен только с одним воркером.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .metrics import timed_serialization
+from .representations import json_response
+
+# Область данных таблицы комнат (rooms/list)
+ROOMS_SCOPE = "rooms"
+
+
+def room_bookings_scope(room_id):
+    """Область данных броней одной комнаты (bookings/list)"""
+    return f"bookings:room:{room_id}"
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def _version_key(scope):
+    return f"api:version:{scope}"
+
+
+def get_version(scope):
+    """Текущая версия области данных (создаётся при первом обращении)"""
+    cache = get_cache()
+    version = cache.get(_version_key(scope))
+    if version is None:
+        cache.add(_version_key(scope), time.time_ns(), timeout=None)
+        # Бэкенд может не сохранить значение (DummyCache, вытеснение)
+        version = cache.get(_version_key(scope)) or time.time_ns()
+    return version
+
+
+def _bump(scope):
+    get_cache().set(_version_key(scope), time.time_ns(), timeout=None)
+
+
+def bump_version(scope):
+    """
+    Смена версии области данных.
+
+    Версия меняется сразу и повторно после фиксации транзакции: иначе
+    конкурентный запрос мог бы закэшировать незафиксированный снимок под
+    новой версией.
+    """
+    _bump(scope)
+    transaction.on_commit(lambda: _bump(scope))
+
+
+def _validators(scope, version, key_parts):
+    digest = hashlib.blake2b(repr(key_parts).encode(), digest_size=8).hexdigest()
+    etag = f'"{version:x}-{digest}"'
+    # Точность Last-Modified - секунда: пока секунда версии не прошла, в ней
+    # возможна ещё одна запись, и If-Modified-Since дал бы устаревший 304
+    last_modified = version // 1_000_000_000
+    if last_modified >= time.time_ns() // 1_000_000_000:
+        last_modified = None
+    return f"api:response:{scope}:{version}:{digest}", etag, last_modified
+
+
+def _with_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def cached_json_response(request, scope, key_parts, build):
+    """
+    Ответ из кэша с поддержкой условных GET-запросов.
+
+    ``build()`` возвращает тело ответа в байтах и вызывается только
+    при промахе кэша.
+    """
+    key, etag, last_modified = _validators(scope, get_version(scope), key_parts)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        cache = get_cache()
+        content = cache.get(key)
+        if content is None:
+            with timed_serialization():
+                content = build()
+            cache.set(key, content, timeout=settings.API_CACHE_TIMEOUT)
+        response = json_response(content)
+
+    return _with_validators(response, etag, last_modified)
+
+
+async def aget_version(scope):
+    """Асинхронный вариант get_version"""
+    cache = get_cache()
+    version = await cache.aget(_version_key(scope))
+    if version is None:
+        await cache.aadd(_version_key(scope), time.time_ns(), timeout=None)
+        version = await cache.aget(_version_key(scope)) or time.time_ns()
+    return version
+
+
+async def acached_json_response(request, scope, key_parts, abuild):
+    """Асинхронный вариант cached_json_response, ``abuild`` - корутина"""
+    key, etag, last_modified = _validators(scope, await aget_version(scope), key_parts)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        cache = get_cache()
+        content = await cache.aget(key)
+        if content is None:
+            with timed_serialization():
+                content = await abuild()
+            await cache.aset(key, content, timeout=settings.API_CACHE_TIMEOUT)
+        response = json_response(content)
+
+    return _with_validators(response, etag, last_modified)
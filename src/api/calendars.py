@@ -0,0 +1,266 @@
+"""
+Календарь занятости комнаты в виде битовой маски.
+
+Бит i поля ``Room.calendar`` означает, что комната занята в день
+``EPOCH + i`` (байты в порядке little-endian, хвостовые нулевые байты не
+хранятся). Дни брони учитываются включительно, как и при проверке
+пересечений, поэтому пересечение брони с календарём - ненулевое побитовое И.
+
+Календарь обновляется в той же транзакции, что и бронь, под блокировкой
+строки комнаты. В календаре представлены только дни от EPOCH до LAST_DAY
+(размер поля ограничен: не больше 1.4 КБ): для периодов, начинающихся до
+EPOCH или заканчивающихся после LAST_DAY, вызывающий код проверяет брони в
+SQL (см. covers()). Дни таких броней внутри календаря в нём отмечаются,
+поэтому проверка по календарю остальных периодов остаётся точной.
+
+Проверка многих комнат векторизуется через NumPy, если он установлен
+(``poetry install -E numpy``), иначе выполняется на целых числах Python.
+NumPy импортируется при первой такой проверке (или в warmup при запуске).
+"""
+
+from contextvars import ContextVar
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from .models import Booking, Room
+from .representations import ROOM_COLUMNS
+
+# NumPy импортируется при первой векторной проверке, а не при запуске процесса
+# (импорт занимает около 0.1 с); None - не установлен
+_NOT_LOADED = object()
+np = _NOT_LOADED
+
+# Первый и последний день календаря; смена требует перестроения (rebuild_calendars)
+EPOCH = date(2020, 1, 1)
+LAST_DAY = date(2049, 12, 31)
+_LAST_BIT = (LAST_DAY - EPOCH).days
+
+# С какого числа комнат проверка выполняется через NumPy
+NUMPY_MIN_ROOMS = 64
+
+# Комнаты, удаляемые в текущем контексте: их брони удаляются каскадом,
+# и обновлять календарь перед удалением самой комнаты не нужно
+_deleting_rooms = ContextVar("api_deleting_rooms", default=frozenset())
+
+
+def load_numpy():
+    """Модуль NumPy или None, если он не установлен"""
+    global np
+    if np is _NOT_LOADED:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover - NumPy необязателен
+            numpy = None
+        np = numpy
+    return np
+
+
+def covers(date_start, date_end):
+    """Представлен ли период целиком в календаре"""
+    return date_start >= EPOCH and date_end <= LAST_DAY
+
+
+def _bit_range(date_start, date_end):
+    """Номера первого и последнего бита периода (обрезается по EPOCH и LAST_DAY)"""
+    return max((date_start - EPOCH).days, 0), min((date_end - EPOCH).days, _LAST_BIT)
+
+
+def range_mask(date_start, date_end):
+    """Маска дней [date_start, date_end] в виде целого числа"""
+    first, last = _bit_range(date_start, date_end)
+    if last < first:
+        return 0
+    return ((1 << (last - first + 1)) - 1) << first
+
+
+def dates_mask(dates):
+    """Маска произвольного набора дат (даты вне календаря пропускаются)"""
+    mask = 0
+    for day in dates:
+        if EPOCH <= day <= LAST_DAY:
+            mask |= 1 << (day - EPOCH).days
+    return mask
+
+
+def to_int(calendar):
+    return int.from_bytes(bytes(calendar or b""), "little")
+
+
+def to_bytes(bits):
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+
+def is_free(calendar, date_start, date_end):
+    """Свободна ли комната во все дни периода (период должен удовлетворять covers())"""
+    first, last = _bit_range(date_start, date_end)
+    # Читаются только байты периода, а не весь календарь
+    window = bytes(calendar[first // 8 : last // 8 + 1])
+    bits = int.from_bytes(window, "little") >> (first % 8)
+    return bits & ((1 << (last - first + 1)) - 1) == 0
+
+
+def _byte_range(mask):
+    """Срез байтов календаря, в которые попадает непустая маска"""
+    return ((mask & -mask).bit_length() - 1) // 8, (mask.bit_length() + 7) // 8
+
+
+def is_free_on(calendar, mask):
+    """Свободна ли комната во все дни маски (dates_mask, range_mask)"""
+    if not mask:
+        return True
+    start, stop = _byte_range(mask)
+    window = bytes(calendar[start:stop])
+    return int.from_bytes(window, "little") & (mask >> (start * 8)) == 0
+
+
+def free_flags(calendars, date_start, date_end):
+    """Свободна ли каждая из комнат в период: список bool в порядке calendars"""
+    if len(calendars) < NUMPY_MIN_ROOMS or load_numpy() is None:
+        return [is_free(calendar, date_start, date_end) for calendar in calendars]
+    return _free_flags_numpy(calendars, range_mask(date_start, date_end))
+
+
+def free_flags_on(calendars, mask):
+    """Свободна ли каждая из комнат во все дни маски: список bool в порядке calendars"""
+    if len(calendars) < NUMPY_MIN_ROOMS or load_numpy() is None:
+        return [is_free_on(calendar, mask) for calendar in calendars]
+    return _free_flags_numpy(calendars, mask)
+
+
+def _free_flags_numpy(calendars, mask):
+    if not mask:
+        return [True] * len(calendars)
+    start, stop = _byte_range(mask)
+    width = stop - start
+    # Окна календарей одинаковой ширины: матрица комнаты x байты маски
+    windows = b"".join(bytes(calendar[start:stop]).ljust(width, b"\0") for calendar in calendars)
+    matrix = np.frombuffer(windows, dtype=np.uint8).reshape(len(calendars), width)
+    mask = np.frombuffer(to_bytes(mask >> (start * 8)), np.uint8)
+    mask = np.pad(mask, (0, width - len(mask)))
+    return (~np.any(matrix & mask, axis=1)).tolist()
+
+
+def available_rooms(date_start, date_end, max_price=None):
+    """
+    Комнаты-кандидаты для поиска свободных на период.
+
+    Для периода внутри календаря занятость проверяет free_room_rows(), иначе
+    сюда добавляется анти-соединение NOT EXISTS по броням.
+    """
+    rooms = Room.objects.all()
+    if max_price is not None:
+        rooms = rooms.filter(price__lte=max_price)
+    if not covers(date_start, date_end):
+        overlapping = Booking.objects.filter(
+            room=OuterRef("pk"), date_start__lte=date_end, date_end__gte=date_start
+        )
+        rooms = rooms.filter(~Exists(overlapping))
+    return rooms
+
+
+def free_room_rows(rooms, date_start, date_end, columns=ROOM_COLUMNS):
+    """Строки values_list(columns) свободных комнат из available_rooms() (один запрос)"""
+    if not covers(date_start, date_end):
+        return rooms.values_list(*columns)
+    return _filter_free(list(rooms.values_list(*columns, "calendar")), date_start, date_end)
+
+
+async def afree_room_rows(rooms, date_start, date_end, columns=ROOM_COLUMNS):
+    """Асинхронный вариант free_room_rows, возвращает список"""
+    if not covers(date_start, date_end):
+        return [row async for row in rooms.values_list(*columns)]
+    rows = [row async for row in rooms.values_list(*columns, "calendar")]
+    return _filter_free(rows, date_start, date_end)
+
+
+def free_room_rows_on(rooms, dates, columns=ROOM_COLUMNS):
+    """
+    Строки values_list(columns) комнат, свободных во все даты dates (один запрос).
+
+    Даты должны быть внутри календаря; rooms - например available_rooms(min(dates),
+    max(dates)).
+    """
+    rows = list(rooms.values_list(*columns, "calendar"))
+    return _filter_free_on(rows, dates_mask(dates))
+
+
+async def afree_room_rows_on(rooms, dates, columns=ROOM_COLUMNS):
+    """Асинхронный вариант free_room_rows_on"""
+    rows = [row async for row in rooms.values_list(*columns, "calendar")]
+    return _filter_free_on(rows, dates_mask(dates))
+
+
+def _filter_free(rows, date_start, date_end):
+    flags = free_flags([row[-1] for row in rows], date_start, date_end)
+    return [row[:-1] for row, free in zip(rows, flags, strict=True) if free]
+
+
+def _filter_free_on(rows, mask):
+    flags = free_flags_on([row[-1] for row in rows], mask)
+    return [row[:-1] for row, free in zip(rows, flags, strict=True) if free]
+
+
+def with_range(calendar, date_start, date_end):
+    """Календарь с занятыми днями периода"""
+    return to_bytes(to_int(calendar) | range_mask(date_start, date_end))
+
+
+def without_range(calendar, date_start, date_end):
+    """Календарь с освобождёнными днями периода"""
+    return to_bytes(to_int(calendar) & ~range_mask(date_start, date_end))
+
+
+def _update(room_id, change, date_start, date_end):
+    with transaction.atomic():
+        calendar = (
+            Room.objects.select_for_update()
+            .filter(pk=room_id)
+            .values_list("calendar", flat=True)
+            .first()
+        )
+        if calendar is not None:
+            calendar = change(calendar, date_start, date_end)
+            Room.objects.filter(pk=room_id).update(calendar=calendar)
+
+
+def mark(room_id, date_start, date_end):
+    """Отметка дней брони в календаре комнаты"""
+    _update(room_id, with_range, date_start, date_end)
+
+
+def unmark(room_id, date_start, date_end):
+    """Освобождение дней брони в календаре комнаты"""
+    if room_id in _deleting_rooms.get():
+        return
+    _update(room_id, without_range, date_start, date_end)
+
+
+def begin_room_delete(room_id):
+    _deleting_rooms.set(_deleting_rooms.get() | {room_id})
+
+
+def end_room_delete(room_id):
+    _deleting_rooms.set(_deleting_rooms.get() - {room_id})
+
+
+def rebuild(room_ids=None):
+    """Перестроение календарей по броням, возвращает число комнат"""
+    rooms = Room.objects.order_by("pk")
+    bookings = Booking.objects.filter(date_end__gte=EPOCH, date_start__lte=LAST_DAY).order_by()
+    if room_ids is not None:
+        rooms = rooms.filter(pk__in=room_ids)
+        bookings = bookings.filter(room_id__in=room_ids)
+
+    with transaction.atomic():
+        bits = dict.fromkeys(rooms.select_for_update().values_list("pk", flat=True), 0)
+        rows = bookings.values_list("room_id", "date_start", "date_end").iterator(chunk_size=5000)
+        for room_id, date_start, date_end in rows:
+            bits[room_id] |= range_mask(date_start, date_end)
+        Room.objects.bulk_update(
+            [Room(pk=room_id, calendar=to_bytes(value)) for room_id, value in bits.items()],
+            ["calendar"],
+            batch_size=1000,
+        )
+    return len(bits)
@@ -0,0 +1,514 @@
+"""
+Очередь отложенной записи броней (write-behind) для пиковых нагрузок.
+
+При API_BOOKING_QUEUE=true запрос POST /api/bookings/create только проверяет
+данные, резервирует период в памяти процесса (календарь комнаты из БД плюс
+уже принятые брони, см. Reservations) и сразу возвращает токен. Фоновый
+поток забирает принятые брони пачками и записывает их через
+bulk_create_bookings, которая ещё раз проверяет пересечения под блокировкой
+комнат: бронь, конфликтующая с записью другого процесса, получает статус
+rejected. Статус токена отдаёт GET /api/bookings/status.
+
+Каждая принятая бронь до ответа клиенту дописывается в журнал (JSONL,
+API_BOOKING_QUEUE_SPOOL) с fsync; после записи пачки в БД в журнал
+добавляется отметка о её обработке. При запуске очередь повторяет
+необработанные записи журнала, так что падение процесса ничего не теряет.
+Если процесс упал между фиксацией пачки и отметкой, брони с итоговым
+статусом в кэше не повторяются, а остальные повторные записи отклоняются
+проверкой пересечений: двойных броней не возникает.
+
+Статусы токенов записываются в кэш API_CACHE_ALIAS (на
+API_BOOKING_QUEUE_STATUS_TTL) и в память процесса. С общим бэкендом кэша
+(file, redis, memcached) статус отдаёт любой воркер, в том числе после
+перезапуска принявшего бронь; с locmem - только принявший процесс.
+
+Журнал принадлежит одному процессу: он блокируется (flock на файле
+``<журнал>.lock``) на всё время работы очереди. Воркеры с одним
+API_BOOKING_QUEUE_SPOOL занимают свободные слоты ``booking_queue.jsonl``,
+``booking_queue.1.jsonl``, ... (см. spool_slots), так что перезапущенный
+воркер подхватывает журнал упавшего. Периоды вне календаря (раньше
+calendars.EPOCH или позже calendars.LAST_DAY) создаются синхронно.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, connection
+
+from . import calendars
+from .bookings import RoomAlreadyBookedError, RoomNotFoundError
+from .cache import get_cache
+from .models import Room
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: журнал не блокируется
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+CREATED = "created"
+REJECTED = "rejected"
+
+# Сколько статусов токенов хранится в памяти (старые вытесняются)
+MAX_STATUSES = 100_000
+
+
+# Пауза перед повтором пачки после ошибки соединения с БД, секунд (удваивается
+# с каждой попыткой до MAX_RETRY_DELAY)
+RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 30.0
+
+# Ошибка брони из пачки, которую не удалось записать не из-за соединения с БД
+WRITE_FAILED = "booking could not be written"
+
+# Сколько журналов (воркеров) может быть у одного API_BOOKING_QUEUE_SPOOL
+MAX_SPOOL_SLOTS = 64
+
+
+def _status_key(token):
+    """Ключ статуса токена в кэше API_CACHE_ALIAS"""
+    return f"api:booking_status:{token}"
+
+
+class SpoolLockedError(RuntimeError):
+    """Журнал очереди уже открыт другой очередью"""
+
+
+def spool_slots(path):
+    """Пути журналов воркеров для API_BOOKING_QUEUE_SPOOL: path, затем path с номером"""
+    root, ext = os.path.splitext(path)
+    yield path
+    for slot in range(1, MAX_SPOOL_SLOTS):
+        yield f"{root}.{slot}{ext}"
+
+
+class _RoomState:
+    __slots__ = ("busy", "pending", "loaded_at")
+
+    def __init__(self, busy, pending):
+        self.busy = busy
+        self.pending = pending
+        self.loaded_at = time.monotonic()
+
+
+class Reservations:
+    """
+    Занятость комнат для приёма броней без записи в БД.
+
+    Для каждой комнаты - битовая маска занятых дней: календарь из БД на
+    момент загрузки, объединённый с масками принятых, но ещё не записанных
+    броней. Календарь перечитывается через API_BOOKING_QUEUE_TTL секунд,
+    чтобы учесть записи других процессов.
+    """
+
+    def __init__(self, ttl=None):
+        self._rooms = {}
+        self._lock = threading.Lock()
+        self._ttl = ttl
+
+    @property
+    def ttl(self):
+        if self._ttl is not None:
+            return self._ttl
+        return getattr(settings, "API_BOOKING_QUEUE_TTL", 30)
+
+    def _state(self, room_id):
+        with self._lock:
+            state = self._rooms.get(room_id)
+            if state is not None and time.monotonic() - state.loaded_at <= self.ttl:
+                return state
+
+        calendar = Room.objects.filter(pk=room_id).values_list("calendar", flat=True).first()
+        if calendar is None:
+            raise RoomNotFoundError(room_id)
+
+        with self._lock:
+            # Принятые брони переносятся в новый снимок: в календаре их ещё нет
+            current = self._rooms.get(room_id)
+            pending = current.pending if current is not None else {}
+            busy = calendars.to_int(calendar)
+            for mask in pending.values():
+                busy |= mask
+            state = self._rooms[room_id] = _RoomState(busy, pending)
+            return state
+
+    def reserve(self, token, room_id, date_start, date_end, force=False):
+        """
+        Резервирование периода под токен.
+
+        RoomNotFoundError / RoomAlreadyBookedError, если комнаты нет или
+        период занят; force - резервировать без проверки (повтор журнала).
+        """
+        mask = calendars.range_mask(date_start, date_end)
+        state = self._state(room_id)
+        with self._lock:
+            if state.busy & mask and not force:
+                raise RoomAlreadyBookedError(room_id)
+            state.busy |= mask
+            state.pending[token] = mask
+
+    def release(self, token, room_id, created):
+        """Бронь записана (период остаётся занятым) или отклонена (период свободен)"""
+        with self._lock:
+            state = self._rooms.get(room_id)
+            if state is None:
+                return
+            mask = state.pending.pop(token, 0)
+            if not created:
+                # Отказ при записи - признак устаревшего календаря: перечитываем его
+                state.busy &= ~mask
+                state.loaded_at = float("-inf")
+
+    def invalidate(self, room_id=None):
+        """Перечитать календарь комнаты (или всех комнат) при следующем резервировании"""
+        with self._lock:
+            rooms = self._rooms.values() if room_id is None else [self._rooms.get(room_id)]
+            for state in rooms:
+                if state is not None:
+                    state.loaded_at = float("-inf")
+
+
+class Spool:
+    """
+    Журнал принятых броней: строки {"put": бронь} и {"done": [токены]}.
+
+    Когда необработанных записей не остаётся, файл обрезается.
+    """
+
+    def __init__(self, path, fsync=True):
+        self.path = path
+        self.fsync = fsync
+        self._file = None
+        self._lock_file = None
+        self._open = set()
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # Блокируется отдельный файл: сам журнал заменяется при сжатии
+        lock_file = open(self.path + ".lock", "a")
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                raise SpoolLockedError(
+                    f"booking queue spool {self.path} is used by another process"
+                ) from None
+        self._lock_file = lock_file
+
+    def open(self):
+        """
+        Открытие журнала, возвращает необработанные брони из прошлых запусков.
+
+        SpoolLockedError, если журнал открыт другой очередью.
+        """
+        self._acquire()
+        pending = OrderedDict()
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Недописанная строка при падении: ответ клиенту не отправлялся
+                        continue
+                    if "put" in record:
+                        pending[record["put"]["token"]] = record["put"]
+                    for token in record.get("done", ()):
+                        pending.pop(token, None)
+        with self._lock:
+            # Журнал переписывается только необработанными записями; замена
+            # файла атомарна, так что падение здесь тоже ничего не теряет
+            compacted = self.path + ".tmp"
+            self._file = open(compacted, "w", encoding="utf-8")
+            self._write([{"put": item} for item in pending.values()])
+            self._file.close()
+            os.replace(compacted, self.path)
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._open = set(pending)
+        return list(pending.values())
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._lock_file is not None:
+                # Закрытие файла снимает flock
+                self._lock_file.close()
+                self._lock_file = None
+
+    def put(self, item):
+        with self._lock:
+            self._write([{"put": item}])
+            self._open.add(item["token"])
+
+    def done(self, tokens):
+        with self._lock:
+            self._open.difference_update(tokens)
+            if self._open:
+                self._write([{"done": tokens}])
+            else:
+                self._file.seek(0)
+                self._file.truncate()
+
+    def _write(self, records):
+        if not records:
+            return
+        self._file.write("".join(json.dumps(record) + "\n" for record in records))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+
+class BookingQueue:
+    """Приём броней с отложенной пакетной записью фоновым потоком"""
+
+    def __init__(self, spool_path=None, start_worker=True):
+        self.reservations = Reservations()
+        self._spool_path = spool_path
+        self._start_worker = start_worker
+        self._queue = queue.Queue()
+        self._statuses = OrderedDict()
+        self._lock = threading.Lock()
+        self._spool = None
+        self._thread = None
+        self._stopping = False
+
+    def _open_spool(self):
+        fsync = settings.API_BOOKING_QUEUE_FSYNC
+        if self._spool_path:
+            spool = Spool(self._spool_path, fsync=fsync)
+            return spool, spool.open()
+        # Первый свободный слот: у каждого воркера свой журнал
+        for path in spool_slots(settings.API_BOOKING_QUEUE_SPOOL):
+            spool = Spool(path, fsync=fsync)
+            try:
+                return spool, spool.open()
+            except SpoolLockedError:
+                continue
+        raise SpoolLockedError(
+            f"all {MAX_SPOOL_SLOTS} booking queue spools for "
+            f"{settings.API_BOOKING_QUEUE_SPOOL} are in use"
+        )
+
+    def start(self):
+        """
+        Открытие журнала, повтор необработанных броней и запуск потока записи.
+
+        Журнал spool_path, заданный явно, должен быть свободен (иначе
+        SpoolLockedError); без него занимается свободный слот
+        API_BOOKING_QUEUE_SPOOL.
+        """
+        with self._lock:
+            if self._spool is not None:
+                return
+            spool, items = self._open_spool()
+            # Пачка записана, но процесс упал до отметки в журнале: итог уже в кэше
+            cached = get_cache().get_many([_status_key(item["token"]) for item in items])
+            written = {
+                item["token"]
+                for item in items
+                if cached.get(_status_key(item["token"]), {"status": PENDING})["status"] != PENDING
+            }
+            if written:
+                spool.done(list(written))
+                items = [item for item in items if item["token"] not in written]
+            for item in items:
+                try:
+                    self.reservations.reserve(
+                        item["token"],
+                        item["room_id"],
+                        date.fromisoformat(item["date_start"]),
+                        date.fromisoformat(item["date_end"]),
+                        force=True,
+                    )
+                except RoomNotFoundError:
+                    # Комнату удалили: запись отклонит bulk_create_bookings
+                    pass
+                self._queue.put(item)
+            # До запуска потока записи, который может сменить статусы
+            self._store_statuses({item["token"]: {"status": PENDING} for item in items})
+            self._spool = spool
+            self._stopping = False
+            if self._start_worker:
+                self._thread = threading.Thread(target=self._run, name="booking-queue", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=None):
+        """Остановка потока после записи уже принятых броней"""
+        with self._lock:
+            thread = self._thread
+            self._stopping = True
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+        with self._lock:
+            self._thread = None
+            if self._spool is not None:
+                self._spool.close()
+                self._spool = None
+
+    def submit(self, room_id, date_start, date_end):
+        """
+        Приём брони, возвращает токен.
+
+        Период резервируется в памяти и записывается в журнал до возврата;
+        RoomNotFoundError / RoomAlreadyBookedError - как у create_booking.
+        """
+        self.start()
+        token = uuid.uuid4().hex
+        self.reservations.reserve(token, room_id, date_start, date_end)
+        item = {
+            "token": token,
+            "room_id": room_id,
+            "date_start": date_start.isoformat(),
+            "date_end": date_end.isoformat(),
+        }
+        try:
+            self._spool.put(item)
+        except BaseException:
+            self.reservations.release(token, room_id, created=False)
+            raise
+        self._set_statuses({token: {"status": PENDING}})
+        self._queue.put(item)
+        return token
+
+    def status(self, token):
+        """Статус токена: {"status": ..., "booking_id"/"error"} или None"""
+        # Кэш первым: бронь могла принять или записать другая очередь (воркер,
+        # drain_booking_queue, процесс до перезапуска)
+        status = get_cache().get(_status_key(token))
+        if status is None:
+            # Вытеснена из кэша или кэш без хранения (DummyCache)
+            with self._lock:
+                status = self._statuses.get(token)
+        return dict(status) if status is not None else None
+
+    def join(self):
+        """Ожидание записи всех принятых броней"""
+        self._queue.join()
+
+    def drain(self):
+        """
+        Запись всех принятых броней в текущем потоке (без фонового потока).
+
+        Возвращает число записанных и отклонённых броней.
+        """
+        self.start()
+        created = rejected = 0
+        while True:
+            batch = self._take(block=False)
+            if not batch:
+                return created, rejected
+            batch_created = self._write(batch)
+            created += batch_created
+            rejected += len(batch) - batch_created
+
+    def _set_statuses(self, statuses):
+        with self._lock:
+            self._store_statuses(statuses)
+
+    def _store_statuses(self, statuses):
+        """Статусы {токен: статус} в памяти процесса и в общем кэше (под self._lock)"""
+        if not statuses:
+            return
+        for token, status in statuses.items():
+            self._statuses[token] = status
+            self._statuses.move_to_end(token)
+        while len(self._statuses) > MAX_STATUSES:
+            self._statuses.popitem(last=False)
+        get_cache().set_many(
+            {_status_key(token): status for token, status in statuses.items()},
+            timeout=settings.API_BOOKING_QUEUE_STATUS_TTL,
+        )
+
+    def _take(self, block):
+        """Пачка до API_BOOKING_QUEUE_BATCH_SIZE броней из очереди"""
+        batch_size = settings.API_BOOKING_QUEUE_BATCH_SIZE
+        batch = []
+        try:
+            item = self._queue.get(block=block)
+        except queue.Empty:
+            return batch
+        if item is None:
+            self._queue.task_done()
+            return batch
+        batch.append(item)
+        # Небольшое ожидание набирает пачку, пока идут запросы
+        deadline = time.monotonic() + settings.API_BOOKING_QUEUE_FLUSH_INTERVAL
+        while len(batch) < batch_size:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.task_done()
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        try:
+            while True:
+                batch = self._take(block=True)
+                if batch:
+                    self._write(batch)
+                if self._stopping and self._queue.empty():
+                    return
+        finally:
+            connection.close()
+
+    def _write(self, batch):
+        from .bulk import bulk_create_bookings
+
+        delay = RETRY_DELAY
+        while True:
+            try:
+                results = bulk_create_bookings(batch)
+                break
+            except (OperationalError, InterfaceError):
+                # База недоступна или заблокирована: пачка остаётся в очереди и журнале
+                logger.exception(
+                    "Booking queue batch of %d failed, retrying in %.1f s", len(batch), delay
+                )
+                connection.close()
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+            except Exception:
+                # Повтор не поможет (данные журнала, ошибка в коде): пачка отклоняется,
+                # чтобы не останавливать запись следующих броней
+                logger.exception("Booking queue batch of %d failed, rejecting it", len(batch))
+                results = [{"error": WRITE_FAILED}] * len(batch)
+                break
+
+        created_count = 0
+        statuses = {}
+        for item, result in zip(batch, results, strict=True):
+            created = "booking_id" in result
+            created_count += created
+            if created:
+                statuses[item["token"]] = {"status": CREATED, "booking_id": result["booking_id"]}
+            else:
+                statuses[item["token"]] = {"status": REJECTED, "error": result["error"]}
+            self.reservations.release(item["token"], item["room_id"], created)
+        self._set_statuses(statuses)
+        self._spool.done([item["token"] for item in batch])
+        for _ in batch:
+            self._queue.task_done()
+        return created_count
+
+
+# Глобальная очередь процесса (поток и журнал запускаются при первой брони)
+booking_queue = BookingQueue()
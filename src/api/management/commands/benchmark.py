@@ -0,0 +1,21 @@
+from importlib import import_module
+
+from django.core.management.base import BaseCommand
+
+from benchmarks import SCENARIOS
+
+
+class Command(BaseCommand):
+    """Запуск бенчмарков на временной базе данных"""
+
+    help = "Запуск бенчмарка производительности (см. пакет benchmarks)"
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest="scenario", required=True)
+        for name, module in SCENARIOS.items():
+            scenario = import_module(module)
+            subparser = subparsers.add_parser(name, help=scenario.__doc__.strip().splitlines()[0])
+            scenario.add_arguments(subparser)
+
+    def handle(self, *args, scenario, **options):
+        import_module(SCENARIOS[scenario]).run(self.stdout, **options)
@@ -0,0 +1,44 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.ingest import BookingQueue, SpoolLockedError, spool_slots
+
+
+class Command(BaseCommand):
+    """Запись необработанных броней из журнала очереди (после падения процесса)"""
+
+    help = "Запись в БД броней, оставшихся в журнале очереди отложенной записи"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--spool", help="Журнал очереди (по умолчанию все слоты API_BOOKING_QUEUE_SPOOL)"
+        )
+
+    def handle(self, *args, spool, **options):
+        if spool:
+            try:
+                created, rejected = self.drain(spool)
+            except SpoolLockedError as exc:
+                raise CommandError(str(exc)) from exc
+        else:
+            created = rejected = 0
+            paths = spool_slots(settings.API_BOOKING_QUEUE_SPOOL)
+            for path in filter(os.path.exists, paths):
+                try:
+                    slot_created, slot_rejected = self.drain(path)
+                except SpoolLockedError:
+                    # Журнал работающего воркера: его записывает сам воркер
+                    self.stdout.write(self.style.WARNING(f"Пропущен журнал {path}: используется"))
+                    continue
+                created += slot_created
+                rejected += slot_rejected
+        self.stdout.write(self.style.SUCCESS(f"Записано броней: {created}, отклонено: {rejected}"))
+
+    def drain(self, path):
+        queue = BookingQueue(spool_path=path, start_worker=False)
+        try:
+            return queue.drain()
+        finally:
+            queue.stop()
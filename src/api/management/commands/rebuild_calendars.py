@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from api.calendars import rebuild
+
+
+class Command(BaseCommand):
+    """Перестроение календарей занятости комнат по броням"""
+
+    help = "Перестроение календарей занятости комнат (Room.calendar) по существующим броням"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--room", type=int, action="append", dest="rooms", help="Только указанные комнаты"
+        )
+
+    def handle(self, *args, rooms, **options):
+        count = rebuild(room_ids=rooms)
+        self.stdout.write(self.style.SUCCESS(f"Перестроено календарей: {count}"))
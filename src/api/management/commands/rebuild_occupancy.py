@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from api.occupancy import rebuild
+
+
+class Command(BaseCommand):
+    """Перестроение таблицы занятости RoomNight по броням"""
+
+    help = "Перестроение таблицы занятости (RoomNight) по существующим броням"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--room", type=int, action="append", dest="rooms", help="Только указанные комнаты"
+        )
+        parser.add_argument("--batch-size", type=int, default=5000, help="Размер пакета вставки")
+
+    def handle(self, *args, rooms, batch_size, **options):
+        created = rebuild(room_ids=rooms, batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Создано дней занятости: {created}"))
@@ -0,0 +1,240 @@
+"""
+Метрики запросов: число SQL-запросов, время в БД, сериализации и рендеринга.
+
+Замеры текущего запроса хранятся в contextvar, поэтому работают и для
+async-представлений (asgiref переносит контекст в sync_to_async). SQL-запросы
+учитываются обёрткой ``execute_wrapper``, которая подключается к каждому
+соединению с БД. Итоги агрегируются в памяти процесса по представлениям и
+отдаются эндпоинтом ``/metrics`` в текстовом формате Prometheus.
+
+Включается переменной окружения API_METRICS=true (см. middleware.py).
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.http import HttpResponse
+
+from .room_cache import room_cache
+
+# Границы корзин гистограммы длительности запросов, секунды
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_current = ContextVar("api_request_metrics", default=None)
+
+
+class RequestMetrics:
+    """Замеры одного запроса"""
+
+    __slots__ = (
+        "started",
+        "view",
+        "view_finished",
+        "queries",
+        "db",
+        "serialize",
+        "serializing",
+        "render",
+    )
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view = None
+        self.view_finished = None
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.serializing = False
+        self.render = 0.0
+
+
+def start_request():
+    """Начало замеров запроса, возвращает (метрики, токен для finish_request)"""
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def finish_request(token):
+    _current.reset(token)
+
+
+def current_request():
+    return _current.get()
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    """Обёртка выполнения SQL: число запросов и время в БД текущего запроса"""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db += time.perf_counter() - started
+        metrics.queries += 1
+
+
+def instrument_connection(connection):
+    """Подключение execute_wrapper к соединению (однократно)"""
+    if execute_wrapper not in connection.execute_wrappers:
+        # В начало списка: connection.execute_wrapper() снимает обёртки с конца
+        connection.execute_wrappers.insert(0, execute_wrapper)
+
+
+def instrument_new_connection(sender, connection, **kwargs):
+    """Обработчик сигнала connection_created"""
+    instrument_connection(connection)
+
+
+@contextmanager
+def timed_serialization():
+    """
+    Учёт времени сериализации ответа в текущем запросе.
+
+    Время SQL-запросов внутри блока (ленивые queryset) вычитается, вложенные
+    блоки не учитываются повторно.
+    """
+    metrics = _current.get()
+    if metrics is None or metrics.serializing:
+        yield
+        return
+    metrics.serializing = True
+    started = time.perf_counter()
+    db_before = metrics.db
+    try:
+        yield
+    finally:
+        metrics.serializing = False
+        metrics.serialize += time.perf_counter() - started - (metrics.db - db_before)
+
+
+def server_timing(metrics, total):
+    """Значение заголовка Server-Timing (длительности в миллисекундах)"""
+    return ", ".join(
+        (
+            f'db;dur={metrics.db * 1000:.2f};desc="{metrics.queries} queries"',
+            f"serialize;dur={metrics.serialize * 1000:.2f}",
+            f"render;dur={metrics.render * 1000:.2f}",
+            f"total;dur={total * 1000:.2f}",
+        )
+    )
+
+
+class _ViewStats:
+    __slots__ = ("requests", "buckets", "duration", "queries", "db", "serialize", "render")
+
+    def __init__(self):
+        self.requests = {}
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.duration = 0.0
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.render = 0.0
+
+
+class MetricsRegistry:
+    """Агрегированные метрики процесса по представлениям"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view, method, status, metrics, total):
+        with self._lock:
+            stats = self._views.get(view)
+            if stats is None:
+                stats = self._views[view] = _ViewStats()
+            key = (method, str(status))
+            stats.requests[key] = stats.requests.get(key, 0) + 1
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if total <= bound:
+                    stats.buckets[i] += 1
+                    break
+            stats.duration += total
+            stats.queries += metrics.queries
+            stats.db += metrics.db
+            stats.serialize += metrics.serialize
+            stats.render += metrics.render
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def render(self):
+        """Метрики в текстовом формате Prometheus"""
+        with self._lock:
+            views = sorted(self._views.items())
+            lines = [
+                "# HELP api_requests_total Requests by view, method and status.",
+                "# TYPE api_requests_total counter",
+            ]
+            for view, stats in views:
+                for (method, status), count in sorted(stats.requests.items()):
+                    lines.append(
+                        f'api_requests_total{{view="{view}",method="{method}",'
+                        f'status="{status}"}} {count}'
+                    )
+
+            lines += [
+                "# HELP api_request_duration_seconds Request duration.",
+                "# TYPE api_request_duration_seconds histogram",
+            ]
+            for view, stats in views:
+                count = sum(stats.requests.values())
+                cumulative = 0
+                for bound, bucket in zip(DURATION_BUCKETS, stats.buckets, strict=True):
+                    cumulative += bucket
+                    lines.append(
+                        f'api_request_duration_seconds_bucket{{view="{view}",le="{bound}"}} '
+                        f"{cumulative}"
+                    )
+                lines += [
+                    f'api_request_duration_seconds_bucket{{view="{view}",le="+Inf"}} {count}',
+                    f'api_request_duration_seconds_sum{{view="{view}"}} {stats.duration}',
+                    f'api_request_duration_seconds_count{{view="{view}"}} {count}',
+                ]
+
+            for name, attribute, help_text in (
+                ("api_db_queries_total", "queries", "SQL queries executed."),
+                ("api_db_seconds_total", "db", "Time spent executing SQL."),
+                ("api_serialize_seconds_total", "serialize", "Time spent serializing responses."),
+                ("api_render_seconds_total", "render", "Time spent rendering DRF responses."),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for view, stats in views:
+                    lines.append(f'{name}{{view="{view}"}} {getattr(stats, attribute)}')
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def render_room_cache():
+    """Счётчики кэша метаданных комнат в формате Prometheus"""
+    stats = room_cache.stats()
+    return "\n".join(
+        (
+            "# HELP api_room_cache_hits_total Room metadata cache hits.",
+            "# TYPE api_room_cache_hits_total counter",
+            f"api_room_cache_hits_total {stats['hits']}",
+            "# HELP api_room_cache_misses_total Room metadata cache misses.",
+            "# TYPE api_room_cache_misses_total counter",
+            f"api_room_cache_misses_total {stats['misses']}",
+            "# HELP api_room_cache_entries Rooms currently cached.",
+            "# TYPE api_room_cache_entries gauge",
+            f"api_room_cache_entries {stats['size']}",
+        )
+    )
+
+
+def metrics_view(request):
+    """GET /metrics - метрики процесса в формате Prometheus"""
+    content = registry.render() + render_room_cache() + "\n"
+    return HttpResponse(content, content_type=PROMETHEUS_CONTENT_TYPE)
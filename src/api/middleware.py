@@ -0,0 +1,69 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connection
+
+from . import metrics
+
+
+class RequestMetricsMiddleware:
+    """
+    Замеры запроса: SQL-запросы, время в БД, сериализации и рендеринга.
+
+    Итоги отдаются в заголовке Server-Timing и накапливаются в реестре
+    для эндпоинта /metrics. Должен стоять первым в MIDDLEWARE, чтобы общее
+    время включало остальные middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Соединения, открытые до подключения сигнала connection_created
+        metrics.instrument_connection(connection)
+        current, token = metrics.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.finish_request(token)
+        return self._finish(request, response, current)
+
+    async def __acall__(self, request):
+        current, token = metrics.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.finish_request(token)
+        return self._finish(request, response, current)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        current = metrics.current_request()
+        if current is not None:
+            current.view = request.resolver_match.view_name
+        return None
+
+    def process_template_response(self, request, response):
+        # Ответ DRF отрисовывается после выхода из представления: засекаем границу
+        current = metrics.current_request()
+        if current is not None:
+            current.view_finished = time.perf_counter()
+        return response
+
+    def _finish(self, request, response, current):
+        finished = time.perf_counter()
+        if current.view_finished is not None:
+            current.render = finished - current.view_finished
+        total = finished - current.started
+
+        response["Server-Timing"] = metrics.server_timing(current, total)
+        metrics.registry.record(
+            current.view or "unmatched", request.method, response.status_code, current, total
+        )
+        return response
@@ -0,0 +1,39 @@
+"""
+Ограничение-исключение, запрещающее пересекающиеся брони одной комнаты.
+
+Поддерживается только PostgreSQL (GiST-индекс по диапазону дат), на других
+СУБД миграция ничего не делает: там записи сериализуются блокировкой
+транзакции (BEGIN IMMEDIATE для SQLite).
+"""
+
+from django.db import migrations
+
+CONSTRAINT_NAME = "booking_no_overlap"
+
+
+def add_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    table = schema_editor.quote_name(apps.get_model("api", "Booking")._meta.db_table)
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    schema_editor.execute(
+        f"ALTER TABLE {table} ADD CONSTRAINT {CONSTRAINT_NAME} "
+        "EXCLUDE USING gist (room_id WITH =, daterange(date_start, date_end, '[]') WITH &&)"
+    )
+
+
+def remove_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    table = schema_editor.quote_name(apps.get_model("api", "Booking")._meta.db_table)
+    schema_editor.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {CONSTRAINT_NAME}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_exclusion_constraint, remove_exclusion_constraint),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:36
+
+from datetime import date, timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Дни, которые хранятся в таблице занятости (calendars.EPOCH и calendars.LAST_DAY
+# на момент миграции): длинные брони не разворачиваются в неограниченное число строк
+FIRST_NIGHT = date(2020, 1, 1)
+LAST_NIGHT = date(2049, 12, 31)
+
+
+def fill_room_nights(apps, schema_editor):
+    """Дни занятости для уже существующих броней"""
+    Booking = apps.get_model("api", "Booking")
+    RoomNight = apps.get_model("api", "RoomNight")
+    batch = []
+    rows = Booking.objects.filter(date_end__gte=FIRST_NIGHT, date_start__lte=LAST_NIGHT)
+    rows = rows.values_list("id", "room_id", "date_start", "date_end", "room__price")
+    for booking_id, room_id, date_start, date_end, price in rows.iterator(chunk_size=2000):
+        date_start = max(date_start, FIRST_NIGHT)
+        date_end = min(date_end, LAST_NIGHT)
+        for i in range((date_end - date_start).days + 1):
+            batch.append(
+                RoomNight(
+                    room_id=room_id,
+                    booking_id=booking_id,
+                    date=date_start + timedelta(days=i),
+                    price=price,
+                )
+            )
+        if len(batch) >= 5000:
+            RoomNight.objects.bulk_create(batch)
+            batch = []
+    RoomNight.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0002_booking_no_overlap"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RoomNight",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Дата")),
+                (
+                    "price",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=10, verbose_name="Цена за ночь"
+                    ),
+                ),
+                (
+                    "booking",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="nights",
+                        to="api.booking",
+                        verbose_name="Бронирование",
+                    ),
+                ),
+                (
+                    "room",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="nights",
+                        to="api.room",
+                        verbose_name="Комната",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Занятый день",
+                "verbose_name_plural": "Занятые дни",
+                "indexes": [
+                    models.Index(fields=["date", "price"], name="api_roomnig_date_bbb01b_idx"),
+                    models.Index(fields=["room", "date"], name="api_roomnig_room_id_115c7e_idx"),
+                ],
+            },
+        ),
+        migrations.RunPython(fill_room_nights, migrations.RunPython.noop),
+    ]
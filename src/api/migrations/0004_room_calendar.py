@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:40
+
+from datetime import date
+
+from django.db import migrations, models
+
+# Копия calendars.EPOCH на момент миграции
+EPOCH = date(2020, 1, 1)
+
+
+def fill_calendars(apps, schema_editor):
+    """Календари занятости для уже существующих броней"""
+    Room = apps.get_model("api", "Room")
+    Booking = apps.get_model("api", "Booking")
+    bits = {}
+    rows = Booking.objects.filter(date_end__gte=EPOCH).values_list(
+        "room_id", "date_start", "date_end"
+    )
+    for room_id, date_start, date_end in rows.iterator(chunk_size=5000):
+        first = max((date_start - EPOCH).days, 0)
+        last = (date_end - EPOCH).days
+        bits[room_id] = bits.get(room_id, 0) | (((1 << (last - first + 1)) - 1) << first)
+    Room.objects.bulk_update(
+        [
+            Room(pk=room_id, calendar=value.to_bytes((value.bit_length() + 7) // 8, "little"))
+            for room_id, value in bits.items()
+        ],
+        ["calendar"],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0003_roomnight"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="room",
+            name="calendar",
+            field=models.BinaryField(default=b"", verbose_name="Календарь занятости"),
+        ),
+        migrations.RunPython(fill_calendars, migrations.RunPython.noop),
+    ]
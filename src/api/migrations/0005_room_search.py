@@ -0,0 +1,87 @@
+"""
+Поисковый индекс по описанию комнат (см. api/search.py).
+
+SQLite - виртуальная таблица FTS5 с триггерами синхронизации,
+PostgreSQL - GIN-индекс по to_tsvector('simple', description),
+на других СУБД миграция ничего не делает.
+
+DDL записан здесь целиком: изменения api/search.py не меняют уже
+применённую миграцию.
+"""
+
+from django.db import migrations
+from django.db.utils import OperationalError
+
+FTS_TABLE = "api_room_fts"
+PG_INDEX_NAME = "room_description_search"
+
+SQLITE_TRIGGERS = {
+    f"{FTS_TABLE}_insert": (
+        "AFTER INSERT ON api_room BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description); END"
+    ),
+    f"{FTS_TABLE}_delete": (
+        "AFTER DELETE ON api_room BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description) "
+        "VALUES ('delete', old.id, old.description); END"
+    ),
+    f"{FTS_TABLE}_update": (
+        "AFTER UPDATE OF description ON api_room BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description) "
+        "VALUES ('delete', old.id, old.description); "
+        f"INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description); END"
+    ),
+}
+
+# Выражение совпадает с SearchVector("description", config="simple"):
+# иначе планировщик не использует индекс
+PG_CREATE_INDEX = (
+    f'CREATE INDEX IF NOT EXISTS "{PG_INDEX_NAME}" ON "api_room" '
+    "USING gin ((to_tsvector('simple'::regconfig, COALESCE(\"description\", ''))))"
+)
+
+
+def _forget_fts_check(connection):
+    # search.py запоминает наличие таблицы FTS5 на соединении
+    connection.__dict__.pop("_api_room_fts", None)
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            try:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                    "USING fts5(description, content='api_room', content_rowid='id')"
+                )
+            except OperationalError:
+                # SQLite собран без FTS5: поиск работает через icontains
+                return
+            for name, body in SQLITE_TRIGGERS.items():
+                cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        _forget_fts_check(connection)
+    elif connection.vendor == "postgresql":
+        schema_editor.execute(PG_CREATE_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        for name in SQLITE_TRIGGERS:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        _forget_fts_check(connection)
+    elif connection.vendor == "postgresql":
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{PG_INDEX_NAME}"')
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0004_room_calendar"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
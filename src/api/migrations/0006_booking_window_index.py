@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0005_room_search"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["room", "date_end", "date_start"], name="api_booking_room_id_00654e_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0006_booking_window_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="room",
+            index=models.Index(fields=["price", "id"], name="api_room_price_968042_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="room",
+            index=models.Index(fields=["created_at", "id"], name="api_room_created_ebbd0e_idx"),
+        ),
+    ]
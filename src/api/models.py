@@ -8,15 +8,33 @@ class Room(models.Model):
     description = models.TextField(verbose_name="Описание")
     price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Цена за ночь")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    # Битовая маска занятых дней от calendars.EPOCH (см. calendars.py)
+    calendar = models.BinaryField(default=b"", editable=False, verbose_name="Календарь занятости")
 
     class Meta:
         verbose_name = "Комната"
         verbose_name_plural = "Комнаты"
         ordering = ["id"]
+        indexes = [
+            # Сортировка rooms/list (с id для keyset-пагинации) и фильтры по диапазону
+            models.Index(fields=["price", "id"]),
+            models.Index(fields=["created_at", "id"]),
+        ]
 
     def __str__(self):
         return f"Room {self.id} - {self.description[:30]}"
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None and not args:
+            # Календарь меняется только запросами UPDATE под блокировкой (calendars.py):
+            # загруженное ранее значение могло устареть и стёрло бы занятые дни
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "calendar"
+            ]
+        super().save(*args, **kwargs)
+
 
 class Booking(models.Model):
     """Модель бронирования"""
@@ -34,16 +52,61 @@ class Booking(models.Model):
         ordering = ["date_start"]
         indexes = [
             models.Index(fields=["room", "date_start", "date_end"]),
+            # Первая бронь окна from/to по дате окончания (bookings.room_bookings)
+            models.Index(fields=["room", "date_end", "date_start"]),
         ]
 
     def __str__(self):
         return f"Booking {self.id} for Room {self.room_id}: {self.date_start} to {self.date_end}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if {"room_id", "date_start", "date_end"} <= set(field_names):
+            # Исходные комната и даты: при изменении брони их дни освобождаются в календаре
+            instance._loaded_dates = (instance.room_id, instance.date_start, instance.date_end)
+        return instance
+
     def clean(self):
         """Валидация на уровне модели"""
         if self.date_start and self.date_end and self.date_start > self.date_end:
             raise ValidationError("Дата начала не может быть позже даты окончания")
 
-    def save(self, *args, **kwargs):
-        self.full_clean()
+    def save(self, *args, full_clean=True, **kwargs):
+        # full_clean=False - данные уже проверены вызывающим кодом (см. bookings.py)
+        if full_clean:
+            self.full_clean()
         super().save(*args, **kwargs)
+
+
+class RoomNight(models.Model):
+    """
+    Занятый день комнаты (материализованная таблица занятости).
+
+    Строки создаются для каждой даты брони от date_start до date_end
+    включительно (так же, как даты учитываются при проверке пересечений) и
+    хранят цену комнаты, поэтому отчёты по занятости и выручке не читают
+    брони. Синхронизируется сигналами и пакетным созданием броней,
+    перестраивается командой rebuild_occupancy.
+    """
+
+    room = models.ForeignKey(
+        Room, related_name="nights", on_delete=models.CASCADE, verbose_name="Комната"
+    )
+    booking = models.ForeignKey(
+        Booking, related_name="nights", on_delete=models.CASCADE, verbose_name="Бронирование"
+    )
+    date = models.DateField(verbose_name="Дата")
+    price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Цена за ночь")
+
+    class Meta:
+        verbose_name = "Занятый день"
+        verbose_name_plural = "Занятые дни"
+        indexes = [
+            # Агрегаты по диапазону дат читаются только из индекса
+            models.Index(fields=["date", "price"]),
+            models.Index(fields=["room", "date"]),
+        ]
+
+    def __str__(self):
+        return f"Room {self.room_id} on {self.date}"
@@ -0,0 +1,150 @@
+"""
+Таблица занятости RoomNight: синхронизация с бронями и отчёты.
+
+Каждая бронь разворачивается в строки (комната, дата, цена) для дат от
+date_start до date_end включительно. Отчёт по диапазону дат агрегирует
+только эти строки (индекс date, price) и не читает брони и комнаты, кроме
+общего числа комнат.
+
+Число строк брони ограничено: новые брони не длиннее MAX_BOOKING_DAYS
+(проверяется сериализаторами), а в таблице хранятся только дни от
+calendars.EPOCH до calendars.LAST_DAY, как и в календарях комнат, - в том
+числе для броней, созданных в обход API. Отчёт строится только по этим дням.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Subquery, Sum
+
+from .calendars import EPOCH, LAST_DAY
+from .models import Booking, Room, RoomNight
+
+# Максимальная длина периода отчёта GET /api/occupancy, дней
+MAX_REPORT_DAYS = 731
+
+# Максимальная длина новой брони, дней (включая дату окончания)
+MAX_BOOKING_DAYS = 366
+
+
+def booking_dates(date_start, date_end):
+    """Даты, занятые бронью (включая дату окончания)"""
+    return [date_start + timedelta(days=i) for i in range((date_end - date_start).days + 1)]
+
+
+def _nights(room_id, booking_id, date_start, date_end, price):
+    # Дни вне EPOCH..LAST_DAY не хранятся (список пуст, если бронь целиком вне них)
+    return [
+        RoomNight(room_id=room_id, booking_id=booking_id, date=day, price=price)
+        for day in booking_dates(max(date_start, EPOCH), min(date_end, LAST_DAY))
+    ]
+
+
+def sync_booking(booking, created):
+    """Пересчёт дней одной брони (обработчик post_save)"""
+    if not created:
+        RoomNight.objects.filter(booking_id=booking.pk).delete()
+    # Цена подставляется подзапросом в том же INSERT, без чтения комнаты
+    price = Subquery(Room.objects.filter(pk=booking.room_id).values("price"))
+    RoomNight.objects.bulk_create(
+        _nights(booking.room_id, booking.pk, booking.date_start, booking.date_end, price)
+    )
+
+
+def add_bookings(bookings, prices):
+    """Дни новых броней из пакетного создания, prices - {room_id: цена}"""
+    nights = []
+    for booking in bookings:
+        nights += _nights(
+            booking.room_id,
+            booking.pk,
+            booking.date_start,
+            booking.date_end,
+            prices[booking.room_id],
+        )
+    RoomNight.objects.bulk_create(nights, batch_size=5000)
+
+
+def update_room_price(room):
+    """Новая цена комнаты во всех её днях"""
+    RoomNight.objects.filter(room_id=room.pk).exclude(price=room.price).update(price=room.price)
+
+
+def rebuild(room_ids=None, batch_size=5000):
+    """
+    Полное перестроение таблицы (или дней выбранных комнат) по броням.
+
+    Возвращает число созданных строк.
+    """
+    bookings = Booking.objects.filter(date_end__gte=EPOCH, date_start__lte=LAST_DAY).order_by()
+    nights = RoomNight.objects.all()
+    if room_ids is not None:
+        bookings = bookings.filter(room_id__in=room_ids)
+        nights = nights.filter(room_id__in=room_ids)
+
+    created = 0
+    with transaction.atomic():
+        nights.delete()
+        batch = []
+        rows = bookings.values_list("id", "room_id", "date_start", "date_end", "room__price")
+        for booking_id, room_id, date_start, date_end, price in rows.iterator(chunk_size=2000):
+            batch += _nights(room_id, booking_id, date_start, date_end, price)
+            if len(batch) >= batch_size:
+                RoomNight.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        if batch:
+            RoomNight.objects.bulk_create(batch)
+            created += len(batch)
+    return created
+
+
+def occupancy_report(date_from, date_to, room_id=None):
+    """
+    Занятость и выручка по дням периода [date_from, date_to].
+
+    Для всех комнат доля занятости считается от текущего числа комнат,
+    для одной комнаты (room_id) - от единицы.
+    """
+    nights = RoomNight.objects.filter(date__gte=date_from, date__lte=date_to)
+    if room_id is None:
+        rooms = Room.objects.count()
+    else:
+        nights = nights.filter(room_id=room_id)
+        rooms = 1
+
+    by_day = defaultdict(lambda: (0, Decimal(0)))
+    rows = nights.order_by().values_list("date").annotate(Count("id"), Sum("price"))
+    for day, occupied, revenue in rows:
+        by_day[day] = (occupied, revenue)
+
+    days = []
+    total_nights = 0
+    total_revenue = Decimal(0)
+    for day in booking_dates(date_from, date_to):
+        occupied, revenue = by_day[day]
+        total_nights += occupied
+        total_revenue += revenue
+        days.append(
+            {
+                "date": day.isoformat(),
+                "occupied": occupied,
+                "occupancy": round(occupied / rooms, 4) if rooms else 0.0,
+                "revenue": f"{revenue:.2f}",
+            }
+        )
+
+    capacity = rooms * len(days)
+    return {
+        "from": date_from.isoformat(),
+        "to": date_to.isoformat(),
+        "rooms": rooms,
+        "days": days,
+        "total": {
+            "room_nights": total_nights,
+            "occupancy": round(total_nights / capacity, 4) if capacity else 0.0,
+            "revenue": f"{total_revenue:.2f}",
+        },
+    }
@@ -0,0 +1,155 @@
+"""
+Keyset (cursor) пагинация.
+
+Курсор кодирует значения поля сортировки и ``id`` последней строки страницы,
+следующая страница выбирается условием ``(field, id) > (value, last_id)``
+вместо OFFSET. Условие дополнено ведущим ``field >= value``, чтобы чтение
+индекса (field, id) начиналось с позиции курсора: стоимость запроса зависит
+только от размера страницы.
+"""
+
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+def query_params(request):
+    """Параметры запроса для Request DRF и для обычного HttpRequest (async-представления)"""
+    return getattr(request, "query_params", request.GET)
+
+
+class InvalidCursorError(ValueError):
+    """Некорректный курсор или размер страницы"""
+
+
+def encode_cursor(value, pk):
+    """Кодирование курсора в URL-безопасную строку"""
+    if value is not None and not isinstance(value, int | str):
+        value = value.isoformat() if hasattr(value, "isoformat") else str(value)
+    raw = json.dumps([value, pk], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Декодирование курсора в пару (значение, id)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, pk = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as exc:
+        raise InvalidCursorError("invalid cursor") from exc
+    # Только значения, которые выдаёт encode_cursor: списки и объекты JSON до
+    # to_python() поля не доходят, bool - подкласс int, но не id
+    if not isinstance(pk, int) or isinstance(pk, bool):
+        raise InvalidCursorError("invalid cursor")
+    if value is not None and (not isinstance(value, str | int | float) or isinstance(value, bool)):
+        raise InvalidCursorError("invalid cursor")
+    return value, pk
+
+
+class KeysetPagination(BasePagination):
+    """
+    Пагинация по ключу (поле сортировки, id).
+
+    Включается, только если в запросе передан ``cursor`` или ``page_size``:
+    без них эндпоинты возвращают полный список, как и раньше.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    def __init__(self, ordering, columns=None):
+        self.field = ordering.lstrip("-")
+        self.descending = ordering.startswith("-")
+        # Порядок полей, если страница состоит из кортежей values_list()
+        self.columns = columns
+        self.next_cursor = None
+
+    @property
+    def ordering(self):
+        if self.field == "id":
+            return ["-id" if self.descending else "id"]
+        if self.descending:
+            return [f"-{self.field}", "-id"]
+        return [self.field, "id"]
+
+    def is_requested(self, request):
+        params = query_params(request)
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        max_page_size = settings.API_PAGINATION["MAX_PAGE_SIZE"]
+        page_size = query_params(request).get(self.page_size_query_param)
+        if page_size is None:
+            return min(settings.API_PAGINATION["DEFAULT_PAGE_SIZE"], max_page_size)
+        try:
+            page_size = int(page_size)
+        except ValueError as exc:
+            raise InvalidCursorError("page_size must be an integer") from exc
+        if page_size < 1:
+            raise InvalidCursorError("page_size must be positive")
+        return min(page_size, max_page_size)
+
+    def _key(self, item):
+        if isinstance(item, tuple):
+            return item[self.columns.index(self.field)], item[self.columns.index("id")]
+        if isinstance(item, dict):
+            return item[self.field], item["id"]
+        return getattr(item, self.field), item.pk
+
+    def after_cursor(self, queryset, cursor):
+        """Строки queryset, следующие за курсором в порядке ordering"""
+        value, pk = decode_cursor(cursor)
+        lookup = "lt" if self.descending else "gt"
+        if self.field == "id":
+            return queryset.filter(**{f"id__{lookup}": pk})
+        try:
+            value = queryset.model._meta.get_field(self.field).to_python(value)
+        except (ValidationError, TypeError, ValueError) as exc:
+            raise InvalidCursorError("invalid cursor") from exc
+        # Ведущее условие field >= value (<= при обратном порядке) дублирует OR ниже,
+        # но только по нему БД читает индекс (field, id) диапазоном с позиции
+        # курсора, а не с начала
+        bound = "lte" if self.descending else "gte"
+        return queryset.filter(
+            Q(**{f"{self.field}__{bound}": value}),
+            Q(**{f"{self.field}__{lookup}": value}) | Q(**{self.field: value, f"id__{lookup}": pk}),
+        )
+
+    def _page_queryset(self, queryset, request):
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = query_params(request).get(self.cursor_query_param)
+        if cursor:
+            queryset = self.after_cursor(queryset, cursor)
+
+        # Лишняя строка показывает, есть ли следующая страница
+        return queryset[: page_size + 1], page_size
+
+    def _finish_page(self, page, page_size):
+        self.next_cursor = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            self.next_cursor = encode_cursor(*self._key(page[-1]))
+        return page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, page_size = self._page_queryset(queryset, request)
+        return self._finish_page(list(queryset), page_size)
+
+    async def apaginate_queryset(self, queryset, request):
+        """Асинхронный вариант paginate_queryset (async ORM)"""
+        queryset, page_size = self._page_queryset(queryset, request)
+        return self._finish_page([item async for item in queryset], page_size)
+
+    def get_paginated_data(self, data):
+        return {"results": data, "next_cursor": self.next_cursor}
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
@@ -0,0 +1,63 @@
+"""
+Представления строк для чтения без сериализаторов DRF.
+
+Списки собираются напрямую из кортежей ``values_list()`` в документированный
+JSON-формат (тот же, что у RoomSerializer и BookingListSerializer) и
+кодируются заранее созданным JSON-кодировщиком. Сериализаторы DRF
+по-прежнему используются для записи.
+"""
+
+import json
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import timezone
+
+from .metrics import timed_serialization
+
+ROOM_COLUMNS = ("id", "description", "price", "created_at")
+BOOKING_COLUMNS = ("id", "date_start", "date_end")
+
+# Те же параметры, что у JSONRenderer DRF (UNICODE_JSON, COMPACT_JSON)
+encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def format_datetime(value):
+    """Дата и время в формате DRF DateTimeField (ISO 8601, UTC как "Z")"""
+    value = timezone.localtime(value) if settings.USE_TZ else value
+    value = value.isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def room_to_dict(row):
+    """Комната из кортежа ROOM_COLUMNS в формате RoomSerializer"""
+    pk, description, price, created_at = row
+    return {
+        "room_id": pk,
+        "description": description,
+        "price": f"{price:f}",
+        "created_at": format_datetime(created_at),
+    }
+
+
+def booking_to_dict(row):
+    """Бронь из кортежа BOOKING_COLUMNS в формате BookingListSerializer"""
+    pk, date_start, date_end = row
+    return {
+        "booking_id": pk,
+        "date_start": date_start.isoformat(),
+        "date_end": date_end.isoformat(),
+    }
+
+
+def render_rows(rows, to_dict):
+    """JSON-массив из строк values_list в байтах"""
+    with timed_serialization():
+        return encode([to_dict(row) for row in rows]).encode()
+
+
+def json_response(content, status=200):
+    """Ответ с уже закодированным JSON"""
+    return HttpResponse(content, status=status, content_type="application/json")
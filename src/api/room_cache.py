@@ -0,0 +1,132 @@
+"""
+Кэш метаданных комнат в памяти процесса: id -> цена и описание.
+
+Заменяет запросы ``Room.objects.filter(id=...).exists()`` на горячих путях
+броней. Записи вытесняются по LRU (API_ROOM_CACHE_SIZE) и устаревают через
+API_ROOM_CACHE_TTL секунд; изменения комнат сбрасывают запись через сигналы
+модели Room и явно в представлениях создания и удаления. Отсутствие комнаты
+не кэшируется: её мог создать другой процесс.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from django.conf import settings
+
+
+class RoomInfo(NamedTuple):
+    id: int
+    price: object
+    description: str
+
+
+class RoomCache:
+    """Потокобезопасный LRU-кэш метаданных комнат с TTL и счётчиками"""
+
+    def __init__(self, size=None, ttl=None):
+        self._rooms = OrderedDict()
+        self._generations = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._size = size
+        self._ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self):
+        if self._size is not None:
+            return self._size
+        return getattr(settings, "API_ROOM_CACHE_SIZE", 10_000)
+
+    @property
+    def ttl(self):
+        if self._ttl is not None:
+            return self._ttl
+        return getattr(settings, "API_ROOM_CACHE_TTL", 30)
+
+    def _lookup(self, room_id):
+        """Запись из кэша или (None, поколение для сохранения загруженной)"""
+        with self._lock:
+            entry = self._rooms.get(room_id)
+            if entry is not None:
+                info, loaded_at = entry
+                if time.monotonic() - loaded_at <= self.ttl:
+                    self._rooms.move_to_end(room_id)
+                    self.hits += 1
+                    return info, None
+                del self._rooms[room_id]
+            self.misses += 1
+            return None, self._generation(room_id)
+
+    def _store(self, room_id, info, generation):
+        if info is None or self.size <= 0:
+            return
+        with self._lock:
+            # Пока шла загрузка, комнату изменили: снимок уже устарел
+            if self._generation(room_id) != generation:
+                return
+            self._rooms[room_id] = (info, time.monotonic())
+            self._rooms.move_to_end(room_id)
+            while len(self._rooms) > self.size:
+                self._rooms.popitem(last=False)
+
+    def get(self, room_id):
+        """RoomInfo комнаты или None, если её нет"""
+        info, generation = self._lookup(room_id)
+        if generation is None:
+            return info
+        from .models import Room
+
+        row = Room.objects.filter(pk=room_id).values_list("id", "price", "description").first()
+        info = RoomInfo(*row) if row is not None else None
+        self._store(room_id, info, generation)
+        return info
+
+    async def aget(self, room_id):
+        """Асинхронный вариант get"""
+        info, generation = self._lookup(room_id)
+        if generation is None:
+            return info
+        from .models import Room
+
+        rows = Room.objects.filter(pk=room_id).values_list("id", "price", "description")
+        row = await rows.afirst()
+        info = RoomInfo(*row) if row is not None else None
+        self._store(room_id, info, generation)
+        return info
+
+    def exists(self, room_id):
+        return self.get(room_id) is not None
+
+    async def aexists(self, room_id):
+        return await self.aget(room_id) is not None
+
+    def invalidate(self, room_id=None):
+        """Сброс записи комнаты (или всех комнат)"""
+        with self._lock:
+            if room_id is None:
+                self._rooms.clear()
+                self._generations.clear()
+                self._epoch += 1
+            else:
+                self._generations[room_id] = self._generations.get(room_id, 0) + 1
+                self._rooms.pop(room_id, None)
+
+    def stats(self):
+        """Счётчики попаданий и промахов и текущий размер"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._rooms)}
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def _generation(self, room_id):
+        return self._epoch, self._generations.get(room_id, 0)
+
+
+# Глобальный кэш процесса
+room_cache = RoomCache()
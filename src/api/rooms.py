@@ -0,0 +1,122 @@
+"""
+Удаление комнаты вместе с бронями без загрузки броней в Python.
+
+``room.delete()`` эмулирует ON DELETE CASCADE в ORM: коллектор Django
+читает каждую бронь (у Booking есть сигналы), а затем удаляет их пачками.
+Здесь комната, брони и дни занятости удаляются тремя DELETE по условию на
+room_id в одной транзакции (внешние ключи отложенные, так что порядок
+неважен), как ``QuerySet._raw_delete``. Сигналы при этом не отправляются,
+поэтому производные данные (резервы очереди броней, версии кэша ответов,
+кэш комнат) сбрасываются явно.
+
+Для комнат с очень большой историей есть фоновый режим: брони удаляются
+пачками по API_ROOM_DELETE_BATCH_SIZE в отдельных коротких транзакциях,
+а комната - последней, вместе с бронями, созданными за время удаления.
+"""
+
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from . import calendars
+from .bookings import RoomNotFoundError
+from .cache import ROOMS_SCOPE, bump_version, room_bookings_scope
+from .ingest import booking_queue
+from .models import Booking, Room, RoomNight
+from .room_cache import room_cache
+
+logger = logging.getLogger(__name__)
+
+
+def _raw_delete(queryset):
+    """DELETE ... WHERE без коллектора и сигналов, возвращает число строк"""
+    return queryset._raw_delete(queryset.db)
+
+
+def _invalidate(room_id, room_deleted):
+    """Сброс производных данных комнаты (повторно после фиксации транзакции)"""
+
+    def invalidate():
+        booking_queue.reservations.invalidate(room_id)
+        room_cache.invalidate(room_id)
+
+    invalidate()
+    transaction.on_commit(invalidate)
+    bump_version(room_bookings_scope(room_id))
+    if room_deleted:
+        bump_version(ROOMS_SCOPE)
+
+
+def delete_room(room_id):
+    """
+    Удаление комнаты с бронями и днями занятости тремя запросами.
+
+    Возвращает число удалённых броней; RoomNotFoundError, если комнаты нет.
+    """
+    with transaction.atomic():
+        if not _raw_delete(Room.objects.filter(pk=room_id)):
+            raise RoomNotFoundError(room_id)
+        _raw_delete(RoomNight.objects.filter(room_id=room_id))
+        deleted = _raw_delete(Booking.objects.filter(room_id=room_id))
+        _invalidate(room_id, room_deleted=True)
+    return deleted
+
+
+def delete_room_in_batches(room_id, batch_size=None):
+    """
+    Удаление броней комнаты пачками, затем самой комнаты.
+
+    Каждая пачка - отдельная транзакция, так что запись в базу не
+    блокируется надолго. Дни удалённых броней освобождаются в календаре
+    комнаты в той же транзакции: если удаление прервано (например, вместе с
+    процессом), комната остаётся с календарём оставшихся броней. Возвращает
+    общее число удалённых броней.
+    """
+    batch_size = batch_size or settings.API_ROOM_DELETE_BATCH_SIZE
+    room = Room.objects.select_for_update().filter(pk=room_id)
+    bookings = Booking.objects.filter(room_id=room_id).order_by("pk")
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            calendar = room.values_list("calendar", flat=True).first()
+            rows = list(bookings.values_list("pk", "date_start", "date_end")[:batch_size])
+            if not rows:
+                break
+            ids = [pk for pk, _, _ in rows]
+            _raw_delete(RoomNight.objects.filter(booking_id__in=ids))
+            deleted += _raw_delete(Booking.objects.filter(pk__in=ids))
+            if calendar is not None:
+                busy = calendars.to_int(calendar)
+                for _, date_start, date_end in rows:
+                    busy &= ~calendars.range_mask(date_start, date_end)
+                Room.objects.filter(pk=room_id).update(calendar=calendars.to_bytes(busy))
+            _invalidate(room_id, room_deleted=False)
+    return deleted + delete_room(room_id)
+
+
+def _spawn(target, *args):
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def _delete_in_background(room_id, batch_size):
+    try:
+        delete_room_in_batches(room_id, batch_size)
+    except RoomNotFoundError:
+        # Комнату уже удалили другим запросом
+        pass
+    except Exception:
+        # Прерванное удаление можно повторить: каждая пачка атомарна
+        logger.exception("Background deletion of room %s failed", room_id)
+    finally:
+        connection.close()
+
+
+def start_room_delete(room_id, batch_size=None):
+    """Фоновое удаление комнаты пачками; RoomNotFoundError, если комнаты нет"""
+    if not Room.objects.filter(pk=room_id).exists():
+        raise RoomNotFoundError(room_id)
+    _spawn(_delete_in_background, room_id, batch_size)
@@ -0,0 +1,168 @@
+"""
+Полнотекстовый поиск комнат по описанию (GET /api/rooms/search?q=).
+
+- SQLite: внешняя (external content) виртуальная таблица FTS5 ``api_room_fts``
+  над ``api_room``. Её синхронизируют триггеры на вставку, удаление и
+  изменение описания, поэтому индекс актуален и при bulk_create и при
+  удалении комнат SQL-запросами (rooms.py). Релевантность - встроенный
+  ранг FTS5 (bm25).
+- PostgreSQL: GIN-индекс по выражению ``to_tsvector('simple', description)``;
+  запрос строится тем же выражением SearchVector, поэтому план использует
+  индекс. Релевантность - ts_rank.
+- Другие СУБД и SQLite без модуля FTS5: ``icontains`` по каждому слову.
+
+Запрос разбивается на слова, комната должна содержать их все (без
+стемминга: конфигурация ``simple`` и токенизатор unicode61 FTS5).
+
+Индекс создаёт миграция 0005_room_search. Миграции, пересоздающие таблицу
+api_room на SQLite (изменение полей), удаляют её триггеры, поэтому после
+каждого migrate (см. apps.py) триггеры восстанавливаются здесь.
+"""
+
+import re
+
+from django.db import connection, connections
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.utils import OperationalError
+
+from .models import Room
+
+FTS_TABLE = "api_room_fts"
+# Конфигурация текстового поиска PostgreSQL (без стемминга, как FTS5)
+SEARCH_CONFIG = "simple"
+# Миграция, создающая индекс (её DDL не зависит от этого модуля)
+MIGRATION = ("api", "0005_room_search")
+
+_WORD = re.compile(r"\w+")
+
+_SQLITE_TRIGGERS = {
+    f"{FTS_TABLE}_insert": (
+        "AFTER INSERT ON api_room BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description); END"
+    ),
+    f"{FTS_TABLE}_delete": (
+        "AFTER DELETE ON api_room BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description) "
+        "VALUES ('delete', old.id, old.description); END"
+    ),
+    f"{FTS_TABLE}_update": (
+        "AFTER UPDATE OF description ON api_room BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description) "
+        "VALUES ('delete', old.id, old.description); "
+        f"INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description); END"
+    ),
+}
+
+
+def terms(q):
+    """Слова поискового запроса в нижнем регистре"""
+    return [word.lower() for word in _WORD.findall(q)]
+
+
+def _search_vector():
+    from django.contrib.postgres.search import SearchVector
+
+    return SearchVector("description", config=SEARCH_CONFIG)
+
+
+def _ensure_sqlite_index(connection):
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                "USING fts5(description, content='api_room', content_rowid='id')"
+            )
+        except OperationalError:
+            # SQLite собран без FTS5: поиск работает через icontains
+            return False
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'api_room'"
+        )
+        existing = {name for (name,) in cursor.fetchall()}
+        missing = [name for name in _SQLITE_TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(f"CREATE TRIGGER {name} {_SQLITE_TRIGGERS[name]}")
+        if missing:
+            # Без триггеров индекс мог отстать от таблицы: строится заново
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    connection._api_room_fts = True
+    return True
+
+
+def ensure_index_after_migrate(sender, using, **kwargs):
+    """Обработчик post_migrate: восстановление триггеров после пересоздания api_room"""
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    if MIGRATION not in MigrationRecorder(connection).applied_migrations():
+        return
+    # Без редактора схемы: на SQLite он недоступен внутри транзакции
+    _ensure_sqlite_index(connection)
+
+
+def _has_fts_table():
+    # Проверка один раз на соединение (соединения Django привязаны к потоку)
+    available = getattr(connection, "_api_room_fts", None)
+    if available is None:
+        available = FTS_TABLE in connection.introspection.table_names()
+        connection._api_room_fts = available
+    return available
+
+
+def backend():
+    """Способ поиска на текущей БД: fts5, tsvector или icontains"""
+    if connection.vendor == "sqlite" and _has_fts_table():
+        return "fts5"
+    if connection.vendor == "postgresql":
+        return "tsvector"
+    return "icontains"
+
+
+def search_rooms(q, min_price=None, max_price=None, ordering=None):
+    """
+    Комнаты, описание которых содержит все слова q.
+
+    Без ordering результаты упорядочены по релевантности (затем по id),
+    иначе - по полю сортировки RoomListView.
+    """
+    words = terms(q)
+    rooms = Room.objects.all()
+    if min_price is not None:
+        rooms = rooms.filter(price__gte=min_price)
+    if max_price is not None:
+        rooms = rooms.filter(price__lte=max_price)
+    if not words:
+        return rooms.none()
+
+    method = backend()
+    if method == "fts5":
+        # Каждое слово - строка FTS5 в кавычках: спецсимволы запроса не интерпретируются
+        match = " ".join(f'"{word}"' for word in words)
+        rooms = rooms.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        )
+        if ordering is None:
+            # Ранг только для найденных строк: поиск по rowid внутри индекса
+            rank = RawSQL(
+                f"SELECT rank FROM {FTS_TABLE} "
+                f'WHERE {FTS_TABLE} MATCH %s AND rowid = "api_room"."id"',
+                [match],
+            )
+            return rooms.annotate(rank=rank).order_by("rank", "id")
+    elif method == "tsvector":
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        query = SearchQuery(" ".join(words), config=SEARCH_CONFIG, search_type="plain")
+        rooms = rooms.annotate(search=_search_vector()).filter(search=query)
+        if ordering is None:
+            rank = SearchRank(_search_vector(), query)
+            return rooms.annotate(rank=rank).order_by("-rank", "id")
+    else:
+        condition = Q()
+        for word in words:
+            condition &= Q(description__icontains=word)
+        rooms = rooms.filter(condition)
+
+    return rooms.order_by(ordering or "id")
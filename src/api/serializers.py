@@ -1,7 +1,9 @@
-from django.db.models import Q
+from django.conf import settings
 from rest_framework import serializers
 
+from .calendars import EPOCH, LAST_DAY
 from .models import Booking, Room
+from .occupancy import MAX_BOOKING_DAYS, MAX_REPORT_DAYS
 
 
 class RoomSerializer(serializers.ModelSerializer):
@@ -48,8 +50,138 @@ class RoomCreateSerializer(serializers.Serializer):
         return Room.objects.create(**validated_data)
 
 
+def validate_booking_dates(date_start, date_end):
+    """Порядок дат и длина брони (не больше MAX_BOOKING_DAYS дней)"""
+    if date_start > date_end:
+        raise serializers.ValidationError(
+            {"date_end": "Дата окончания должна быть не раньше даты начала"}
+        )
+    if (date_end - date_start).days >= MAX_BOOKING_DAYS:
+        raise serializers.ValidationError(
+            {"date_end": f"Бронь не должна быть длиннее {MAX_BOOKING_DAYS} дней"}
+        )
+
+
+class RoomAvailabilityQuerySerializer(serializers.Serializer):
+    """Параметры поиска свободных комнат: период или список дат (dates через запятую)"""
+
+    date_start = serializers.DateField(required=False)
+    date_end = serializers.DateField(required=False)
+    dates = serializers.CharField(required=False)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+
+    def validate_dates(self, value):
+        field = serializers.DateField()
+        dates = sorted({field.to_internal_value(day.strip()) for day in value.split(",")})
+        if len(dates) > MAX_BOOKING_DAYS:
+            raise serializers.ValidationError(f"Не больше {MAX_BOOKING_DAYS} дат")
+        # Проверка только по календарям комнат (см. calendars.py)
+        if dates[0] < EPOCH or dates[-1] > LAST_DAY:
+            raise serializers.ValidationError(f"Даты должны быть в пределах {EPOCH} - {LAST_DAY}")
+        return dates
+
+    def validate(self, data):
+        if "dates" in data:
+            if "date_start" in data or "date_end" in data:
+                raise serializers.ValidationError(
+                    {"dates": "Укажите либо dates, либо date_start и date_end"}
+                )
+            return data
+        for name in ("date_start", "date_end"):
+            if name not in data:
+                raise serializers.ValidationError(
+                    {name: self.fields[name].error_messages["required"]}
+                )
+        if data["date_start"] > data["date_end"]:
+            raise serializers.ValidationError(
+                {"date_end": "Дата окончания должна быть не раньше даты начала"}
+            )
+        return data
+
+
+class RoomListQuerySerializer(serializers.Serializer):
+    """Фильтры списка комнат по цене и дате создания (границы включительно)"""
+
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    created_from = serializers.DateTimeField(required=False)
+    created_to = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        for low, high in (("min_price", "max_price"), ("created_from", "created_to")):
+            if low in data and high in data and data[low] > data[high]:
+                raise serializers.ValidationError({high: f"Должно быть не меньше {low}"})
+        return data
+
+
+class RoomSearchQuerySerializer(serializers.Serializer):
+    """Параметры полнотекстового поиска комнат"""
+
+    q = serializers.CharField(max_length=200)
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    limit = serializers.IntegerField(min_value=1, required=False)
+
+    def validate_limit(self, value):
+        max_page_size = settings.API_PAGINATION["MAX_PAGE_SIZE"]
+        if value > max_page_size:
+            raise serializers.ValidationError(f"Не больше {max_page_size}")
+        return value
+
+
+class OccupancyQuerySerializer(serializers.Serializer):
+    """Параметры отчёта по занятости (from, to, room_id)"""
+
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    room_id = serializers.IntegerField(min_value=1, required=False)
+
+    @classmethod
+    def from_query_params(cls, params):
+        # "from" - ключевое слово Python, поэтому поля называются иначе
+        names = {"from": "date_from", "to": "date_to", "room_id": "room_id"}
+        return cls(data={field: params[name] for name, field in names.items() if name in params})
+
+    def validate(self, data):
+        if data["date_from"] > data["date_to"]:
+            raise serializers.ValidationError({"to": "Дата окончания должна быть не раньше начала"})
+        if (data["date_to"] - data["date_from"]).days >= MAX_REPORT_DAYS:
+            raise serializers.ValidationError(
+                {"to": f"Период отчёта не должен превышать {MAX_REPORT_DAYS} дней"}
+            )
+        # Таблица занятости хранит только дни календаря (см. occupancy.py)
+        if data["date_from"] < EPOCH or data["date_to"] > LAST_DAY:
+            raise serializers.ValidationError(
+                {"from": f"Период отчёта должен быть в пределах {EPOCH} - {LAST_DAY}"}
+            )
+        return data
+
+
+class BookingListQuerySerializer(serializers.Serializer):
+    """Окно дат списка броней комнаты (from, to - необязательные)"""
+
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    @classmethod
+    def from_query_params(cls, params):
+        names = {"from": "date_from", "to": "date_to"}
+        return cls(data={field: params[name] for name, field in names.items() if name in params})
+
+    def validate(self, data):
+        if "date_from" in data and "date_to" in data and data["date_from"] > data["date_to"]:
+            raise serializers.ValidationError({"to": "Дата окончания должна быть не раньше начала"})
+        return data
+
+
 class BookingSerializer(serializers.ModelSerializer):
-    """Сериализатор для модели Booking"""
+    """
+    Сериализатор для модели Booking.
+
+    Брони создаются через bookings.create_booking() и bulk_create_bookings(),
+    которые проверяют пересечения под блокировкой комнаты, поэтому
+    сериализатор только представляет и проверяет данные брони.
+    """
 
     booking_id = serializers.IntegerField(source="id", read_only=True)
     room_id = serializers.IntegerField(source="room.id", read_only=True)
@@ -64,50 +196,22 @@ class BookingSerializer(serializers.ModelSerializer):
         date_start = data.get("date_start")
         date_end = data.get("date_end")
 
-        if date_start and date_end and date_start > date_end:
-            raise serializers.ValidationError(
-                {"date_end": "Дата окончания должна быть не раньше даты начала"}
-            )
+        if date_start and date_end:
+            validate_booking_dates(date_start, date_end)
 
         return data
 
-    def validate_room_overlap(self, room, date_start, date_end, exclude_id=None):
-        """Проверка пересечения дат для комнаты"""
-        overlapping_bookings = Booking.objects.filter(room=room).filter(
-            ~Q(date_end__lt=date_start) & ~Q(date_start__gt=date_end)
-        )
 
-        # Исключаем текущее бронирование при обновлении
-        if exclude_id:
-            overlapping_bookings = overlapping_bookings.exclude(id=exclude_id)
+class BookingInputSerializer(serializers.Serializer):
+    """Входные данные новой брони (bookings/create и элемент bookings/bulk_create)"""
 
-        if overlapping_bookings.exists():
-            raise serializers.ValidationError(
-                {"room_id": "Комната уже забронирована на указанные даты"}
-            )
+    room_id = serializers.IntegerField(min_value=1)
+    date_start = serializers.DateField()
+    date_end = serializers.DateField()
 
-    def create(self, validated_data):
-        """Создание бронирования с проверкой пересечений"""
-        room = validated_data["room"]
-        date_start = validated_data["date_start"]
-        date_end = validated_data["date_end"]
-
-        self.validate_room_overlap(room, date_start, date_end)
-        return Booking.objects.create(**validated_data)
-
-    def update(self, instance, validated_data):
-        """Обновление бронирования с проверкой пересечений"""
-        room = validated_data.get("room", instance.room)
-        date_start = validated_data.get("date_start", instance.date_start)
-        date_end = validated_data.get("date_end", instance.date_end)
-
-        self.validate_room_overlap(room, date_start, date_end, exclude_id=instance.id)
-
-        instance.room = room
-        instance.date_start = date_start
-        instance.date_end = date_end
-        instance.save()
-        return instance
+    def validate(self, data):
+        validate_booking_dates(data["date_start"], data["date_end"])
+        return data
 
 
 class BookingListSerializer(serializers.ModelSerializer):
@@ -0,0 +1,115 @@
+"""
+Обработчики сигналов моделей: синхронизация производных структур
+(версий кэша ответов, таблицы занятости, календарей комнат) с таблицами
+Room и Booking.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import calendars
+from .cache import ROOMS_SCOPE, bump_version, room_bookings_scope
+from .ingest import booking_queue
+from .models import Booking, Room
+from .occupancy import sync_booking, update_room_price
+from .room_cache import room_cache
+
+
+@receiver(post_save, sender=Room, dispatch_uid="cache_room_saved")
+@receiver(post_delete, sender=Room, dispatch_uid="cache_room_deleted")
+def room_changed(sender, **kwargs):
+    """Инвалидация закэшированных списков комнат"""
+    bump_version(ROOMS_SCOPE)
+
+
+@receiver(post_save, sender=Room, dispatch_uid="room_cache_saved")
+@receiver(post_delete, sender=Room, dispatch_uid="room_cache_deleted")
+def room_cache_changed(sender, instance, using, **kwargs):
+    """Сброс метаданных комнаты (повторно после фиксации транзакции)"""
+    room_id = instance.pk
+    room_cache.invalidate(room_id)
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(lambda: room_cache.invalidate(room_id), using)
+
+
+@receiver(post_save, sender=Booking, dispatch_uid="queue_booking_saved")
+@receiver(post_delete, sender=Booking, dispatch_uid="queue_booking_deleted")
+def booking_queue_changed(sender, instance, **kwargs):
+    """Очередь броней перечитает календарь комнаты при следующем приёме"""
+    booking_queue.reservations.invalidate(instance.room_id)
+
+
+@receiver(post_save, sender=Booking, dispatch_uid="cache_booking_saved")
+@receiver(post_delete, sender=Booking, dispatch_uid="cache_booking_deleted")
+def booking_changed(sender, instance, **kwargs):
+    """Инвалидация закэшированного списка броней комнаты"""
+    bump_version(room_bookings_scope(instance.room_id))
+
+
+@receiver(post_delete, sender=Room, dispatch_uid="cache_room_bookings_deleted")
+def room_bookings_deleted(sender, instance, **kwargs):
+    """После удаления комнаты её список броней должен отвечать 404"""
+    bump_version(room_bookings_scope(instance.id))
+
+
+@receiver(post_save, sender=Booking, dispatch_uid="occupancy_booking_saved")
+def booking_nights_saved(sender, instance, created, raw, **kwargs):
+    """Дни брони в таблице занятости (удаляются каскадом вместе с бронью)"""
+    if raw:
+        # loaddata: таблица перестраивается командой rebuild_occupancy
+        return
+    sync_booking(instance, created)
+
+
+@receiver(post_save, sender=Room, dispatch_uid="occupancy_room_saved")
+def room_price_changed(sender, instance, created, raw, **kwargs):
+    """Цена в днях занятости следует за ценой комнаты"""
+    if not created and not raw:
+        update_room_price(instance)
+
+
+@receiver(pre_save, sender=Booking, dispatch_uid="calendar_booking_loading")
+def booking_loading(sender, instance, raw, **kwargs):
+    """Исходные даты изменяемой брони, если она загружена не из БД целиком"""
+    if raw or instance._state.adding or hasattr(instance, "_loaded_dates"):
+        return
+    instance._loaded_dates = (
+        Booking.objects.filter(pk=instance.pk)
+        .values_list("room_id", "date_start", "date_end")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Booking, dispatch_uid="calendar_booking_saved")
+def booking_calendar_saved(sender, instance, created, raw, **kwargs):
+    """Дни брони в календаре комнаты (в транзакции записи брони)"""
+    if raw:
+        # loaddata: календари перестраиваются командой rebuild_calendars
+        return
+    if getattr(instance, "_calendar_synced", False):
+        # create_booking уже обновил календарь под своей блокировкой комнаты
+        instance._calendar_synced = False
+    else:
+        loaded = None if created else getattr(instance, "_loaded_dates", None)
+        if loaded is not None:
+            calendars.unmark(*loaded)
+        calendars.mark(instance.room_id, instance.date_start, instance.date_end)
+    instance._loaded_dates = (instance.room_id, instance.date_start, instance.date_end)
+
+
+@receiver(post_delete, sender=Booking, dispatch_uid="calendar_booking_deleted")
+def booking_calendar_deleted(sender, instance, **kwargs):
+    """Освобождение дней удалённой брони"""
+    calendars.unmark(instance.room_id, instance.date_start, instance.date_end)
+
+
+@receiver(pre_delete, sender=Room, dispatch_uid="calendar_room_deleting")
+def room_deleting(sender, instance, **kwargs):
+    """Брони удаляемой комнаты не обновляют её календарь"""
+    calendars.begin_room_delete(instance.pk)
+
+
+@receiver(post_delete, sender=Room, dispatch_uid="calendar_room_deleted")
+def room_calendar_deleted(sender, instance, **kwargs):
+    calendars.end_room_delete(instance.pk)
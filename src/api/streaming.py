@@ -0,0 +1,109 @@
+"""
+Потоковая выдача больших списков (выгрузки) без сериализаторов DRF.
+
+Строки читаются из базы порциями через ``values_list().iterator()`` и сразу
+кодируются в JSON-массив или NDJSON (см. representations.py), поэтому память
+не зависит от размера таблицы, а первый байт ответа уходит сразу после первой
+порции.
+"""
+
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from .pagination import query_params
+from .representations import encode
+
+STREAM_FORMATS = {
+    "1": "application/json",
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class _Framer:
+    """Обрамление порций строк: JSON-массив или NDJSON"""
+
+    def __init__(self, content_type):
+        self.ndjson = content_type == "application/x-ndjson"
+        self.first = True
+
+    def open(self):
+        return "" if self.ndjson else "["
+
+    def chunk(self, encoded):
+        if self.ndjson:
+            return "\n".join(encoded) + "\n"
+        prefix = "" if self.first else ","
+        self.first = False
+        return prefix + ",".join(encoded)
+
+    def close(self):
+        return "" if self.ndjson else "]"
+
+
+def _encode_rows(rows, to_dict, chunk_size, framer):
+    yield framer.open()
+    chunk = []
+    for row in rows:
+        chunk.append(encode(to_dict(row)))
+        if len(chunk) >= chunk_size:
+            yield framer.chunk(chunk)
+            chunk = []
+    if chunk:
+        yield framer.chunk(chunk)
+    yield framer.close()
+
+
+async def _aencode_rows(rows, to_dict, chunk_size, framer):
+    yield framer.open()
+    chunk = []
+    async for row in rows:
+        chunk.append(encode(to_dict(row)))
+        if len(chunk) >= chunk_size:
+            yield framer.chunk(chunk)
+            chunk = []
+    if chunk:
+        yield framer.chunk(chunk)
+    yield framer.close()
+
+
+async def _aiterate(queryset, chunk_size):
+    """
+    Асинхронная итерация по queryset порциями.
+
+    ``aiterator()`` читает порции через sync_to_async, но итератор
+    ``values_list()`` выполняет сам запрос уже при создании, то есть в event
+    loop (SynchronousOnlyOperation). Здесь и запрос, и каждая порция
+    выполняются в sync_to_async.
+    """
+    rows = queryset.iterator(chunk_size=chunk_size)
+    next_chunk = sync_to_async(lambda: list(islice(rows, chunk_size)))
+    while chunk := await next_chunk():
+        for row in chunk:
+            yield row
+
+
+def is_stream_requested(request):
+    """Запрошена ли потоковая выдача (?stream=1 или ?stream=ndjson)"""
+    return query_params(request).get("stream") in STREAM_FORMATS
+
+
+def stream_response(request, queryset, columns, to_dict):
+    """Потоковый ответ со строками queryset в формате, выбранном параметром stream"""
+    chunk_size = settings.API_STREAM_CHUNK_SIZE
+    content_type = STREAM_FORMATS[query_params(request)["stream"]]
+    rows = queryset.values_list(*columns).iterator(chunk_size=chunk_size)
+    content = _encode_rows(rows, to_dict, chunk_size, _Framer(content_type))
+    return StreamingHttpResponse(content, content_type=content_type)
+
+
+def astream_response(request, queryset, columns, to_dict):
+    """Вариант stream_response для async-представлений (асинхронный итератор ORM)"""
+    chunk_size = settings.API_STREAM_CHUNK_SIZE
+    content_type = STREAM_FORMATS[query_params(request)["stream"]]
+    rows = _aiterate(queryset.values_list(*columns), chunk_size)
+    content = _aencode_rows(rows, to_dict, chunk_size, _Framer(content_type))
+    return StreamingHttpResponse(content, content_type=content_type)
@@ -1,12 +1,17 @@
 from django.urls import path
 
 from .views import (
+    BookingBulkCreateView,
     BookingCreateView,
     BookingDeleteView,
     BookingListView,
+    BookingStatusView,
+    OccupancyView,
+    RoomAvailableView,
     RoomCreateView,
     RoomDeleteView,
     RoomListView,
+    RoomSearchView,
 )
 
 app_name = "api"
@@ -16,8 +21,14 @@ urlpatterns = [
     path("rooms/create", RoomCreateView.as_view(), name="room_create"),
     path("rooms/delete", RoomDeleteView.as_view(), name="room_delete"),
     path("rooms/list", RoomListView.as_view(), name="room_list"),
+    path("rooms/available", RoomAvailableView.as_view(), name="room_available"),
+    path("rooms/search", RoomSearchView.as_view(), name="room_search"),
     # Booking endpoints
     path("bookings/create", BookingCreateView.as_view(), name="booking_create"),
+    path("bookings/bulk_create", BookingBulkCreateView.as_view(), name="booking_bulk_create"),
     path("bookings/delete", BookingDeleteView.as_view(), name="booking_delete"),
     path("bookings/list", BookingListView.as_view(), name="booking_list"),
+    path("bookings/status", BookingStatusView.as_view(), name="booking_status"),
+    # Reports
+    path("occupancy", OccupancyView.as_view(), name="occupancy"),
 ]
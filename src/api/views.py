@@ -1,16 +1,79 @@
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from . import calendars, ingest
+from .bookings import RoomAlreadyBookedError, RoomNotFoundError, create_booking, room_bookings
+from .bulk import bulk_create_bookings
+from .cache import ROOMS_SCOPE, bump_version, cached_json_response, room_bookings_scope
+from .calendars import available_rooms, free_room_rows, free_room_rows_on
 from .models import Booking, Room
+from .occupancy import occupancy_report
+from .pagination import InvalidCursorError, KeysetPagination
+from .representations import (
+    BOOKING_COLUMNS,
+    ROOM_COLUMNS,
+    booking_to_dict,
+    encode,
+    json_response,
+    render_rows,
+    room_to_dict,
+)
+from .room_cache import room_cache
+from .rooms import delete_room, start_room_delete
+from .search import search_rooms
 from .serializers import (
-    BookingListSerializer,
-    BookingSerializer,
+    BookingInputSerializer,
+    BookingListQuerySerializer,
+    OccupancyQuerySerializer,
+    RoomAvailabilityQuerySerializer,
     RoomCreateSerializer,
-    RoomSerializer,
+    RoomListQuerySerializer,
+    RoomSearchQuerySerializer,
 )
+from .streaming import is_stream_requested, stream_response
+
+# Маппинг полей для сортировки комнат
+ROOM_SORT_FIELDS = {
+    "price": "price",
+    "created": "created_at",
+    "created_at": "created_at",
+    "id": "id",
+}
+
+# Фильтры списка комнат (параметры RoomListQuerySerializer) -> условия queryset
+ROOM_FILTERS = {
+    "min_price": "price__gte",
+    "max_price": "price__lte",
+    "created_from": "created_at__gte",
+    "created_to": "created_at__lte",
+}
+
+
+def is_flag_set(value):
+    """Булев параметр запроса: true/1/yes (JSON true или строка формы)"""
+    return str(value).lower() in ("true", "1", "yes")
+
+
+def get_room_ordering(query_params):
+    """Поле сортировки комнат по параметрам sort_by и order"""
+    field = ROOM_SORT_FIELDS.get(query_params.get("sort_by", "id"), "id")
+    if query_params.get("order", "asc") == "desc":
+        field = f"-{field}"
+    return field
+
+
+def filter_rooms(rooms, filters):
+    """
+    Комнаты в диапазонах цены и даты создания из RoomListQuerySerializer.
+
+    Диапазон по полю сортировки читается из индексов (price, id) и
+    (created_at, id) вместе с порядком строк, без сортировки результата.
+    """
+    return rooms.filter(**{ROOM_FILTERS[name]: value for name, value in filters.items()})
 
 
 class RoomCreateView(APIView):
@@ -22,6 +85,8 @@ class RoomCreateView(APIView):
         serializer = RoomCreateSerializer(data=request.data)
         if serializer.is_valid():
             room = serializer.save()
+            bump_version(ROOMS_SCOPE)
+            room_cache.invalidate(room.id)
             return Response({"room_id": room.id}, status=status.HTTP_200_OK)
         return Response({"error": str(serializer.errors)}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -36,36 +101,118 @@ class RoomDeleteView(APIView):
         if not room_id:
             return Response({"error": "room_id is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        room = get_object_or_404(Room, id=room_id)
-        room.delete()
+        try:
+            room_id = int(room_id)
+            if is_flag_set(request.data.get("background")):
+                # Брони удаляются пачками в фоне, комната - последней
+                start_room_delete(room_id)
+                return Response({"ok": True, "background": True}, status=status.HTTP_202_ACCEPTED)
+            # Брони и дни занятости удаляются запросами по room_id, без загрузки в Python
+            delete_room(room_id)
+        except (RoomNotFoundError, ValueError):
+            # Формат ответа DRF для get_object_or_404
+            return Response(
+                {"detail": "No Room matches the given query."}, status=status.HTTP_404_NOT_FOUND
+            )
         return Response({"ok": True}, status=status.HTTP_200_OK)
 
 
 class RoomListView(APIView):
-    """Список комнат с сортировкой"""
+    """Список комнат с сортировкой и фильтрами по цене и дате создания"""
+
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        query = RoomListQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response({"error": str(query.errors)}, status=status.HTTP_400_BAD_REQUEST)
+
+        filters = query.validated_data
+        ordering = get_room_ordering(request.query_params)
+        rooms = filter_rooms(Room.objects.all(), filters).order_by(ordering)
+
+        if is_stream_requested(request):
+            return stream_response(request, rooms, ROOM_COLUMNS, room_to_dict)
+
+        # Чтение без сериализатора: кортежи values_list сразу кодируются в JSON
+        rows = rooms.values_list(*ROOM_COLUMNS)
+        paginator = KeysetPagination(ordering, columns=ROOM_COLUMNS)
+        paginate = paginator.is_requested(request)
+
+        def build():
+            if not paginate:
+                return render_rows(rows, room_to_dict)
+            page = paginator.paginate_queryset(rows, request)
+            data = paginator.get_paginated_data([room_to_dict(row) for row in page])
+            return encode(data).encode()
+
+        try:
+            # Готовые байты ответа кэшируются до изменения таблицы комнат
+            key_parts = ("list", ordering, sorted(filters.items()))
+            if paginate:
+                key_parts += (paginator.get_page_size(request), request.query_params.get("cursor"))
+            return cached_json_response(request, ROOMS_SCOPE, key_parts, build)
+        except InvalidCursorError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class RoomSearchView(APIView):
+    """Полнотекстовый поиск комнат по описанию"""
 
     permission_classes = [AllowAny]
 
     def get(self, request):
-        sort_by = request.query_params.get("sort_by", "id")
-        order = request.query_params.get("order", "asc")
+        query = RoomSearchQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response({"error": str(query.errors)}, status=status.HTTP_400_BAD_REQUEST)
+
+        params = query.validated_data
+        limit = params.get("limit", settings.API_PAGINATION["DEFAULT_PAGE_SIZE"])
+        # Без sort_by результаты упорядочены по релевантности
+        ordering = None
+        if "sort_by" in request.query_params:
+            ordering = get_room_ordering(request.query_params)
+        rooms = search_rooms(
+            params["q"], params.get("min_price"), params.get("max_price"), ordering
+        )
+
+        def build():
+            return render_rows(rooms.values_list(*ROOM_COLUMNS)[:limit], room_to_dict)
+
+        key_parts = (
+            "search",
+            params["q"],
+            params.get("min_price"),
+            params.get("max_price"),
+            ordering,
+            limit,
+        )
+        return cached_json_response(request, ROOMS_SCOPE, key_parts, build)
+
+
+class RoomAvailableView(APIView):
+    """Список комнат, свободных на заданные даты"""
+
+    permission_classes = [AllowAny]
 
-        # Маппинг полей для сортировки
-        sort_field_map = {
-            "price": "price",
-            "created": "created_at",
-            "created_at": "created_at",
-            "id": "id",
-        }
+    def get(self, request):
+        query = RoomAvailabilityQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response({"error": str(query.errors)}, status=status.HTTP_400_BAD_REQUEST)
 
-        field = sort_field_map.get(sort_by, "id")
+        dates = query.validated_data.get("dates")
+        max_price = query.validated_data.get("max_price")
+        ordering = get_room_ordering(request.query_params)
 
-        if order == "desc":
-            field = f"-{field}"
+        if dates:
+            # Свободные во все даты: одна маска дней на все календари
+            rooms = available_rooms(dates[0], dates[-1], max_price).order_by(ordering)
+            return json_response(render_rows(free_room_rows_on(rooms, dates), room_to_dict))
 
-        rooms = Room.objects.all().order_by(field)
-        serializer = RoomSerializer(rooms, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        date_start = query.validated_data["date_start"]
+        date_end = query.validated_data["date_end"]
+        rooms = available_rooms(date_start, date_end, max_price).order_by(ordering)
+        return json_response(render_rows(free_room_rows(rooms, date_start, date_end), room_to_dict))
 
 
 class BookingCreateView(APIView):
@@ -86,35 +233,71 @@ class BookingCreateView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Проверка существования комнаты
+        # Только проверка формата: комната, блокировка и пересечения - в create_booking
+        serializer = BookingInputSerializer(
+            data={"room_id": room_id, "date_start": date_start, "date_end": date_end}
+        )
+        if not serializer.is_valid():
+            return Response({"error": str(serializer.errors)}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
         try:
-            room = Room.objects.get(id=room_id)
-        except Room.DoesNotExist:
+            if settings.API_BOOKING_QUEUE and calendars.covers(
+                data["date_start"], data["date_end"]
+            ):
+                # Период резервируется в памяти, запись в БД - фоновым потоком
+                token = ingest.booking_queue.submit(**data)
+                return Response(
+                    {"token": token, "status": ingest.PENDING}, status=status.HTTP_202_ACCEPTED
+                )
+            booking = create_booking(**data)
+        except RoomNotFoundError:
             return Response({"error": "room not found"}, status=status.HTTP_404_NOT_FOUND)
+        except RoomAlreadyBookedError:
+            return Response(
+                {"error": "room is already booked on given dates"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response({"booking_id": booking.id}, status=status.HTTP_200_OK)
 
-        # Подготовка данных для сериализатора
-        data = {"room": room.id, "date_start": date_start, "date_end": date_end}
 
-        serializer = BookingSerializer(data=data)
-        if serializer.is_valid():
-            try:
-                booking = serializer.save()
-                return Response({"booking_id": booking.id}, status=status.HTTP_200_OK)
-            except Exception:
-                return Response(
-                    {"error": "room is already booked on given dates"},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+class BookingStatusView(APIView):
+    """Статус брони, принятой в очередь отложенной записи"""
+
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        token = request.query_params.get("token")
+        if not token:
+            return Response({"error": "token is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        booking_status = ingest.booking_queue.status(token)
+        if booking_status is None:
+            return Response({"error": "token not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"token": token, **booking_status}, status=status.HTTP_200_OK)
+
+
+class BookingBulkCreateView(APIView):
+    """Пакетное создание бронирований"""
+
+    permission_classes = [AllowAny]
 
-        # Обработка ошибок валидации
-        errors = serializer.errors
-        if any("уже забронирована" in str(error) for error in errors.values()):
+    def post(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
             return Response(
-                {"error": "room is already booked on given dates"},
+                {"error": "a non-empty JSON array of bookings is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        max_items = settings.API_BULK_CREATE_MAX_ITEMS
+        if len(items) > max_items:
+            return Response(
+                {"error": f"at most {max_items} bookings per request"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        return Response({"error": str(errors)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(bulk_create_bookings(items), status=status.HTTP_200_OK)
 
 
 class BookingDeleteView(APIView):
@@ -129,11 +312,12 @@ class BookingDeleteView(APIView):
 
         booking = get_object_or_404(Booking, id=booking_id)
         booking.delete()
+        bump_version(room_bookings_scope(booking.room_id))
         return Response({"ok": True}, status=status.HTTP_200_OK)
 
 
 class BookingListView(APIView):
-    """Список бронирований для комнаты"""
+    """Список бронирований для комнаты (все или пересекающиеся с окном from/to)"""
 
     permission_classes = [AllowAny]
 
@@ -143,10 +327,61 @@ class BookingListView(APIView):
             return Response({"error": "room_id is required"}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            room = Room.objects.get(id=room_id)
+            room_id = int(room_id)
+        except ValueError:
+            return Response({"error": "room not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        window = BookingListQuerySerializer.from_query_params(request.query_params)
+        if not window.is_valid():
+            return Response({"error": str(window.errors)}, status=status.HTTP_400_BAD_REQUEST)
+        date_from = window.validated_data.get("date_from")
+        date_to = window.validated_data.get("date_to")
+        bookings = room_bookings(room_id, date_from, date_to)
+
+        if is_stream_requested(request):
+            if not room_cache.exists(room_id):
+                return Response({"error": "room not found"}, status=status.HTTP_404_NOT_FOUND)
+            return stream_response(request, bookings, BOOKING_COLUMNS, booking_to_dict)
+
+        rows = bookings.values_list(*BOOKING_COLUMNS)
+        paginator = KeysetPagination("date_start", columns=BOOKING_COLUMNS)
+        paginate = paginator.is_requested(request)
+
+        def build():
+            # Существование комнаты проверяется только при промахе кэша ответов
+            # (удаление комнаты меняет версию её броней) и по кэшу комнат
+            if not room_cache.exists(room_id):
+                raise Room.DoesNotExist
+            if not paginate:
+                return render_rows(rows, booking_to_dict)
+            page = paginator.paginate_queryset(rows, request)
+            data = paginator.get_paginated_data([booking_to_dict(row) for row in page])
+            return encode(data).encode()
+
+        try:
+            key_parts = ("list", date_from, date_to)
+            if paginate:
+                key_parts += (paginator.get_page_size(request), request.query_params.get("cursor"))
+            return cached_json_response(request, room_bookings_scope(room_id), key_parts, build)
+        except InvalidCursorError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
         except Room.DoesNotExist:
             return Response({"error": "room not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        bookings = Booking.objects.filter(room=room).order_by("date_start")
-        serializer = BookingListSerializer(bookings, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+
+class OccupancyView(APIView):
+    """Занятость и выручка по дням из таблицы RoomNight"""
+
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        query = OccupancyQuerySerializer.from_query_params(request.query_params)
+        if not query.is_valid():
+            return Response({"error": str(query.errors)}, status=status.HTTP_400_BAD_REQUEST)
+
+        report = occupancy_report(
+            query.validated_data["date_from"],
+            query.validated_data["date_to"],
+            room_id=query.validated_data.get("room_id"),
+        )
+        return json_response(encode(report).encode())
@@ -0,0 +1,18 @@
+"""
+Бенчмарки сервиса.
+
+Запуск: ``python src/manage.py benchmark <сценарий> [параметры]``.
+Каждый сценарий работает на отдельной временной базе данных и не требует сети.
+"""
+
+# Имя сценария -> модуль с функциями add_arguments(parser) и run(stdout, **options)
+SCENARIOS = {
+    "read_path": "benchmarks.read_path",
+    "endpoints": "benchmarks.endpoints",
+    "connections": "benchmarks.connections",
+    "sqlite_writers": "benchmarks.sqlite_writers",
+    "booking_queue": "benchmarks.booking_queue",
+    "profiles": "benchmarks.profiles",
+    "startup": "benchmarks.startup",
+    "room_list": "benchmarks.room_list",
+}
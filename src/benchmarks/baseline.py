@@ -0,0 +1,48 @@
+"""
+Сохранение результатов бенчмарка и сравнение с базовой линией.
+
+Результаты - словарь ``{транспорт: {эндпоинт: {метрика: значение}}}``.
+Регрессией считается рост задержки больше допуска или любой рост числа
+SQL-запросов на запрос.
+"""
+
+import json
+from pathlib import Path
+
+# Метрики задержки, сравниваемые с допуском
+LATENCY_METRICS = ("p50", "p95", "p99")
+
+
+def save_baseline(path, results):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+
+
+def load_baseline(path):
+    return json.loads(Path(path).read_text())
+
+
+def compare(results, baseline, tolerance, metric="p95"):
+    """Список регрессий относительно baseline (пустой, если их нет)"""
+    if metric not in LATENCY_METRICS:
+        raise ValueError(f"unknown metric: {metric}")
+
+    regressions = []
+    for transport, endpoints in results.items():
+        for endpoint, current in endpoints.items():
+            reference = baseline.get(transport, {}).get(endpoint)
+            if reference is None:
+                continue
+            name = f"{transport} {endpoint}"
+            limit = reference[metric] * (1 + tolerance)
+            if current[metric] > limit:
+                regressions.append(
+                    f"{name}: {metric} {current[metric] * 1000:.2f} ms"
+                    f" > {reference[metric] * 1000:.2f} ms (+{tolerance:.0%})"
+                )
+            if current["queries"] > reference["queries"]:
+                regressions.append(
+                    f"{name}: {current['queries']} SQL queries per request > {reference['queries']}"
+                )
+    return regressions
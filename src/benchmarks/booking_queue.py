@@ -0,0 +1,112 @@
+"""
+Приём броней: синхронная запись против очереди отложенной записи (ingest.py).
+
+Одинаковое число непересекающихся броней отправляется в POST
+/api/bookings/create сначала синхронно, затем при API_BOOKING_QUEUE=true.
+Для очереди отдельно замеряется время, за которое фоновый поток записывает
+все принятые брони в БД. Запросы идут по HTTP на локальный WSGI-сервер,
+временная база SQLite создаётся файлом: поток очереди работает со своим
+соединением.
+"""
+
+import json
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import override_settings
+
+from api import ingest
+from api.models import Booking
+
+from .common import booking_payloads, isolated_database, percentile, seed_rooms
+from .endpoints import settings_overrides
+from .transports import open_transport
+
+
+def add_arguments(parser):
+    parser.add_argument("--rooms", type=int, default=50, help="Количество комнат")
+    parser.add_argument("--requests", type=int, default=1000, help="Броней в каждом режиме")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Размер пачки записи (API_BOOKING_QUEUE_BATCH_SIZE)",
+    )
+    parser.add_argument("--no-fsync", action="store_true", help="Не вызывать fsync журнала очереди")
+    parser.add_argument("--seed", type=int, default=0, help="Seed генератора данных")
+
+
+def _post_all(transport, payloads, expected_status):
+    durations = []
+    responses = []
+    for payload in payloads:
+        started = time.perf_counter()
+        status, content, _ = transport.request("POST", "/api/bookings/create", payload)
+        durations.append(time.perf_counter() - started)
+        if status != expected_status:
+            raise CommandError(f"POST /api/bookings/create: HTTP {status} {content[:200]!r}")
+        responses.append(content)
+    return durations, responses
+
+
+def _report(stdout, label, durations):
+    stdout.write(
+        f"  {label:<16}"
+        f" p50={percentile(durations, 50) * 1000:7.3f} ms"
+        f" p95={percentile(durations, 95) * 1000:7.3f} ms"
+        f" {len(durations) / sum(durations):9.1f} req/s"
+    )
+    return len(durations) / sum(durations)
+
+
+def run(stdout, rooms, requests, batch_size, no_fsync, seed, **options):
+    with tempfile.TemporaryDirectory() as tmp:
+        name = str(Path(tmp) / "benchmark.sqlite3") if connection.vendor == "sqlite" else None
+        queue_settings = {
+            "API_BOOKING_QUEUE_BATCH_SIZE": batch_size,
+            "API_BOOKING_QUEUE_FSYNC": not no_fsync,
+        }
+        with (
+            isolated_database(name=name),
+            override_settings(**settings_overrides(True), **queue_settings),
+        ):
+            stdout.write(f"{connection.vendor}: {rooms} комнат, {requests} броней в режиме")
+            room_ids = seed_rooms(rooms, seed=seed)
+            # Разные периоды для режимов: брони не пересекаются между замерами
+            days = -(-requests // rooms)
+            sync_payloads = booking_payloads(room_ids, requests, date(2024, 1, 1))
+            queued_payloads = booking_payloads(
+                room_ids, requests, date(2024, 1, 1) + timedelta(days)
+            )
+
+            queue = ingest.BookingQueue(spool_path=str(Path(tmp) / "spool.jsonl"))
+            with open_transport("wsgi") as transport:
+                with override_settings(API_BOOKING_QUEUE=False):
+                    durations, _ = _post_all(transport, sync_payloads, 200)
+                sync_rps = _report(stdout, "sync", durations)
+
+                with (
+                    override_settings(API_BOOKING_QUEUE=True),
+                    mock.patch.object(ingest, "booking_queue", queue),
+                ):
+                    durations, responses = _post_all(transport, queued_payloads, 202)
+                    started = time.perf_counter()
+                    queue.join()
+                    drain = time.perf_counter() - started
+                    queue.stop()
+                queued_rps = _report(stdout, "queued", durations)
+                stdout.write(
+                    f"  {'drain':<16} {drain * 1000:.1f} ms после последнего принятого запроса"
+                )
+
+            tokens = [json.loads(content)["token"] for content in responses]
+            created = sum(queue.status(token)["status"] == ingest.CREATED for token in tokens)
+            if created != requests or Booking.objects.count() != 2 * requests:
+                raise CommandError(f"Очередь записала {created} из {requests} броней")
+
+    stdout.write(f"Приём через очередь быстрее синхронного в {queued_rps / sync_rps:.1f} раз")
@@ -0,0 +1,105 @@
+"""Общие инструменты бенчмарков: временная БД, генерация данных, замеры"""
+
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+
+
+@contextmanager
+def isolated_database(verbosity=0, name=None):
+    """
+    Временная база данных (как у тестов), удаляется после замеров.
+
+    name - имя временной базы вместо тестового по умолчанию (для SQLite -
+    путь к файлу вместо базы в памяти).
+    """
+    test_settings = connection.settings_dict["TEST"]
+    if name is not None:
+        connection.settings_dict["TEST"] = {**test_settings, "NAME": name}
+    try:
+        old_name = connection.creation.create_test_db(
+            verbosity=verbosity, autoclobber=True, serialize=False
+        )
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity)
+    finally:
+        connection.settings_dict["TEST"] = test_settings
+
+
+def seed_rooms(count, seed=0, batch_size=2000):
+    """Детерминированное создание комнат, возвращает их id"""
+    from api.models import Room
+
+    rng = random.Random(seed)
+    rooms = [
+        Room(
+            description=f"Room {i} {rng.choice(['sea view', 'city view', 'suite', 'standard'])}",
+            price=Decimal(rng.randrange(5000, 50000)) / 100,
+        )
+        for i in range(count)
+    ]
+    Room.objects.bulk_create(rooms, batch_size=batch_size)
+    return list(Room.objects.order_by("id").values_list("id", flat=True))
+
+
+def seed_bookings(room_ids, per_room, seed=0, start=date(2020, 1, 1), batch_size=5000):
+    """
+    Детерминированное создание непересекающихся броней для каждой комнаты.
+
+    bulk_create не отправляет сигналы, поэтому таблица занятости и календари
+    комнат перестраиваются после вставки.
+    """
+    from api import calendars, occupancy
+    from api.models import Booking
+
+    rng = random.Random(seed)
+    batch = []
+    for room_id in room_ids:
+        day = start
+        for _ in range(per_room):
+            day += timedelta(days=rng.randint(0, 5))
+            length = rng.randint(1, 7)
+            batch.append(Booking(room_id=room_id, date_start=day, date_end=day + timedelta(length)))
+            day += timedelta(days=length + 1)
+            if len(batch) >= batch_size:
+                Booking.objects.bulk_create(batch)
+                batch = []
+    if batch:
+        Booking.objects.bulk_create(batch)
+    occupancy.rebuild(batch_size=batch_size)
+    calendars.rebuild(room_ids)
+
+
+def booking_payloads(room_ids, count, start):
+    """Тела запросов bookings/create: непересекающиеся однодневные брони по всем комнатам"""
+    return [
+        {
+            "room_id": room_ids[i % len(room_ids)],
+            "date_start": (day := start + timedelta(days=i // len(room_ids))).isoformat(),
+            "date_end": day.isoformat(),
+        }
+        for i in range(count)
+    ]
+
+
+def measure(func, repeat):
+    """Длительности repeat вызовов func в секундах"""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def percentile(durations, p):
+    """Перцентиль p (0-100) по методу ближайшего ранга"""
+    ordered = sorted(durations)
+    index = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
@@ -0,0 +1,146 @@
+"""
+Накладные расходы на соединение с БД: новое соединение на каждый запрос против постоянных.
+
+Режимы: ``per-request`` (CONN_MAX_AGE=0), ``persistent`` (CONN_MAX_AGE без
+ограничения), ``health-checks`` (то же с CONN_HEALTH_CHECKS) и ``pool``
+(пул psycopg 3, только для PostgreSQL с установленным psycopg-pool).
+
+Замеры идут на базе из настроек: SQLite по умолчанию или PostgreSQL
+(USE_POSTGRESQL=true / DATABASE_URL=postgres://...). Временная база SQLite
+создаётся файлом: соединение с базой в памяти Django не закрывает.
+Запросы идут по HTTP на локальный WSGI-сервер: тестовые клиенты Django
+отключают закрытие соединений по окончании запроса.
+"""
+
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import override_settings
+
+from .common import isolated_database, percentile, seed_bookings, seed_rooms
+from .endpoints import settings_overrides
+from .transports import open_transport
+
+MODES = {
+    "per-request": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+    "persistent": {"CONN_MAX_AGE": None, "CONN_HEALTH_CHECKS": False},
+    "health-checks": {"CONN_MAX_AGE": None, "CONN_HEALTH_CHECKS": True},
+    "pool": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+}
+
+
+def add_arguments(parser):
+    parser.add_argument("--rooms", type=int, default=100, help="Количество комнат")
+    parser.add_argument("--bookings", type=int, default=20, help="Броней в каждой комнате")
+    parser.add_argument("--requests", type=int, default=500, help="Запросов в каждом режиме")
+    parser.add_argument(
+        "--mode",
+        dest="modes",
+        action="append",
+        choices=list(MODES),
+        help="Режим соединений (можно указать несколько раз, по умолчанию все доступные)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed генератора данных")
+
+
+def _pool_available():
+    if connection.vendor != "postgresql":
+        return False
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        return False
+    return is_psycopg3
+
+
+class _ConnectionCounter:
+    """Число новых соединений (сигнал connection_created)"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, sender, connection, **kwargs):
+        self.count += 1
+
+
+@contextmanager
+def _connection_mode(mode):
+    """Настройки соединения режима на время замеров (соединение переоткрывается)"""
+    saved = dict(connection.settings_dict)
+    connection.close()
+    connection.settings_dict.update(MODES[mode])
+    if mode == "pool":
+        connection.settings_dict["OPTIONS"] = {**saved["OPTIONS"], "pool": True}
+    try:
+        yield
+    finally:
+        connection.close()
+        if mode == "pool":
+            connection.close_pool()
+        connection.settings_dict.clear()
+        connection.settings_dict.update(saved)
+
+
+def _measure(transport, paths):
+    durations = []
+    for path in paths:
+        started = time.perf_counter()
+        status, content, _ = transport.request("GET", path)
+        durations.append(time.perf_counter() - started)
+        if status != 200:
+            raise CommandError(f"GET {path}: HTTP {status} {content[:200]!r}")
+    return durations
+
+
+def run(stdout, rooms, bookings, requests, modes, seed, **options):
+    if modes is None:
+        modes = [mode for mode in MODES if mode != "pool" or _pool_available()]
+    elif "pool" in modes and not _pool_available():
+        raise CommandError("Режим pool требует PostgreSQL и psycopg 3 с psycopg-pool")
+
+    counter = _ConnectionCounter()
+    with tempfile.TemporaryDirectory() as tmp:
+        name = str(Path(tmp) / "benchmark.sqlite3") if connection.vendor == "sqlite" else None
+        # Кэш ответов отключён: каждый запрос обращается к БД
+        with isolated_database(name=name), override_settings(**settings_overrides(True)):
+            stdout.write(f"{connection.vendor}: {rooms} комнат, {rooms * bookings} броней")
+            room_ids = seed_rooms(rooms, seed=seed)
+            seed_bookings(room_ids, bookings, seed=seed)
+            paths = [
+                f"/api/bookings/list?room_id={room_ids[i % len(room_ids)]}" for i in range(requests)
+            ]
+
+            results = {}
+            connection_created.connect(counter)
+            try:
+                for mode in modes:
+                    with _connection_mode(mode), open_transport("wsgi") as client:
+                        # Первый запрос открывает соединение (и пул) вне замеров
+                        _measure(client, paths[:1])
+                        counter.count = 0
+                        durations = _measure(client, paths)
+                    results[mode] = percentile(durations, 50)
+                    stdout.write(
+                        f"  {mode:<14}"
+                        f" p50={percentile(durations, 50) * 1000:7.3f} ms"
+                        f" p95={percentile(durations, 95) * 1000:7.3f} ms"
+                        f" {len(durations) / sum(durations):9.1f} req/s"
+                        f"  соединений открыто: {counter.count}"
+                    )
+            finally:
+                connection_created.disconnect(counter)
+
+    if "per-request" in results:
+        for mode, p50 in results.items():
+            if mode != "per-request":
+                overhead = (results["per-request"] - p50) * 1000
+                stdout.write(
+                    f"Экономия {mode} против per-request: {overhead:.3f} ms на запрос (p50)"
+                )
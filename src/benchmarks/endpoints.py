@@ -0,0 +1,215 @@
+"""
+Нагрузочный бенчмарк всех эндпоинтов API: задержки, пропускная способность, SQL-запросы.
+
+Данные генерируются детерминированно (``--seed``), запросы отправляются
+тестовым клиентом, через ASGI-обработчик или по HTTP на локальный
+WSGI-сервер (см. transports.py). Результаты можно сохранить как базовую
+линию и сравнивать с ней в CI: при регрессии команда завершается с ошибкой.
+"""
+
+import json
+import random
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.test import override_settings
+
+from api.cache import get_cache
+
+from .baseline import LATENCY_METRICS, compare, load_baseline, save_baseline
+from .common import isolated_database, percentile, seed_bookings, seed_rooms
+from .transports import TRANSPORTS, open_transport
+
+# Порядок важен: брони создаются в новых комнатах и удаляются раньше них
+ENDPOINTS = (
+    "rooms/create",
+    "bookings/create",
+    "rooms/list",
+    "bookings/list",
+    "occupancy",
+    "bookings/delete",
+    "rooms/delete",
+)
+
+ROOM_ORDERINGS = (
+    "",
+    "?sort_by=price&order=asc",
+    "?sort_by=price&order=desc",
+    "?sort_by=created_at&order=desc",
+)
+
+# Новые брони ставятся после всех сгенерированных, чтобы не было пересечений
+FUTURE = date(2100, 1, 1)
+
+
+def add_arguments(parser):
+    parser.add_argument("--rooms", type=int, default=10_000, help="Количество комнат")
+    parser.add_argument(
+        "--bookings", type=int, default=100, help="Броней в каждой комнате (10k x 100 = 1M)"
+    )
+    parser.add_argument("--requests", type=int, default=200, help="Запросов к каждому эндпоинту")
+    parser.add_argument(
+        "--transport",
+        dest="transports",
+        action="append",
+        choices=sorted(TRANSPORTS),
+        help="Транспорт (можно указать несколько раз, по умолчанию все)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed генератора данных и запросов")
+    parser.add_argument("--no-cache", action="store_true", help="Отключить кэш ответов API")
+    parser.add_argument("--baseline", help="JSON базовой линии для сравнения")
+    parser.add_argument("--save-baseline", help="Сохранить результаты в JSON")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="Допустимый рост задержки (доля)"
+    )
+    parser.add_argument(
+        "--metric", default="p95", choices=LATENCY_METRICS, help="Метрика для сравнения"
+    )
+
+
+class _Workload:
+    """Последовательность запросов к эндпоинтам на одном транспорте"""
+
+    def __init__(self, transport, room_ids, count, seed):
+        self.transport = transport
+        self.room_ids = room_ids
+        self.count = count
+        self.rng = random.Random(seed)
+        self.new_rooms = []
+        self.new_bookings = []
+
+    def _call(self, endpoint, method, path, data=None):
+        status, content, queries = self.transport.request(method, f"/api/{path}", data)
+        if status != 200:
+            raise CommandError(f"{self.transport.name} {endpoint}: HTTP {status} {content[:200]!r}")
+        return content, queries
+
+    def requests(self, endpoint):
+        """Итератор вызовов эндпоинта: каждый элемент - функция без аргументов"""
+        rng = self.rng
+        for i in range(self.count):
+            if endpoint == "rooms/create":
+                data = {"text": f"Benchmark room {i}", "price": rng.randrange(50, 500)}
+                yield lambda data=data: self._create_room(data)
+            elif endpoint == "bookings/create":
+                room_id = self.new_rooms[i % len(self.new_rooms)]
+                day = FUTURE + timedelta(days=3 * i)
+                data = {
+                    "room_id": room_id,
+                    "date_start": day.isoformat(),
+                    "date_end": (day + timedelta(days=1)).isoformat(),
+                }
+                yield lambda data=data: self._create_booking(data)
+            elif endpoint == "rooms/list":
+                path = "rooms/list" + ROOM_ORDERINGS[i % len(ROOM_ORDERINGS)]
+                yield lambda path=path: self._call(endpoint, "GET", path)[1]
+            elif endpoint == "bookings/list":
+                path = f"bookings/list?room_id={rng.choice(self.room_ids)}"
+                yield lambda path=path: self._call(endpoint, "GET", path)[1]
+            elif endpoint == "occupancy":
+                # Отчёт за месяц внутри периода сгенерированных броней
+                month = rng.randrange(1, 13)
+                path = f"occupancy?from=2020-{month:02d}-01&to=2020-{month:02d}-28"
+                yield lambda path=path: self._call(endpoint, "GET", path)[1]
+            elif endpoint == "bookings/delete":
+                data = {"booking_id": self.new_bookings[i]}
+                yield lambda data=data: self._call(endpoint, "POST", "bookings/delete", data)[1]
+            elif endpoint == "rooms/delete":
+                data = {"room_id": self.new_rooms[i]}
+                yield lambda data=data: self._call(endpoint, "POST", "rooms/delete", data)[1]
+
+    def _create_room(self, data):
+        content, queries = self._call("rooms/create", "POST", "rooms/create", data)
+        self.new_rooms.append(_json_id(content, "room_id"))
+        return queries
+
+    def _create_booking(self, data):
+        content, queries = self._call("bookings/create", "POST", "bookings/create", data)
+        self.new_bookings.append(_json_id(content, "booking_id"))
+        return queries
+
+
+def _json_id(content, key):
+    return json.loads(content)[key]
+
+
+def _measure(calls):
+    durations = []
+    queries = []
+    for call in calls:
+        started = time.perf_counter()
+        queries.append(call())
+        durations.append(time.perf_counter() - started)
+    return durations, queries
+
+
+def _summary(durations, queries):
+    return {
+        "p50": percentile(durations, 50),
+        "p95": percentile(durations, 95),
+        "p99": percentile(durations, 99),
+        "rps": len(durations) / sum(durations),
+        "queries": max(queries),
+    }
+
+
+def _report(stdout, endpoint, summary):
+    stdout.write(
+        f"  {endpoint:<16}"
+        f" p50={summary['p50'] * 1000:8.2f} ms"
+        f" p95={summary['p95'] * 1000:8.2f} ms"
+        f" p99={summary['p99'] * 1000:8.2f} ms"
+        f" {summary['rps']:9.1f} req/s"
+        f"  queries={summary['queries']}"
+    )
+
+
+def settings_overrides(no_cache):
+    """Настройки замеров: без DEBUG (журнал SQL) и, по желанию, без кэша ответов"""
+    overrides = {
+        "DEBUG": False,
+        "ALLOWED_HOSTS": [*settings.ALLOWED_HOSTS, "testserver"],
+    }
+    if no_cache:
+        overrides["CACHES"] = {
+            **settings.CACHES,
+            "benchmark": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+        }
+        overrides["API_CACHE_ALIAS"] = "benchmark"
+    return overrides
+
+
+def run(stdout, rooms, bookings, requests, transports, seed, no_cache, **options):
+    transports = transports or list(TRANSPORTS)
+    results = {}
+
+    with isolated_database(), override_settings(**settings_overrides(no_cache)):
+        stdout.write(f"Генерация данных: {rooms} комнат, {rooms * bookings} броней")
+        room_ids = seed_rooms(rooms, seed=seed)
+        seed_bookings(room_ids, bookings, seed=seed)
+
+        for name in transports:
+            stdout.write(f"{name}: {requests} запросов на эндпоинт")
+            results[name] = {}
+            # Каждый транспорт начинает с пустым кэшем ответов
+            get_cache().clear()
+            with open_transport(name) as transport:
+                workload = _Workload(transport, room_ids, requests, seed)
+                for endpoint in ENDPOINTS:
+                    summary = _summary(*_measure(workload.requests(endpoint)))
+                    results[name][endpoint] = summary
+                    _report(stdout, endpoint, summary)
+
+    if options["save_baseline"]:
+        save_baseline(options["save_baseline"], results)
+        stdout.write(f"Базовая линия сохранена: {options['save_baseline']}")
+
+    if options["baseline"]:
+        regressions = compare(
+            results, load_baseline(options["baseline"]), options["tolerance"], options["metric"]
+        )
+        if regressions:
+            raise CommandError("Регрессии производительности:\n" + "\n".join(regressions))
+        stdout.write("Регрессий относительно базовой линии нет")
@@ -0,0 +1,107 @@
+"""
+Накладные расходы middleware на запрос: профиль по умолчанию против профиля "api".
+
+Профиль по умолчанию (hotel_booking.settings) проводит каждый запрос через
+middleware сессий, CSRF, аутентификации, сообщений и X-Frame-Options,
+профиль "api" (hotel_booking.settings_api) - только через SecurityMiddleware
+и CommonMiddleware, без аутентификации DRF и URL админки. В одном процессе
+профили различаются MIDDLEWARE, ROOT_URLCONF и REST_FRAMEWORK; набор
+INSTALLED_APPS влияет на запуск процесса, а не на обработку запроса.
+
+Замеряются GET /api/rooms/list (ответ из кэша: время запроса - в основном
+накладные расходы фреймворка) и POST /api/bookings/create; профили
+чередуются по раундам, чтобы фоновые колебания нагрузки влияли на них
+одинаково.
+"""
+
+import importlib
+import time
+from datetime import date
+
+from django.core.management.base import CommandError
+from django.test import override_settings
+
+from .common import booking_payloads, isolated_database, percentile, seed_rooms
+from .endpoints import settings_overrides
+from .transports import TRANSPORTS, open_transport
+
+PROFILES = {
+    "default": "hotel_booking.settings",
+    "api": "hotel_booking.settings_api",
+}
+
+# Настройки, которыми профили различаются на пути обработки запроса
+PROFILE_SETTINGS = ("MIDDLEWARE", "ROOT_URLCONF", "REST_FRAMEWORK")
+
+
+def add_arguments(parser):
+    parser.add_argument("--rooms", type=int, default=10, help="Количество комнат")
+    parser.add_argument("--requests", type=int, default=1000, help="Запросов на эндпоинт")
+    parser.add_argument("--rounds", type=int, default=10, help="Раундов чередования профилей")
+    parser.add_argument(
+        "--transport", choices=list(TRANSPORTS), default="client", help="Способ вызова"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed генератора данных")
+
+
+def profile_settings(profile):
+    """Значения PROFILE_SETTINGS из модуля настроек профиля"""
+    module = importlib.import_module(PROFILES[profile])
+    return {name: getattr(module, name) for name in PROFILE_SETTINGS}
+
+
+def _measure(transport, method, path, payloads, expected_status):
+    durations = []
+    for payload in payloads:
+        started = time.perf_counter()
+        status, content, _ = transport.request(method, path, payload)
+        durations.append(time.perf_counter() - started)
+        if status != expected_status:
+            raise CommandError(f"{method} {path}: HTTP {status} {content[:200]!r}")
+    return durations
+
+
+def run(stdout, rooms, requests, rounds, transport, seed, **options):
+    per_round = max(requests // rounds, 1)
+    durations = {(profile, endpoint): [] for profile in PROFILES for endpoint in ("list", "create")}
+
+    with isolated_database(), override_settings(**settings_overrides(False)):
+        stdout.write(f"{transport}: {rooms} комнат, {per_round * rounds} запросов на эндпоинт")
+        room_ids = seed_rooms(rooms, seed=seed)
+        # Свой непересекающийся набор броней для каждого раунда и профиля
+        payloads = booking_payloads(room_ids, per_round * rounds * len(PROFILES), date(2024, 1, 1))
+
+        for round_number in range(rounds):
+            for index, profile in enumerate(PROFILES):
+                chunk = (round_number * len(PROFILES) + index) * per_round
+                with (
+                    override_settings(**profile_settings(profile)),
+                    open_transport(transport) as client,
+                ):
+                    # Первый запрос загружает middleware и URL-конфигурацию вне замеров
+                    _measure(client, "GET", "/api/rooms/list", [None], 200)
+                    durations[profile, "list"] += _measure(
+                        client, "GET", "/api/rooms/list", [None] * per_round, 200
+                    )
+                    durations[profile, "create"] += _measure(
+                        client,
+                        "POST",
+                        "/api/bookings/create",
+                        payloads[chunk : chunk + per_round],
+                        200,
+                    )
+
+    for endpoint, label in (("list", "GET rooms/list"), ("create", "POST bookings/create")):
+        stdout.write(label)
+        for profile in PROFILES:
+            values = durations[profile, endpoint]
+            stdout.write(
+                f"  {profile:<8}"
+                f" p50={percentile(values, 50) * 1000:7.3f} ms"
+                f" p95={percentile(values, 95) * 1000:7.3f} ms"
+                f" {len(values) / sum(values):9.1f} req/s"
+            )
+        saved = percentile(durations["default", endpoint], 50) - percentile(
+            durations["api", endpoint], 50
+        )
+        stdout.write(f"  экономия профиля api: {saved * 1_000_000:.1f} мкс на запрос (p50)")
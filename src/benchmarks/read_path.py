@@ -0,0 +1,75 @@
+"""
+Сравнение пути чтения списков: сериализаторы DRF против values_list + JSON.
+
+Старый путь: ``RoomSerializer(many=True).data`` + ``JSONRenderer``.
+Новый путь: кортежи ``values_list()`` в ``room_to_dict`` и готовый кодировщик.
+"""
+
+from rest_framework.renderers import JSONRenderer
+
+from api.models import Booking, Room
+from api.representations import (
+    BOOKING_COLUMNS,
+    ROOM_COLUMNS,
+    booking_to_dict,
+    render_rows,
+    room_to_dict,
+)
+from api.serializers import BookingListSerializer, RoomSerializer
+
+from .common import isolated_database, measure, percentile, seed_bookings, seed_rooms
+
+
+def add_arguments(parser):
+    parser.add_argument("--rooms", type=int, default=5000, help="Количество комнат")
+    parser.add_argument("--bookings", type=int, default=2000, help="Броней в одной комнате")
+    parser.add_argument("--repeat", type=int, default=20, help="Повторов каждого замера")
+    parser.add_argument("--seed", type=int, default=0, help="Seed генератора данных")
+
+
+def _report(stdout, name, rows, durations):
+    p50 = percentile(durations, 50)
+    stdout.write(
+        f"  {name:<12} p50={p50 * 1000:8.2f} ms  p95={percentile(durations, 95) * 1000:8.2f} ms"
+        f"  {rows / p50:12.0f} rows/s"
+    )
+    return p50
+
+
+def _check_same(title, serializer_path, fast_path):
+    if serializer_path() != fast_path():
+        raise AssertionError(f"{title}: ответы старого и нового пути различаются")
+
+
+def run(stdout, rooms, bookings, repeat, seed, **options):
+    renderer = JSONRenderer()
+
+    with isolated_database():
+        room_ids = seed_rooms(rooms, seed=seed)
+        seed_bookings(room_ids[:1], bookings, seed=seed)
+        room_id = room_ids[0]
+
+        def rooms_serializer():
+            return renderer.render(RoomSerializer(Room.objects.order_by("id"), many=True).data)
+
+        def rooms_fast():
+            rows = Room.objects.order_by("id").values_list(*ROOM_COLUMNS)
+            return render_rows(rows, room_to_dict)
+
+        def bookings_serializer():
+            queryset = Booking.objects.filter(room_id=room_id).order_by("date_start")
+            return renderer.render(BookingListSerializer(queryset, many=True).data)
+
+        def bookings_fast():
+            queryset = Booking.objects.filter(room_id=room_id).order_by("date_start")
+            return render_rows(queryset.values_list(*BOOKING_COLUMNS), booking_to_dict)
+
+        for title, rows, serializer_path, fast_path in (
+            ("rooms/list", rooms, rooms_serializer, rooms_fast),
+            ("bookings/list", bookings, bookings_serializer, bookings_fast),
+        ):
+            _check_same(title, serializer_path, fast_path)
+            stdout.write(f"{title} ({rows} строк)")
+            old = _report(stdout, "serializer", rows, measure(serializer_path, repeat))
+            new = _report(stdout, "values_list", rows, measure(fast_path, repeat))
+            stdout.write(f"  speedup x{old / new:.2f}")
@@ -0,0 +1,136 @@
+"""
+Сортировка и фильтры rooms/list с индексами (price, id), (created_at, id) и без них.
+
+Для каждого случая замеряются запросы первой страницы keyset-пагинации и
+глубокой страницы с курсором на DEEP_PAGE всего списка (как в RoomListView,
+без кэша ответов) и проверяется план: порядок строк должен браться из
+индекса, без отдельной сортировки (``USE TEMP B-TREE`` в SQLite, узел
+``Sort`` в PostgreSQL), а страница с курсором - читаться диапазоном индекса
+с позиции курсора, а не с его начала. Затем индексы удаляются, и замеры
+повторяются.
+"""
+
+import random
+import re
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+from django.db import connection
+
+from api.models import Room
+from api.pagination import KeysetPagination, encode_cursor
+from api.representations import ROOM_COLUMNS
+from api.views import filter_rooms
+
+from .common import isolated_database, measure, percentile, seed_rooms
+
+CREATED_START = datetime(2024, 1, 1, tzinfo=UTC)
+
+# Позиция строки курсора глубокой страницы (доля отфильтрованного списка)
+DEEP_PAGE = 0.95
+
+# Название, сортировка rooms/list и фильтры RoomListQuerySerializer
+CASES = (
+    ("price asc", "price", {}),
+    ("price desc", "-price", {}),
+    ("created desc", "-created_at", {}),
+    ("price range", "price", {"min_price": Decimal("100"), "max_price": Decimal("120")}),
+    (
+        "created range",
+        "created_at",
+        {
+            "created_from": CREATED_START + timedelta(days=30),
+            "created_to": CREATED_START + timedelta(days=31),
+        },
+    ),
+)
+
+
+def add_arguments(parser):
+    parser.add_argument("--rooms", type=int, default=100_000, help="Количество комнат")
+    parser.add_argument("--page-size", type=int, default=50, help="Размер страницы")
+    parser.add_argument("--repeat", type=int, default=20, help="Повторов каждого замера")
+    parser.add_argument("--seed", type=int, default=0, help="Seed генератора данных")
+
+
+def _spread_created_at(room_ids, seed, batch_size=5000):
+    """Даты создания в пределах года: bulk_create ставит всем комнатам одно время"""
+    rng = random.Random(seed)
+    minutes = 365 * 24 * 60
+    for i in range(0, len(room_ids), batch_size):
+        rooms = [
+            Room(pk=room_id, created_at=CREATED_START + timedelta(minutes=rng.randrange(minutes)))
+            for room_id in room_ids[i : i + batch_size]
+        ]
+        Room.objects.bulk_update(rooms, ["created_at"])
+
+
+def page_query(ordering, filters, page_size, cursor=None):
+    """Запрос страницы rooms/list: первой или следующей за курсором"""
+    paginator = KeysetPagination(ordering)
+    rooms = filter_rooms(Room.objects.all(), filters).order_by(*paginator.ordering)
+    if cursor is not None:
+        rooms = paginator.after_cursor(rooms, cursor)
+    return rooms.values_list(*ROOM_COLUMNS)[: page_size + 1]
+
+
+def deep_cursor(ordering, filters, depth=DEEP_PAGE):
+    """Курсор строки на доле depth отфильтрованного списка или None, если он пуст"""
+    paginator = KeysetPagination(ordering)
+    rooms = filter_rooms(Room.objects.all(), filters).order_by(*paginator.ordering)
+    keys = rooms.values_list(paginator.field, "id")
+    count = keys.count()
+    if not count:
+        return None
+    return encode_cursor(*keys[int((count - 1) * depth)])
+
+
+def uses_sort(plan):
+    """Есть ли в плане запроса отдельная сортировка строк"""
+    return "TEMP B-TREE" in plan or re.search(r"\bSort\b", plan) is not None
+
+
+def reads_index_range(plan):
+    """Читает ли запрос индекс диапазоном по условию, а не целиком с начала"""
+    if "Index Cond" in plan:
+        return True
+    return "SEARCH" in plan and "SCAN" not in plan
+
+
+def _run_cases(stdout, page_size, repeat):
+    results = {}
+    for name, ordering, filters in CASES:
+        cursor = deep_cursor(ordering, filters)
+        for page, page_cursor in (("first", None), ("deep", cursor)):
+            rows = page_query(ordering, filters, page_size, page_cursor)
+            plan = rows.explain()
+            durations = measure(lambda rows=rows: list(rows.all()), repeat)
+            key = f"{name}, {page}"
+            results[key] = percentile(durations, 50)
+            stdout.write(
+                f"  {key:<21} p50={results[key] * 1000:8.3f} ms"
+                f"  p95={percentile(durations, 95) * 1000:8.3f} ms"
+                f"  {'sort' if uses_sort(plan) else 'index order'}"
+                f"  {'index range' if reads_index_range(plan) else 'scan'}"
+            )
+    return results
+
+
+def run(stdout, rooms, page_size, repeat, seed, **options):
+    with isolated_database():
+        room_ids = seed_rooms(rooms, seed=seed)
+        _spread_created_at(room_ids, seed)
+
+        stdout.write(f"rooms/list, {rooms} комнат, страница {page_size}")
+        stdout.write("с индексами (price, id), (created_at, id):")
+        indexed = _run_cases(stdout, page_size, repeat)
+
+        with connection.schema_editor() as schema_editor:
+            for index in Room._meta.indexes:
+                schema_editor.remove_index(Room, index)
+        stdout.write("без индексов:")
+        plain = _run_cases(stdout, page_size, repeat)
+
+        stdout.write("ускорение:")
+        for name in indexed:
+            stdout.write(f"  {name:<21} x{plain[name] / indexed[name]:.1f}")
@@ -0,0 +1,179 @@
+"""
+Параллельная запись броней в SQLite несколькими процессами.
+
+Каждый воркер - отдельный процесс со своим соединением, как воркеры
+gunicorn. Половина попыток - уникальные даты, половина - одни и те же
+даты комнаты у всех воркеров (бронь должна достаться ровно одному).
+Профили соединения:
+
+- ``tuned`` - настройки проекта (WAL, synchronous=NORMAL, busy_timeout,
+  BEGIN IMMEDIATE, см. hotel_booking/config.py);
+- ``default`` - умолчания Django и SQLite (журнал отката, отложенные
+  транзакции): повышение блокировки чтения до записи даёт
+  "database is locked" без ожидания.
+
+Сценарий завершается с ошибкой, если брони пересеклись или профиль tuned
+получил ошибки блокировки.
+"""
+
+import multiprocessing
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.core.management.base import CommandError
+from django.db import OperationalError, connection
+
+from hotel_booking.config import get_sqlite_options
+
+from .common import isolated_database
+
+PROFILES = ("tuned", "default")
+
+# Даты броней сценария: после всех сгенерированных данных
+FUTURE = date(2100, 1, 1)
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--workers",
+        dest="worker_counts",
+        type=int,
+        action="append",
+        help="Число процессов (можно указать несколько раз, по умолчанию 1, 2, 4, 8)",
+    )
+    parser.add_argument("--bookings", type=int, default=200, help="Попыток брони на воркер")
+    parser.add_argument("--rooms", type=int, default=10, help="Комнат в каждом прогоне")
+    parser.add_argument(
+        "--profile",
+        dest="profiles",
+        action="append",
+        choices=PROFILES,
+        help="Профиль соединения (можно указать несколько раз, по умолчанию оба)",
+    )
+
+
+def _profile_options(profile):
+    if profile == "tuned":
+        return get_sqlite_options()
+    return {}
+
+
+def _worker(options, room_ids, workers, worker, count, barrier, results):
+    from api.bookings import RoomAlreadyBookedError, create_booking
+
+    connection.settings_dict["OPTIONS"] = options
+    connection.ensure_connection()
+    barrier.wait()
+
+    created = rejected = locked = 0
+    started = time.perf_counter()
+    for i in range(count):
+        if i % 2 == 0:
+            # Общий период комнаты: его пытаются забронировать все воркеры
+            offset = 2 * i
+        else:
+            offset = 2 * (count + i * workers + worker)
+        day = FUTURE + timedelta(days=offset)
+        try:
+            create_booking(room_ids[i % len(room_ids)], day, day + timedelta(days=1))
+            created += 1
+        except RoomAlreadyBookedError:
+            rejected += 1
+        except OperationalError:
+            locked += 1
+    results.put((created, rejected, locked, time.perf_counter() - started))
+    connection.close()
+
+
+def _new_rooms(count):
+    from api.models import Room
+
+    rooms = Room.objects.bulk_create(
+        [Room(description=f"Writers room {i}", price=100) for i in range(count)]
+    )
+    return [room.pk for room in rooms]
+
+
+def _overlaps(room_ids):
+    from api.models import Booking
+
+    rows = Booking.objects.filter(room_id__in=room_ids).order_by("room_id", "date_start")
+    overlaps = 0
+    previous = None
+    for room_id, date_start, date_end in rows.values_list("room_id", "date_start", "date_end"):
+        if previous is not None and previous[0] == room_id and date_start <= previous[1]:
+            overlaps += 1
+        previous = (room_id, date_end)
+    return overlaps
+
+
+def _run_profile(context, profile, workers, count, rooms):
+    room_ids = _new_rooms(rooms)
+    options = _profile_options(profile)
+    with connection.cursor() as cursor:
+        # Режим журнала хранится в файле базы: переключаем до запуска воркеров
+        cursor.execute("PRAGMA journal_mode=" + ("WAL" if profile == "tuned" else "DELETE"))
+    # Соединение не должно наследоваться дочерними процессами
+    connection.close()
+
+    barrier = context.Barrier(workers + 1)
+    results = context.Queue()
+    processes = [
+        context.Process(
+            target=_worker, args=(options, room_ids, workers, worker, count, barrier, results)
+        )
+        for worker in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    barrier.wait()
+    started = time.perf_counter()
+    totals = [results.get() for _ in processes]
+    elapsed = time.perf_counter() - started
+    for process in processes:
+        process.join()
+
+    created, rejected, locked = (sum(total[i] for total in totals) for i in range(3))
+    return {
+        "created": created,
+        "rejected": rejected,
+        "locked": locked,
+        "elapsed": elapsed,
+        "overlaps": _overlaps(room_ids),
+    }
+
+
+def run(stdout, worker_counts, bookings, rooms, profiles, **options):
+    if connection.vendor != "sqlite":
+        raise CommandError("Сценарий sqlite_writers работает только с SQLite")
+    worker_counts = worker_counts or [1, 2, 4, 8]
+    profiles = profiles or list(PROFILES)
+    # fork: дочерние процессы наследуют настроенный Django и временную базу
+    context = multiprocessing.get_context("fork")
+
+    errors = []
+    with tempfile.TemporaryDirectory() as tmp:
+        with isolated_database(name=str(Path(tmp) / "writers.sqlite3")):
+            for profile in profiles:
+                stdout.write(f"{profile}: {bookings} попыток брони на воркер")
+                for workers in worker_counts:
+                    result = _run_profile(context, profile, workers, bookings, rooms)
+                    # Ошибки блокировки не считаются выполненными операциями
+                    completed = result["created"] + result["rejected"]
+                    stdout.write(
+                        f"  workers={workers:<3}"
+                        f" {completed / result['elapsed']:8.1f} броней/s"
+                        f" created={result['created']}"
+                        f" rejected={result['rejected']}"
+                        f" locked={result['locked']}"
+                        f" overlaps={result['overlaps']}"
+                    )
+                    if result["overlaps"]:
+                        errors.append(f"{profile} workers={workers}: пересекающиеся брони")
+                    if profile == "tuned" and result["locked"]:
+                        errors.append(f"{profile} workers={workers}: ошибки блокировки")
+
+    if errors:
+        raise CommandError("\n".join(errors))
@@ -0,0 +1,139 @@
+"""
+Время запуска процесса: разбор -X importtime и время до первого запроса.
+
+Каждый замер - отдельный процесс Python, который импортирует
+hotel_booking.wsgi (как gunicorn или mod_wsgi) и выполняет первый и второй
+запрос к WSGI-приложению напрямую, без сети. Сравниваются запуск без
+прогрева (API_WARMUP=false: часть загрузки приходится на первый запрос) и с
+прогревом (hotel_booking/warmup.py). Профиль настроек - из
+DJANGO_SETTINGS_MODULE или параметра --settings, база данных - временный
+файл SQLite с применёнными миграциями.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import CommandError
+
+from .common import percentile
+
+# Выполняется в дочернем процессе: время импорта и первых двух запросов
+PROBE = """
+import json, sys, time
+from wsgiref.util import setup_testing_defaults
+
+started = time.perf_counter()
+from hotel_booking.wsgi import application
+loaded = time.perf_counter()
+
+def request(path):
+    environ = {"PATH_INFO": path, "REQUEST_METHOD": "GET"}
+    setup_testing_defaults(environ)
+    statuses = []
+    start_response = lambda status, headers, exc_info=None: statuses.append(status)
+    body = b"".join(application(environ, start_response))
+    if not statuses[0].startswith("200"):
+        sys.exit(f"GET {path}: {statuses[0]} {body[:200]!r}")
+    return time.perf_counter()
+
+first = request(sys.argv[1])
+second = request(sys.argv[1])
+print(json.dumps({"import": loaded - started, "first": first - loaded, "second": second - first}))
+"""
+
+MODES = {"cold": "false", "warmup": "true"}
+
+
+def add_arguments(parser):
+    parser.add_argument("--repeat", type=int, default=5, help="Запусков процесса на режим")
+    parser.add_argument("--path", default="/api/rooms/list", help="URL первого запроса")
+    parser.add_argument("--top", type=int, default=15, help="Строк в разборе -X importtime")
+
+
+def _python(args, env, check=True):
+    result = subprocess.run(
+        [sys.executable, *args],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    if check and result.returncode != 0:
+        raise CommandError(f"python {args[0]}: {result.stderr.strip()[-2000:]}")
+    return result
+
+
+def parse_importtime(stderr):
+    """Строки -X importtime: список (модуль, собственное время, суммарное время) в секундах"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        modules.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    return modules
+
+
+def by_package(modules):
+    """Собственное время импорта по пакетам верхнего уровня, по убыванию"""
+    totals = defaultdict(float)
+    for name, self_time, _ in modules:
+        totals[name.split(".")[0]] += self_time
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def run(stdout, repeat, path, top, **options):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{Path(tmp) / 'startup.sqlite3'}",
+            "PYTHONDONTWRITEBYTECODE": "",
+        }
+        _python(["manage.py", "migrate", "--noinput", "-v", "0"], env)
+        stdout.write(f"{os.environ['DJANGO_SETTINGS_MODULE']}: первый запрос GET {path}")
+
+        results = {}
+        for mode, warmup in MODES.items():
+            mode_env = {**env, "API_WARMUP": warmup}
+            # Первый запуск компилирует байт-код и прогревает файловый кэш ОС
+            _python(["-c", PROBE, path], mode_env)
+            samples = [
+                json.loads(_python(["-c", PROBE, path], mode_env).stdout) for _ in range(repeat)
+            ]
+            results[mode] = {
+                key: percentile([sample[key] for sample in samples], 50)
+                for key in ("import", "first", "second")
+            }
+            values = results[mode]
+            stdout.write(
+                f"  {mode:<7}"
+                f" import={values['import'] * 1000:7.1f} ms"
+                f" first={values['first'] * 1000:7.1f} ms"
+                f" second={values['second'] * 1000:6.1f} ms"
+                f"  до первого ответа: {(values['import'] + values['first']) * 1000:7.1f} ms"
+            )
+
+        cold, warm = results["cold"], results["warmup"]
+        stdout.write(
+            f"Прогрев переносит {(cold['first'] - warm['first']) * 1000:.1f} ms"
+            " из первого запроса воркера в запуск (с --preload - в мастер-процесс)"
+        )
+
+        # Разбор импорта с прогревом: все модули, нужные приложению
+        result = _python(["-X", "importtime", "-c", PROBE, path], {**env, "API_WARMUP": "true"})
+        modules = parse_importtime(result.stderr)
+        total = sum(self_time for _, self_time, _ in modules)
+        stdout.write(f"-X importtime: {len(modules)} модулей, {total * 1000:.1f} ms")
+        stdout.write("  по пакетам (собственное время):")
+        for package, self_time in by_package(modules)[:top]:
+            stdout.write(f"    {package:<24} {self_time * 1000:7.1f} ms")
+        stdout.write("  самые долгие модули (с вложенными импортами):")
+        for name, _, cumulative in sorted(modules, key=lambda row: row[2], reverse=True)[:top]:
+            stdout.write(f"    {name:<48} {cumulative * 1000:7.1f} ms")
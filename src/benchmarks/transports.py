@@ -0,0 +1,155 @@
+"""
+Способы отправки запросов к API в бенчмарках.
+
+- ``client`` - тестовый клиент Django (WSGIHandler в том же процессе);
+- ``asgi`` - AsyncClient (ASGIHandler в том же процессе);
+- ``wsgi`` - локальный HTTP-сервер wsgiref в отдельном потоке на 127.0.0.1.
+
+Каждый транспорт считает SQL-запросы, выполненные при обработке запроса,
+в том потоке, где их выполняет Django.
+"""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from asgiref.sync import async_to_sync
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.test import AsyncClient, Client
+
+
+class QueryCounter:
+    """Обёртка execute_wrapper, считающая SQL-запросы"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class _Transport:
+    """
+    Общая часть транспортов.
+
+    Подклассы определяют send(method, path, data) -> (статус, тело ответа в байтах).
+    """
+
+    name = None
+
+    def __init__(self):
+        self.counter = QueryCounter()
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def request(self, method, path, data=None):
+        """Запрос, возвращает (статус, тело, число SQL-запросов)"""
+        self.counter.count = 0
+        status, content = self.send(method, path, data)
+        return status, content, self.counter.count
+
+
+class ClientTransport(_Transport):
+    name = "client"
+
+    def __init__(self):
+        super().__init__()
+        self.client = Client()
+
+    def send(self, method, path, data):
+        with connection.execute_wrapper(self.counter):
+            if method == "GET":
+                response = self.client.get(path)
+            else:
+                response = self.client.post(
+                    path, data=json.dumps(data), content_type="application/json"
+                )
+        return response.status_code, response.content
+
+
+class AsgiTransport(_Transport):
+    name = "asgi"
+
+    def __init__(self):
+        super().__init__()
+        self.client = AsyncClient()
+
+    def send(self, method, path, data):
+        # async_to_sync из основного потока: синхронные части обработчика
+        # (sync_to_async с thread_sensitive) выполняются в этом же потоке
+        with connection.execute_wrapper(self.counter):
+            if method == "GET":
+                response = async_to_sync(self.client.get)(path)
+            else:
+                response = async_to_sync(self.client.post)(
+                    path, data=json.dumps(data), content_type="application/json"
+                )
+        return response.status_code, response.content
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class WsgiServerTransport(_Transport):
+    name = "wsgi"
+
+    def start(self):
+        application = get_wsgi_application()
+        counter = self.counter
+
+        def counted(environ, start_response):
+            with connection.execute_wrapper(counter):
+                return application(environ, start_response)
+
+        self.server = make_server(
+            "127.0.0.1", 0, counted, server_class=WSGIServer, handler_class=_QuietHandler
+        )
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def send(self, method, path, data):
+        body = None if method == "GET" else json.dumps(data).encode()
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=body,
+            method=method,
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as exc:
+            return exc.code, exc.read()
+
+
+TRANSPORTS = {
+    transport.name: transport for transport in (ClientTransport, AsgiTransport, WsgiServerTransport)
+}
+
+
+@contextmanager
+def open_transport(name):
+    """Запущенный транспорт по имени из TRANSPORTS"""
+    transport = TRANSPORTS[name]()
+    transport.start()
+    try:
+        yield transport
+    finally:
+        transport.stop()
@@ -0,0 +1,13 @@
+import pytest
+from django.core.cache import caches
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Кэши не откатываются вместе с транзакцией теста: очищаем их перед каждым тестом"""
+    from api.room_cache import room_cache
+
+    for cache in caches.all():
+        cache.clear()
+    room_cache.invalidate()
+    room_cache.reset_stats()
@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
+from .warmup import warmup
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "hotel_booking.settings")
 
 application = get_asgi_application()
+
+if settings.API_WARMUP:
+    # Загрузка модулей первого запроса при запуске (с --preload - один раз до fork)
+    warmup()
@@ -2,7 +2,12 @@ import os
 import sys
 from pathlib import Path
 
-from .config import get_database_config
+from .config import (
+    get_api_settings,
+    get_connection_settings,
+    get_database_config,
+    get_sqlite_options,
+)
 
 """
 Django settings for hotel_booking project.
@@ -75,17 +80,92 @@ WSGI_APPLICATION = "hotel_booking.wsgi.application"
 # Database
 # Используем SQLite для разработки и тестов, PostgreSQL только для продакшена
 USE_POSTGRESQL = os.getenv("USE_POSTGRESQL", "False").lower() == "true"
+# DATABASE_URL (postgres://... или sqlite:///...) заменяет DATABASE__* настройки
+USE_DATABASE_URL = bool(os.getenv("DATABASE_URL"))
 
-if USE_POSTGRESQL and not ("test" in sys.argv or "pytest" in sys.argv):
+if (USE_POSTGRESQL or USE_DATABASE_URL) and not ("test" in sys.argv or "pytest" in sys.argv):
     DATABASES = {"default": get_database_config()}
 else:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": BASE_DIR / "db.sqlite3",
+            # WAL, synchronous=NORMAL, mmap, кэш страниц, busy_timeout и BEGIN IMMEDIATE
+            "OPTIONS": get_sqlite_options(),
+            # Постоянные соединения: без повторного открытия файла на каждый запрос
+            **get_connection_settings(),
         }
     }
 
+# Асинхронные представления API (api/async_views.py) для запуска под uvicorn/daphne
+API_ASYNC_VIEWS = os.getenv("API_ASYNC_VIEWS", "False").lower() == "true"
+
+# Прогрев приложения при импорте wsgi.py/asgi.py (hotel_booking/warmup.py): первый
+# запрос воркера не загружает модули, с gunicorn --preload память делится между воркерами
+API_WARMUP = os.getenv("API_WARMUP", "True").lower() == "true"
+
+# Метрики запросов: заголовок Server-Timing и GET /metrics в формате Prometheus
+API_METRICS = os.getenv("API_METRICS", "False").lower() == "true"
+if API_METRICS:
+    # Первым в списке, чтобы общее время включало остальные middleware
+    MIDDLEWARE.insert(0, "api.middleware.RequestMetricsMiddleware")
+
+# Размеры страниц keyset-пагинации списков (config.yaml / переменные окружения API__*)
+API_PAGINATION = get_api_settings()
+
+# Размер порции чтения из БД при потоковой выгрузке списков (?stream=1)
+API_STREAM_CHUNK_SIZE = int(os.getenv("API_STREAM_CHUNK_SIZE", "2000"))
+
+# Кэш метаданных комнат в памяти процесса (проверка существования без SQL)
+API_ROOM_CACHE_SIZE = int(os.getenv("API_ROOM_CACHE_SIZE", "10000"))
+# Время жизни записи в секундах (изменения в других процессах видны не позже)
+API_ROOM_CACHE_TTL = int(os.getenv("API_ROOM_CACHE_TTL", "30"))
+
+# Размер пачки броней при фоновом удалении комнаты (POST /api/rooms/delete с background)
+API_ROOM_DELETE_BATCH_SIZE = int(os.getenv("API_ROOM_DELETE_BATCH_SIZE", "5000"))
+
+# Очередь отложенной записи броней (api/ingest.py): bookings/create отвечает
+# токеном сразу, брони записываются фоновым потоком пачками
+API_BOOKING_QUEUE = os.getenv("API_BOOKING_QUEUE", "False").lower() == "true"
+# Журнал принятых броней; воркеры занимают свободные слоты booking_queue.jsonl,
+# booking_queue.1.jsonl, ... (файл журнала блокируется на время работы очереди)
+API_BOOKING_QUEUE_SPOOL = os.getenv(
+    "API_BOOKING_QUEUE_SPOOL", str(BASE_DIR / "booking_queue.jsonl")
+)
+API_BOOKING_QUEUE_FSYNC = os.getenv("API_BOOKING_QUEUE_FSYNC", "True").lower() == "true"
+API_BOOKING_QUEUE_BATCH_SIZE = int(os.getenv("API_BOOKING_QUEUE_BATCH_SIZE", "500"))
+# Сколько ждать добора пачки, секунд
+API_BOOKING_QUEUE_FLUSH_INTERVAL = float(os.getenv("API_BOOKING_QUEUE_FLUSH_INTERVAL", "0.05"))
+# Время жизни календаря комнаты в памяти очереди, секунд
+API_BOOKING_QUEUE_TTL = int(os.getenv("API_BOOKING_QUEUE_TTL", "30"))
+# Сколько хранится статус токена в кэше API_CACHE_ALIAS, секунд (GET /api/bookings/status
+# в любом воркере - только с общим бэкендом кэша, см. CACHES)
+API_BOOKING_QUEUE_STATUS_TTL = int(os.getenv("API_BOOKING_QUEUE_STATUS_TTL", "86400"))
+
+# Максимальный размер пакета для POST /api/bookings/bulk_create
+API_BULK_CREATE_MAX_ITEMS = int(os.getenv("API_BULK_CREATE_MAX_ITEMS", "5000"))
+
+# Кэш: locmem по умолчанию. locmem безопасен только с одним воркером: кэш ответов API
+# у каждого процесса свой, и после записи в одном воркере другие отдают устаревшие
+# ответы до API_CACHE_TIMEOUT. Для нескольких воркеров - общий бэкенд (file, redis, memcached)
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+    "memcached": "django.core.cache.backends.memcached.PyMemcacheCache",
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[os.getenv("CACHE_BACKEND", "locmem")],
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
+# Кэш готовых ответов API (инвалидируется сменой версии при записи)
+API_CACHE_ALIAS = "default"
+API_CACHE_TIMEOUT = int(os.getenv("API_CACHE_TIMEOUT", "300"))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
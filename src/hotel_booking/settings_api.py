@@ -0,0 +1,58 @@
+"""
+Профиль настроек "api": только JSON-эндпоинты, без админки.
+
+Запуск: DJANGO_SETTINGS_MODULE=hotel_booking.settings_api (uvicorn, gunicorn,
+manage.py). Эндпоинты API открыты (AllowAny) и не хранят состояние, поэтому
+из профиля по умолчанию (settings.py) убраны:
+
+- приложения admin, sessions, messages и staticfiles;
+- middleware сессий, CSRF, аутентификации, сообщений и X-Frame-Options
+  (APIView DRF и асинхронные представления освобождены от CSRF и так);
+- аутентификация DRF: request.user не вычисляется.
+
+Схема БД общая с профилем по умолчанию, админка обслуживается отдельным
+процессом с hotel_booking.settings.
+"""
+
+from .settings import *  # noqa: F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK, TEMPLATES
+
+API_EXCLUDED_APPS = (
+    "django.contrib.admin",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+)
+
+API_EXCLUDED_MIDDLEWARE = (
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+)
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in API_EXCLUDED_APPS]
+
+# Метрики (API_METRICS) остаются первым middleware
+MIDDLEWARE = [name for name in MIDDLEWARE if name not in API_EXCLUDED_MIDDLEWARE]
+
+ROOT_URLCONF = "hotel_booking.urls_api"
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.debug",
+                "django.template.context_processors.request",
+            ],
+        },
+    },
+]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_AUTHENTICATION_CLASSES": [],
+    "UNAUTHENTICATED_USER": None,
+}
@@ -1,6 +1,7 @@
 from django.contrib import admin
-from django.http import JsonResponse
-from django.urls import include, path
+from django.urls import path
+
+from .urls_api import urlpatterns as api_urlpatterns
 
 """
 URL configuration for hotel_booking project.
@@ -23,33 +24,8 @@ URL configuration for hotel_booking project.
 """
 
 
-def api_overview(request):
-    """Обзор доступных API эндпоинтов"""
-    return JsonResponse(
-        {
-            "name": "Hotel Booking API",
-            "version": "1.0.0",
-            "description": "API для управления номерами отелей и бронированиями",
-            "endpoints": {
-                "rooms": {
-                    "create": "POST /rooms/create",
-                    "delete": "POST /rooms/delete",
-                    "list": "GET /rooms/list",
-                },
-                "bookings": {
-                    "create": "POST /bookings/create",
-                    "delete": "POST /bookings/delete",
-                    "list": "GET /bookings/list",
-                },
-            },
-            "documentation": "/README.md",
-            "github": "https://github.com/your-repo/hotel-booking",
-        }
-    )
-
-
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("", api_overview, name="api_overview"),  # Корневой путь с информацией об API
-    path("api/", include("api.urls")),  # API эндпоинты под /api/
+    # Эндпоинты API - те же, что в профиле "api" (urls_api.py)
+    *api_urlpatterns,
 ]
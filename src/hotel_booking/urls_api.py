@@ -0,0 +1,51 @@
+"""
+URL-конфигурация профиля "api" (settings_api.py): только эндпоинты API, без админки.
+"""
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.urls import include, path
+
+from api.metrics import metrics_view
+
+
+def api_overview(request):
+    """Обзор доступных API эндпоинтов"""
+    return JsonResponse(
+        {
+            "name": "Hotel Booking API",
+            "version": "1.0.0",
+            "description": "API для управления номерами отелей и бронированиями",
+            "endpoints": {
+                "rooms": {
+                    "create": "POST /rooms/create",
+                    "delete": "POST /rooms/delete",
+                    "list": "GET /rooms/list",
+                    "available": "GET /rooms/available",
+                    "search": "GET /rooms/search?q=",
+                },
+                "bookings": {
+                    "create": "POST /bookings/create",
+                    "bulk_create": "POST /bookings/bulk_create",
+                    "delete": "POST /bookings/delete",
+                    "list": "GET /bookings/list",
+                    "status": "GET /bookings/status?token=",
+                },
+                "reports": {
+                    "occupancy": "GET /occupancy?from=&to=",
+                },
+            },
+            "documentation": "/README.md",
+            "github": "https://github.com/your-repo/hotel-booking",
+        }
+    )
+
+
+urlpatterns = [
+    path("", api_overview, name="api_overview"),  # Корневой путь с информацией об API
+    # API эндпоинты под /api/ (асинхронные представления - для запуска под ASGI)
+    path("api/", include("api.async_urls" if settings.API_ASYNC_VIEWS else "api.urls")),
+]
+
+if settings.API_METRICS:
+    urlpatterns.append(path("metrics", metrics_view, name="metrics"))
@@ -0,0 +1,72 @@
+"""
+Прогрев приложения при запуске процесса (вызывается из wsgi.py и asgi.py).
+
+Без прогрева часть загрузки приходится на первый запрос каждого воркера:
+импорт URL-конфигурации (представления, сериализаторы, DRF), классы
+рендереров и парсеров DRF, компиляция регулярных выражений URL, NumPy.
+При запуске с предзагрузкой (``gunicorn --preload``) прогрев выполняется
+один раз в мастер-процессе, и воркеры после fork разделяют эту память
+copy-on-write. gc.freeze() переносит загруженные объекты в постоянное
+поколение: сборщик мусора воркеров не обходит их и не копирует страницы.
+
+Соединения с БД после прогрева закрываются: их нельзя разделять между
+процессами. Включается настройкой API_WARMUP.
+"""
+
+import gc
+import logging
+import time
+
+from django.db import connections
+from django.urls import reverse
+
+logger = logging.getLogger(__name__)
+
+DRF_SETTINGS = (
+    "DEFAULT_RENDERER_CLASSES",
+    "DEFAULT_PARSER_CLASSES",
+    "DEFAULT_PERMISSION_CLASSES",
+    "DEFAULT_AUTHENTICATION_CLASSES",
+    "UNAUTHENTICATED_USER",
+)
+
+
+def _build_serializers():
+    """Поля сериализаторов API (строятся при первом обращении к .fields), возвращает их число"""
+    from rest_framework import serializers
+
+    from api import serializers as api_serializers
+
+    built = 0
+    for value in vars(api_serializers).values():
+        if (
+            isinstance(value, type)
+            and issubclass(value, serializers.Serializer)
+            and value.__module__ == api_serializers.__name__
+        ):
+            built += len(value().fields)
+    return built
+
+
+def warmup(freeze=True):
+    """Загрузка всего, что иначе загружается первым запросом; возвращает длительность, с"""
+    from rest_framework.settings import api_settings
+
+    from api import calendars
+
+    started = time.perf_counter()
+    # Импорт URL-конфигурации и компиляция шаблонов URL всех эндпоинтов
+    reverse("api_overview")
+    # Классы из настроек DRF импортируются при первом обращении
+    for name in DRF_SETTINGS:
+        getattr(api_settings, name)
+    _build_serializers()
+    calendars.load_numpy()
+    connections.close_all()
+
+    if freeze:
+        gc.collect()
+        gc.freeze()
+    duration = time.perf_counter() - started
+    logger.info("Application warmed up in %.3f s", duration)
+    return duration
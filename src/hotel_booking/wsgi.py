@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
+from .warmup import warmup
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "hotel_booking.settings")
 
 application = get_wsgi_application()
+
+if settings.API_WARMUP:
+    # Загрузка модулей первого запроса при запуске (с --preload - один раз до fork)
+    warmup()
@@ -150,3 +150,110 @@ class BookingAPITest(TestCase):
         )
 
         self.assertEqual(resp.status_code, 400)
+
+    def test_create_booking_via_api_endpoint(self):
+        """Тест создания бронирования через эндпоинт bookings/create"""
+        r = Room.objects.create(description="Test room", price=100)
+
+        resp = self.client.post(
+            "/api/bookings/create",
+            data={"room_id": r.id, "date_start": "2023-01-10", "date_end": "2023-01-15"},
+        )
+
+        self.assertEqual(resp.status_code, 200)
+        booking = Booking.objects.get(id=resp.json()["booking_id"])
+        self.assertEqual(booking.room_id, r.id)
+
+        # Повторная бронь на те же даты отклоняется под блокировкой комнаты
+        resp = self.client.post(
+            "/api/bookings/create",
+            data={"room_id": r.id, "date_start": "2023-01-15", "date_end": "2023-01-16"},
+        )
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.json(), {"error": "room is already booked on given dates"})
+        self.assertEqual(Booking.objects.filter(room=r).count(), 1)
+
+    def test_create_booking_query_budget(self):
+        """Бюджет запросов bookings/create: блокировка с проверкой пересечений и вставка"""
+        r = Room.objects.create(description="Test room", price=100)
+        data = {"room_id": r.id, "date_start": "2023-01-10", "date_end": "2023-01-15"}
+
+        # SAVEPOINT, SELECT ... FOR UPDATE календаря комнаты, INSERT брони,
+        # INSERT дней в таблицу занятости, UPDATE календаря, RELEASE SAVEPOINT
+        with self.assertNumQueries(6):
+            resp = self.client.post("/api/bookings/create", data=data)
+        self.assertEqual(resp.status_code, 200)
+
+        # Отказ из-за пересечения: вместо INSERT - откат к точке сохранения
+        with self.assertNumQueries(4):
+            resp = self.client.post("/api/bookings/create", data=data)
+        self.assertEqual(resp.status_code, 400)
+
+    def test_create_booking_invalid_dates_via_api(self):
+        """Некорректные даты отклоняются до обращения к БД"""
+        r = Room.objects.create(description="Test room", price=100)
+
+        with self.assertNumQueries(0):
+            resp = self.client.post(
+                "/api/bookings/create",
+                data={"room_id": r.id, "date_start": "2023-01-15", "date_end": "2023-01-10"},
+            )
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("error", resp.json())
+
+    def test_create_booking_unknown_room(self):
+        """Тест создания бронирования для несуществующей комнаты"""
+        resp = self.client.post(
+            "/api/bookings/create",
+            data={"room_id": 999999, "date_start": "2023-01-10", "date_end": "2023-01-15"},
+        )
+
+        self.assertEqual(resp.status_code, 404)
+
+    def test_list_available_rooms(self):
+        """Тест поиска свободных комнат на даты"""
+        busy = Room.objects.create(description="Busy room", price=100)
+        free = Room.objects.create(description="Free room", price=300)
+        cheap = Room.objects.create(description="Cheap room", price=50)
+        Booking.objects.create(room=busy, date_start="2023-01-10", date_end="2023-01-15")
+        Booking.objects.create(room=cheap, date_start="2023-01-16", date_end="2023-01-20")
+
+        # Один запрос независимо от числа комнат и броней
+        with self.assertNumQueries(1):
+            resp = self.client.get(
+                "/api/rooms/available?date_start=2023-01-15&date_end=2023-01-16"
+                "&sort_by=price&order=desc"
+            )
+
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        self.assertEqual([room["room_id"] for room in data], [free.id])
+        self.assertIn("description", data[0])
+
+        resp = self.client.get(
+            "/api/rooms/available?date_start=2023-01-01&date_end=2023-01-05&max_price=150"
+            "&sort_by=price"
+        )
+        self.assertEqual([room["room_id"] for room in resp.json()], [cheap.id, busy.id])
+
+    def test_list_available_rooms_invalid_params(self):
+        """Тест поиска свободных комнат с некорректными параметрами"""
+        resp = self.client.get("/api/rooms/available?date_start=2023-01-15")
+        self.assertEqual(resp.status_code, 400)
+
+        resp = self.client.get("/api/rooms/available?date_start=2023-01-15&date_end=2023-01-10")
+        self.assertEqual(resp.status_code, 400)
+
+    def test_list_rooms_matches_serializer(self):
+        """Тест: список без сериализатора совпадает с выводом RoomSerializer"""
+        from rest_framework.renderers import JSONRenderer
+
+        from api.serializers import RoomSerializer
+
+        Room.objects.create(description="Люкс с видом на море", price="150.50")
+        Room.objects.create(description="Room 2", price=200)
+
+        resp = self.client.get("/api/rooms/list")
+
+        expected = RoomSerializer(Room.objects.order_by("id"), many=True).data
+        self.assertEqual(resp.content, JSONRenderer().render(expected))
@@ -0,0 +1,126 @@
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import include, path
+
+from api.models import Booking, Room
+
+urlpatterns = [
+    path("api/", include("api.async_urls")),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncViewsTest(TestCase):
+    """Тесты асинхронных представлений API (те же URL и ответы)"""
+
+    async def post(self, url, data):
+        return await self.async_client.post(
+            url, data=json.dumps(data), content_type="application/json"
+        )
+
+    async def test_room_create_list_delete(self):
+        """Создание, список и удаление комнат"""
+        resp = await self.post("/api/rooms/create", {"text": "Async room", "price": 150})
+        self.assertEqual(resp.status_code, 200)
+        room_id = resp.json()["room_id"]
+
+        resp = await self.async_client.get("/api/rooms/list?sort_by=price&order=desc")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()[0]["room_id"], room_id)
+        self.assertEqual(resp.json()[0]["price"], "150.00")
+
+        not_modified = await self.async_client.get(
+            "/api/rooms/list?sort_by=price&order=desc", headers={"if-none-match": resp["ETag"]}
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+        resp = await self.post("/api/rooms/delete", {"room_id": room_id})
+        self.assertEqual(resp.json(), {"ok": True})
+        self.assertFalse(await Room.objects.filter(id=room_id).aexists())
+
+        resp = await self.post("/api/rooms/delete", {"room_id": room_id})
+        self.assertEqual(resp.status_code, 404)
+
+    async def test_room_create_invalid(self):
+        """Ошибки валидации в формате {"error": ...}"""
+        resp = await self.post("/api/rooms/create", {"price": -1})
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("error", resp.json())
+
+        resp = await self.async_client.post(
+            "/api/rooms/create", data="{bad", content_type="application/json"
+        )
+        self.assertEqual(resp.status_code, 400)
+
+    async def test_booking_create_and_overlap(self):
+        """Создание брони и отказ при пересечении"""
+        room = await Room.objects.acreate(description="Room", price=100)
+        data = {"room_id": room.id, "date_start": "2023-01-10", "date_end": "2023-01-15"}
+
+        resp = await self.post("/api/bookings/create", data)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(await Booking.objects.filter(id=resp.json()["booking_id"]).aexists())
+
+        resp = await self.post("/api/bookings/create", data)
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.json(), {"error": "room is already booked on given dates"})
+
+        resp = await self.post("/api/bookings/create", {**data, "room_id": 999999})
+        self.assertEqual(resp.status_code, 404)
+
+        resp = await self.post("/api/bookings/create", {"room_id": room.id})
+        self.assertEqual(resp.status_code, 400)
+
+    async def test_booking_list_and_delete(self):
+        """Список броней комнаты (с пагинацией и потоком) и удаление"""
+        room = await Room.objects.acreate(description="Room", price=100)
+        for day in (10, 1, 20):
+            await Booking.objects.acreate(
+                room=room, date_start=f"2023-01-{day:02d}", date_end=f"2023-01-{day + 1:02d}"
+            )
+
+        resp = await self.async_client.get(f"/api/bookings/list?room_id={room.id}")
+        self.assertEqual(
+            [item["date_start"] for item in resp.json()], ["2023-01-01", "2023-01-10", "2023-01-20"]
+        )
+
+        page = await self.async_client.get(f"/api/bookings/list?room_id={room.id}&page_size=2")
+        self.assertEqual(len(page.json()["results"]), 2)
+        self.assertIsNotNone(page.json()["next_cursor"])
+
+        stream = await self.async_client.get(f"/api/bookings/list?room_id={room.id}&stream=1")
+        content = b"".join([chunk async for chunk in stream.streaming_content])
+        self.assertEqual(json.loads(content), resp.json())
+
+        booking_id = resp.json()[0]["booking_id"]
+        resp = await self.post("/api/bookings/delete", {"booking_id": booking_id})
+        self.assertEqual(resp.json(), {"ok": True})
+        resp = await self.async_client.get(f"/api/bookings/list?room_id={room.id}")
+        self.assertEqual(len(resp.json()), 2)
+
+        resp = await self.async_client.get("/api/bookings/list?room_id=999999")
+        self.assertEqual(resp.status_code, 404)
+
+    async def test_available_and_bulk_create(self):
+        """Поиск свободных комнат и пакетное создание"""
+        room = await Room.objects.acreate(description="Room", price=100)
+        resp = await self.post(
+            "/api/bookings/bulk_create",
+            [{"room_id": room.id, "date_start": "2023-01-10", "date_end": "2023-01-15"}],
+        )
+        self.assertIn("booking_id", resp.json()[0])
+
+        resp = await self.async_client.get(
+            "/api/rooms/available?date_start=2023-01-12&date_end=2023-01-13"
+        )
+        self.assertEqual(resp.json(), [])
+        resp = await self.async_client.get("/api/rooms/available?dates=2023-01-09,2023-01-16")
+        self.assertEqual([row["room_id"] for row in resp.json()], [room.id])
+        resp = await self.async_client.get("/api/rooms/available?dates=2023-01-09,2023-01-15")
+        self.assertEqual(resp.json(), [])
+
+    async def test_method_not_allowed(self):
+        """Неподдерживаемый HTTP-метод"""
+        resp = await self.async_client.get("/api/rooms/create")
+        self.assertEqual(resp.status_code, 405)
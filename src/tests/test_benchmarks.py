@@ -0,0 +1,38 @@
+from django.test import SimpleTestCase
+
+from benchmarks.baseline import compare
+
+BASELINE = {
+    "client": {
+        "rooms/list": {"p50": 0.010, "p95": 0.020, "p99": 0.030, "rps": 90.0, "queries": 1},
+    }
+}
+
+
+def _result(p95, queries=1):
+    return {"client": {"rooms/list": {"p50": 0.010, "p95": p95, "p99": 0.030, "queries": queries}}}
+
+
+class BaselineCompareTest(SimpleTestCase):
+    """Сравнение результатов бенчмарка с базовой линией"""
+
+    def test_within_tolerance(self):
+        self.assertEqual(compare(_result(0.024), BASELINE, tolerance=0.25), [])
+
+    def test_latency_regression(self):
+        regressions = compare(_result(0.030), BASELINE, tolerance=0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("client rooms/list: p95", regressions[0])
+
+    def test_query_count_regression(self):
+        regressions = compare(_result(0.020, queries=2), BASELINE, tolerance=0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("SQL queries", regressions[0])
+
+    def test_new_endpoints_are_skipped(self):
+        results = {"wsgi": {"rooms/list": {"p95": 1.0, "queries": 10}}}
+        self.assertEqual(compare(results, BASELINE, tolerance=0.25), [])
+
+    def test_unknown_metric(self):
+        with self.assertRaises(ValueError):
+            compare(_result(0.020), BASELINE, tolerance=0.25, metric="max")
@@ -0,0 +1,106 @@
+from datetime import date, timedelta
+
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from api.bookings import room_bookings
+from api.models import Booking, Room
+
+ASYNC_URLS = "tests.test_async_views"
+JANUARY_6 = ("2024-01-06", "2024-01-08")
+
+
+class BookingWindowTest(TestCase):
+    """Тесты окна дат from/to в GET /api/bookings/list"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.room = Room.objects.create(description="Room", price=100)
+        cls.other = Room.objects.create(description="Other", price=100)
+        # Брони по 3 дня с промежутком в 2 дня: 2024-01-01..03, 06..08, ...
+        bookings = []
+        for i in range(30):
+            date_start = date(2024, 1, 1) + timedelta(days=5 * i)
+            bookings.append(
+                Booking(room=cls.room, date_start=date_start, date_end=date_start + timedelta(2))
+            )
+        bookings.append(
+            Booking(room=cls.other, date_start=date(2024, 1, 7), date_end=date(2024, 1, 7))
+        )
+        Booking.objects.bulk_create(bookings)
+
+    def dates(self, query):
+        resp = self.client.get(f"/api/bookings/list?room_id={self.room.id}&{query}")
+        self.assertEqual(resp.status_code, 200)
+        return [(item["date_start"], item["date_end"]) for item in resp.json()]
+
+    def test_window(self):
+        # Границы окна включительно, как при проверке пересечений
+        self.assertEqual(
+            self.dates("from=2024-01-03&to=2024-01-11"),
+            [
+                ("2024-01-01", "2024-01-03"),
+                ("2024-01-06", "2024-01-08"),
+                ("2024-01-11", "2024-01-13"),
+            ],
+        )
+        self.assertEqual(self.dates("from=2024-01-04&to=2024-01-05"), [])
+        self.assertEqual(
+            self.dates("from=2024-01-07&to=2024-01-07"), [("2024-01-06", "2024-01-08")]
+        )
+
+    def test_open_window(self):
+        self.assertEqual(len(self.dates("from=2024-05-01")), 6)
+        self.assertEqual(self.dates("to=2024-01-05"), [("2024-01-01", "2024-01-03")])
+        self.assertEqual(len(self.dates("")), 30)
+        self.assertEqual(self.dates("from=2025-01-01"), [])
+
+    def test_window_paginated_and_cached(self):
+        resp = self.client.get(
+            f"/api/bookings/list?room_id={self.room.id}&from=2024-01-01&to=2024-01-31&page_size=2"
+        )
+        page = resp.json()
+        self.assertEqual(len(page["results"]), 2)
+        resp = self.client.get(
+            f"/api/bookings/list?room_id={self.room.id}&from=2024-01-01&to=2024-01-31"
+            f"&page_size=2&cursor={page['next_cursor']}"
+        )
+        self.assertEqual(
+            [item["date_start"] for item in resp.json()["results"]], ["2024-01-11", "2024-01-16"]
+        )
+        # Разные окна кэшируются отдельно
+        self.assertEqual(len(self.dates("to=2024-01-10")), 2)
+        self.assertEqual(len(self.dates("to=2024-01-20")), 4)
+
+    def test_invalid_window(self):
+        for query in ("from=2024-02-01&to=2024-01-01", "from=tomorrow"):
+            resp = self.client.get(f"/api/bookings/list?room_id={self.room.id}&{query}")
+            self.assertEqual(resp.status_code, 400)
+            self.assertIn("error", resp.json())
+
+    @override_settings(ROOT_URLCONF=ASYNC_URLS)
+    def test_async_view(self):
+        self.assertEqual(
+            self.dates("from=2024-01-07&to=2024-01-12"),
+            [JANUARY_6, ("2024-01-11", "2024-01-13")],
+        )
+        resp = self.client.get(f"/api/bookings/list?room_id={self.room.id}&to=2023")
+        self.assertEqual(resp.status_code, 400)
+
+    def test_plan_uses_indexes(self):
+        """Окно читается диапазонами индексов, а не всеми бронями комнаты"""
+        if connection.vendor != "sqlite":
+            self.skipTest("план запроса SQLite")
+        bookings = room_bookings(self.room.id, date(2024, 3, 1), date(2024, 3, 31))
+        sql, params = bookings.values_list("id", "date_start", "date_end").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = [row[-1] for row in cursor.fetchall()]
+        searches = [line for line in plan if line.startswith(("SEARCH", "SCAN"))]
+        self.assertEqual(len(searches), 2, plan)
+        main, first = searches
+        self.assertIn("date_start>? AND date_start<?", main)
+        self.assertIn("date_end>?", first)
+        for line in searches:
+            self.assertIn("USING COVERING INDEX", line)
+        self.assertNotIn("TEMP B-TREE", " ".join(plan))
@@ -0,0 +1,84 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import Booking, Room
+
+
+class BookingBulkCreateTest(TestCase):
+    """Тесты пакетного создания бронирований"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.room = Room.objects.create(description="Room 1", price=100)
+        self.other_room = Room.objects.create(description="Room 2", price=200)
+        Booking.objects.create(room=self.room, date_start="2023-01-10", date_end="2023-01-15")
+
+    def post(self, items):
+        return self.client.post("/api/bookings/bulk_create", data=items, format="json")
+
+    def test_bulk_create_per_item_results(self):
+        """Каждый элемент пакета получает свой результат"""
+        items = [
+            {"room_id": self.room.id, "date_start": "2023-01-01", "date_end": "2023-01-05"},
+            {"room_id": self.room.id, "date_start": "2023-01-14", "date_end": "2023-01-16"},
+            {"room_id": self.other_room.id, "date_start": "2023-01-01", "date_end": "2023-01-05"},
+            {"room_id": 999999, "date_start": "2023-01-01", "date_end": "2023-01-05"},
+            {"room_id": self.other_room.id, "date_start": "2023-01-10", "date_end": "2023-01-05"},
+        ]
+
+        resp = self.post(items)
+
+        self.assertEqual(resp.status_code, 200)
+        results = resp.json()
+        self.assertEqual([result["index"] for result in results], [0, 1, 2, 3, 4])
+        self.assertIn("booking_id", results[0])
+        self.assertEqual(results[1]["error"], "room is already booked on given dates")
+        self.assertIn("booking_id", results[2])
+        self.assertEqual(results[3]["error"], "room not found")
+        self.assertIn("date_end", results[4]["error"])
+
+        self.assertEqual(Booking.objects.filter(room=self.room).count(), 2)
+        self.assertTrue(Booking.objects.filter(id=results[2]["booking_id"]).exists())
+
+    def test_bulk_create_conflicts_within_batch(self):
+        """Пересечения внутри пакета: приоритет у более ранней даты начала"""
+        items = [
+            {"room_id": self.room.id, "date_start": "2023-02-05", "date_end": "2023-02-08"},
+            {"room_id": self.room.id, "date_start": "2023-02-01", "date_end": "2023-02-05"},
+            {"room_id": self.room.id, "date_start": "2023-02-06", "date_end": "2023-02-07"},
+            {"room_id": self.room.id, "date_start": "2023-02-06", "date_end": "2023-02-09"},
+        ]
+
+        results = self.post(items).json()
+
+        self.assertEqual(results[0]["error"], "conflicts with another booking in the batch")
+        self.assertIn("booking_id", results[1])
+        self.assertIn("booking_id", results[2])
+        self.assertIn("error", results[3])
+
+    def test_bulk_create_query_count(self):
+        """Число запросов не зависит от размера пакета"""
+        items = [
+            {
+                "room_id": self.other_room.id,
+                "date_start": f"2024-{month:02d}-01",
+                "date_end": f"2024-{month:02d}-10",
+            }
+            for month in range(1, 13)
+        ]
+
+        # Комнаты, существующие брони, вставка броней и дней занятости
+        # (+ точка сохранения транзакции в тесте)
+        with self.assertNumQueries(6):
+            resp = self.post(items)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(Booking.objects.filter(room=self.other_room).count(), 12)
+
+    def test_bulk_create_requires_array(self):
+        """Тело запроса должно быть непустым массивом"""
+        resp = self.post({"room_id": self.room.id})
+        self.assertEqual(resp.status_code, 400)
+
+        resp = self.post([])
+        self.assertEqual(resp.status_code, 400)
@@ -0,0 +1,155 @@
+import time
+
+from django.test import TestCase
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from api.cache import ROOMS_SCOPE, _version_key, get_cache
+from api.models import Room
+
+
+class RoomListCacheTest(TestCase):
+    """Тесты версионированного кэша rooms/list"""
+
+    def setUp(self):
+        self.client = APIClient()
+        Room.objects.create(description="Room 1", price=100)
+        Room.objects.create(description="Room 2", price=200)
+
+    def test_cached_response_skips_database(self):
+        """Повторный запрос обслуживается из кэша без обращения к БД"""
+        first = self.client.get("/api/rooms/list?sort_by=price")
+
+        with self.assertNumQueries(0):
+            second = self.client.get("/api/rooms/list?sort_by=price")
+
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first["ETag"], second["ETag"])
+
+        # Другая сортировка - другой ключ кэша
+        with self.assertNumQueries(1):
+            other = self.client.get("/api/rooms/list?sort_by=price&order=desc")
+        self.assertNotEqual(first["ETag"], other["ETag"])
+
+    def test_invalidated_by_room_views(self):
+        """Создание и удаление комнаты через API сбрасывают кэш"""
+        etag = self.client.get("/api/rooms/list")["ETag"]
+
+        resp = self.client.post("/api/rooms/create", data={"description": "Room 3", "price": 300})
+        room_id = resp.json()["room_id"]
+        resp = self.client.get("/api/rooms/list")
+        self.assertEqual(len(resp.json()), 3)
+        self.assertNotEqual(resp["ETag"], etag)
+
+        self.client.post("/api/rooms/delete", data={"room_id": room_id})
+        self.assertEqual(len(self.client.get("/api/rooms/list").json()), 2)
+
+    def test_invalidated_by_model_signals(self):
+        """Изменения в обход API сбрасывают кэш через сигналы модели"""
+        self.client.get("/api/rooms/list")
+
+        room = Room.objects.create(description="Room 3", price=300)
+        self.assertEqual(len(self.client.get("/api/rooms/list").json()), 3)
+
+        room.price = 50
+        room.save()
+        data = self.client.get("/api/rooms/list?sort_by=price").json()
+        self.assertEqual(data[0]["price"], "50.00")
+
+        room.delete()
+        self.assertEqual(len(self.client.get("/api/rooms/list").json()), 2)
+
+    def test_conditional_get(self):
+        """If-None-Match и If-Modified-Since дают 304"""
+        # Версия из прошлой секунды: Last-Modified отдаётся
+        get_cache().set(_version_key(ROOMS_SCOPE), time.time_ns() - 5_000_000_000)
+        resp = self.client.get("/api/rooms/list")
+        self.assertIn("Last-Modified", resp)
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get("/api/rooms/list", HTTP_IF_NONE_MATCH=resp["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified["ETag"], resp["ETag"])
+
+        not_modified = self.client.get(
+            "/api/rooms/list", HTTP_IF_MODIFIED_SINCE=resp["Last-Modified"]
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+        Room.objects.create(description="Room 3", price=300)
+        resp = self.client.get("/api/rooms/list", HTTP_IF_NONE_MATCH=resp["ETag"])
+        self.assertEqual(resp.status_code, 200)
+
+    def test_no_last_modified_within_version_second(self):
+        """В секунду последней записи Last-Modified не отдаётся: If-Modified-Since не даёт 304"""
+        # Версия ещё не прошедшей секунды (с запасом, чтобы секунда не сменилась во время теста)
+        get_cache().set(_version_key(ROOMS_SCOPE), time.time_ns() + 5_000_000_000)
+        now = http_date()
+        resp = self.client.get("/api/rooms/list")
+        self.assertNotIn("Last-Modified", resp)
+        self.assertIn("ETag", resp)
+
+        resp = self.client.get("/api/rooms/list", HTTP_IF_MODIFIED_SINCE=now)
+        self.assertEqual(resp.status_code, 200)
+
+
+class BookingListCacheTest(TestCase):
+    """Тесты кэша bookings/list по комнатам"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.room = Room.objects.create(description="Room 1", price=100)
+        self.other_room = Room.objects.create(description="Room 2", price=200)
+        self.url = f"/api/bookings/list?room_id={self.room.id}"
+
+    def create_booking(self, room, date_start, date_end):
+        return self.client.post(
+            "/api/bookings/create",
+            data={"room_id": room.id, "date_start": date_start, "date_end": date_end},
+        )
+
+    def test_cached_per_room(self):
+        """Повторный запрос не обращается к БД, другие комнаты не сбрасывают кэш"""
+        self.create_booking(self.room, "2023-01-01", "2023-01-05")
+        first = self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(first.content, second.content)
+
+        self.create_booking(self.other_room, "2023-01-01", "2023-01-05")
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    def test_invalidated_by_create_and_delete(self):
+        """Создание и удаление брони меняют версию комнаты"""
+        etag = self.client.get(self.url)["ETag"]
+
+        booking_id = self.create_booking(self.room, "2023-01-01", "2023-01-05").json()["booking_id"]
+        resp = self.client.get(self.url)
+        self.assertEqual(len(resp.json()), 1)
+        self.assertNotEqual(resp["ETag"], etag)
+
+        self.client.post("/api/bookings/delete", data={"booking_id": booking_id})
+        self.assertEqual(self.client.get(self.url).json(), [])
+
+    def test_if_none_match(self):
+        """Опрос календаря с If-None-Match получает 304 без обращения к БД"""
+        resp = self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=resp["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+        self.create_booking(self.room, "2023-01-01", "2023-01-05")
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=resp["ETag"]).status_code, 200
+        )
+
+    def test_deleted_room_not_served_from_cache(self):
+        """Удалённая комната отвечает 404, даже если её список был в кэше"""
+        self.client.get(self.url)
+        self.client.post("/api/rooms/delete", data={"room_id": self.room.id})
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertEqual(self.client.get("/api/bookings/list?room_id=abc").status_code, 404)
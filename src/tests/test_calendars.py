@@ -0,0 +1,256 @@
+from datetime import date
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api import calendars
+from api.bulk import bulk_create_bookings
+from api.models import Booking, Room
+
+
+class CalendarTest(TestCase):
+    """Тесты битовых календарей занятости комнат"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.room = Room.objects.create(description="Room", price=100)
+        self.other = Room.objects.create(description="Other", price=250)
+
+    def busy(self, room):
+        """Занятые дни комнаты по её календарю"""
+        bits = calendars.to_int(Room.objects.get(pk=room.pk).calendar)
+        return [
+            calendars.EPOCH.fromordinal(calendars.EPOCH.toordinal() + i).isoformat()
+            for i in range(bits.bit_length())
+            if bits >> i & 1
+        ]
+
+    def available(self, date_start, date_end):
+        resp = self.client.get(
+            "/api/rooms/available", {"date_start": date_start, "date_end": date_end}
+        )
+        self.assertEqual(resp.status_code, 200)
+        return [room["room_id"] for room in resp.json()]
+
+    def test_masks(self):
+        """Маска периода и проверка свободности по окну календаря"""
+        mask = calendars.range_mask(date(2020, 1, 3), date(2020, 1, 5))
+        self.assertEqual(mask, 0b11100)
+        self.assertEqual(calendars.dates_mask([date(2020, 1, 3), date(2020, 1, 5)]), 0b10100)
+        calendar = calendars.to_bytes(mask)
+        self.assertFalse(calendars.is_free_on(calendar, calendars.dates_mask([date(2020, 1, 5)])))
+        self.assertTrue(
+            calendars.is_free_on(
+                calendar, calendars.dates_mask([date(2020, 1, 2), date(2020, 2, 1)])
+            )
+        )
+        self.assertTrue(calendars.is_free_on(calendar, 0))
+        self.assertFalse(calendars.is_free(calendar, date(2020, 1, 5), date(2020, 3, 1)))
+        self.assertTrue(calendars.is_free(calendar, date(2020, 1, 6), date(2020, 3, 1)))
+        self.assertTrue(calendars.is_free(b"", date(2024, 1, 1), date(2024, 1, 2)))
+        self.assertEqual(calendars.without_range(calendar, date(2020, 1, 3), date(2020, 1, 5)), b"")
+
+    def test_booking_create_update_delete(self):
+        """Календарь следует за созданием, изменением и удалением брони"""
+        resp = self.client.post(
+            "/api/bookings/create",
+            {"room_id": self.room.id, "date_start": "2024-01-01", "date_end": "2024-01-02"},
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.busy(self.room), ["2024-01-01", "2024-01-02"])
+
+        resp = self.client.post(
+            "/api/bookings/create",
+            {"room_id": self.room.id, "date_start": "2024-01-02", "date_end": "2024-01-04"},
+        )
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(self.busy(self.room), ["2024-01-01", "2024-01-02"])
+
+        booking = Booking.objects.get(id=self.room.bookings.get().id)
+        booking.room = self.other
+        booking.date_start = booking.date_end = date(2024, 2, 1)
+        booking.save()
+        self.assertEqual(self.busy(self.room), [])
+        self.assertEqual(self.busy(self.other), ["2024-02-01"])
+
+        # Бронь, загруженная без дат, изменяется через save() с update_fields
+        booking = Booking.objects.only("id").get(id=booking.id)
+        booking.date_end = date(2024, 2, 2)
+        booking.save(update_fields=["date_end"])
+        self.assertEqual(self.busy(self.other), ["2024-02-01", "2024-02-02"])
+
+        self.client.post("/api/bookings/delete", {"booking_id": booking.id})
+        self.assertEqual(self.busy(self.other), [])
+
+    def test_bulk_create(self):
+        """Пакетное создание проверяет и дополняет календари"""
+        Booking.objects.create(
+            room=self.room, date_start=date(2024, 1, 5), date_end=date(2024, 1, 6)
+        )
+        results = bulk_create_bookings(
+            [
+                {"room_id": self.room.id, "date_start": "2024-01-01", "date_end": "2024-01-02"},
+                {"room_id": self.room.id, "date_start": "2024-01-06", "date_end": "2024-01-07"},
+                {"room_id": self.other.id, "date_start": "2024-01-02", "date_end": "2024-01-02"},
+            ]
+        )
+        self.assertIn("booking_id", results[0])
+        self.assertIn("error", results[1])
+        self.assertIn("booking_id", results[2])
+        self.assertEqual(
+            self.busy(self.room), ["2024-01-01", "2024-01-02", "2024-01-05", "2024-01-06"]
+        )
+        self.assertEqual(self.busy(self.other), ["2024-01-02"])
+
+    def test_room_save_keeps_calendar(self):
+        """Сохранение загруженной комнаты не перезаписывает календарь"""
+        room = Room.objects.get(pk=self.room.pk)
+        resp = self.client.post(
+            "/api/bookings/create",
+            {"room_id": room.id, "date_start": "2024-01-01", "date_end": "2024-01-05"},
+        )
+        self.assertEqual(resp.status_code, 200)
+
+        room.price = 120
+        room.save()
+        self.assertEqual(len(self.busy(room)), 5)
+        self.assertEqual(Room.objects.get(pk=room.pk).price, 120)
+        resp = self.client.post(
+            "/api/bookings/create",
+            {"room_id": room.id, "date_start": "2024-01-02", "date_end": "2024-01-03"},
+        )
+        self.assertEqual(resp.status_code, 400)
+
+        # Явно указанный календарь сохраняется
+        room.calendar = b""
+        room.save(update_fields=["calendar"])
+        self.assertEqual(self.busy(room), [])
+
+    def test_room_delete(self):
+        """Удаление комнаты с бронями не обновляет календарь удаляемой комнаты"""
+        Booking.objects.create(
+            room=self.room, date_start=date(2024, 1, 1), date_end=date(2024, 1, 2)
+        )
+        resp = self.client.post("/api/rooms/delete", {"room_id": self.room.id})
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(Room.objects.filter(pk=self.room.pk).exists())
+        self.assertEqual(calendars._deleting_rooms.get(), frozenset())
+
+    def test_available_rooms(self):
+        """Поиск свободных комнат по календарям, через NumPy и без него"""
+        Booking.objects.create(
+            room=self.room, date_start=date(2024, 1, 1), date_end=date(2024, 1, 3)
+        )
+        for min_rooms in (0, 10**9):
+            with mock.patch.object(calendars, "NUMPY_MIN_ROOMS", min_rooms):
+                self.assertEqual(self.available("2024-01-03", "2024-01-05"), [self.other.id])
+                self.assertEqual(
+                    self.available("2024-01-04", "2024-01-05"), [self.room.id, self.other.id]
+                )
+
+        with mock.patch.object(calendars, "np", None):
+            self.assertEqual(self.available("2024-01-02", "2024-01-02"), [self.other.id])
+
+    def test_available_on_dates(self):
+        """Комнаты, свободные во все перечисленные даты"""
+        Booking.objects.create(
+            room=self.room, date_start=date(2024, 1, 3), date_end=date(2024, 1, 5)
+        )
+        Booking.objects.create(
+            room=self.other, date_start=date(2024, 3, 1), date_end=date(2024, 3, 1)
+        )
+        for min_rooms in (0, 10**9):
+            with mock.patch.object(calendars, "NUMPY_MIN_ROOMS", min_rooms):
+                for dates, expected in (
+                    ("2024-01-02,2024-01-06,2024-02-29", [self.room.id, self.other.id]),
+                    ("2024-01-02,2024-01-04", [self.other.id]),
+                    ("2024-03-01, 2024-01-01", [self.room.id]),
+                    ("2024-01-05,2024-03-01", []),
+                ):
+                    resp = self.client.get("/api/rooms/available", {"dates": dates})
+                    self.assertEqual([room["room_id"] for room in resp.json()], expected)
+
+        for params in (
+            {"dates": "2024-01-02,abc"},
+            {"dates": "2019-12-31,2024-01-02"},
+            {"dates": "2024-01-02", "date_start": "2024-01-02"},
+            {"dates": ",".join(f"2024-{m:02}-{d:02}" for m in range(1, 13) for d in range(1, 32))},
+        ):
+            self.assertEqual(self.client.get("/api/rooms/available", params).status_code, 400)
+
+    def test_dates_before_epoch(self):
+        """Периоды раньше EPOCH проверяются по броням"""
+        Booking.objects.create(
+            room=self.room, date_start=date(2019, 12, 30), date_end=date(2020, 1, 1)
+        )
+        self.assertEqual(self.busy(self.room), ["2020-01-01"])
+        self.assertEqual(self.available("2019-12-29", "2019-12-30"), [self.other.id])
+
+        resp = self.client.post(
+            "/api/bookings/create",
+            {"room_id": self.room.id, "date_start": "2019-12-25", "date_end": "2019-12-31"},
+        )
+        self.assertEqual(resp.status_code, 400)
+
+        resp = self.client.post(
+            "/api/bookings/create",
+            {"room_id": self.other.id, "date_start": "2019-12-31", "date_end": "2020-01-02"},
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.busy(self.other), ["2020-01-01", "2020-01-02"])
+
+    def test_dates_after_last_day(self):
+        """Дальние периоды проверяются в SQL, календарь не растёт за LAST_DAY"""
+        far = {"room_id": self.room.id, "date_start": "9999-12-30", "date_end": "9999-12-31"}
+        self.assertEqual(self.client.post("/api/bookings/create", far).status_code, 200)
+        self.assertEqual(self.busy(self.room), [])
+        self.assertEqual(self.client.post("/api/bookings/create", far).status_code, 400)
+        self.assertEqual(self.available("9999-12-31", "9999-12-31"), [self.other.id])
+
+        # Дни внутри календаря у брони, выходящей за LAST_DAY, в нём отмечаются
+        resp = self.client.post(
+            "/api/bookings/create",
+            {"room_id": self.room.id, "date_start": "2049-12-30", "date_end": "2050-01-02"},
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.busy(self.room), ["2049-12-30", "2049-12-31"])
+        self.assertLessEqual(
+            len(Room.objects.get(pk=self.room.pk).calendar),
+            (calendars.LAST_DAY - calendars.EPOCH).days // 8 + 1,
+        )
+        resp = self.client.post(
+            "/api/bookings/create",
+            {"room_id": self.room.id, "date_start": "2049-12-31", "date_end": "2049-12-31"},
+        )
+        self.assertEqual(resp.status_code, 400)
+        result = bulk_create_bookings(
+            [{"room_id": self.room.id, "date_start": "2050-01-02", "date_end": "2050-01-03"}]
+        )
+        self.assertIn("error", result[0])
+
+        calendars.rebuild()
+        self.assertEqual(self.busy(self.room), ["2049-12-30", "2049-12-31"])
+
+    def test_rebuild_command(self):
+        """rebuild_calendars восстанавливает календари после изменений в обход ORM"""
+        Booking.objects.create(
+            room=self.room, date_start=date(2024, 1, 1), date_end=date(2024, 1, 1)
+        )
+        Room.objects.update(calendar=b"")
+        Booking.objects.bulk_create(
+            [Booking(room=self.other, date_start=date(2024, 3, 1), date_end=date(2024, 3, 2))]
+        )
+
+        out = StringIO()
+        call_command("rebuild_calendars", stdout=out)
+        self.assertIn("2", out.getvalue())
+        self.assertEqual(self.busy(self.room), ["2024-01-01"])
+        self.assertEqual(self.busy(self.other), ["2024-03-01", "2024-03-02"])
+
+        Room.objects.update(calendar=b"")
+        call_command("rebuild_calendars", "--room", str(self.room.id), stdout=StringIO())
+        self.assertEqual(self.busy(self.room), ["2024-01-01"])
+        self.assertEqual(self.busy(self.other), [])
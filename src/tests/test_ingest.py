@@ -0,0 +1,239 @@
+import tempfile
+from datetime import date
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import OperationalError
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from api import calendars, ingest
+from api.bookings import create_booking
+from api.bulk import bulk_create_bookings
+from api.ingest import BookingQueue
+from api.models import Booking, Room
+
+
+class _QueueMixin:
+    start_worker = False
+
+    def setUp(self):
+        self.client = APIClient()
+        self.room = Room.objects.create(description="Room", price=100)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.spool = Path(tmp.name) / "spool.jsonl"
+        self.queue = self.new_queue()
+        patcher = mock.patch.object(ingest, "booking_queue", self.queue)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def new_queue(self):
+        queue = BookingQueue(spool_path=str(self.spool), start_worker=self.start_worker)
+        self.addCleanup(queue.stop, 5)
+        return queue
+
+    def book(self, date_start, date_end, room=None):
+        room = room or self.room
+        return self.client.post(
+            "/api/bookings/create",
+            {"room_id": room.id, "date_start": date_start, "date_end": date_end},
+        )
+
+
+@override_settings(API_BOOKING_QUEUE=True)
+class BookingQueueTest(_QueueMixin, TestCase):
+    """Тесты очереди отложенной записи броней"""
+
+    def test_accept_and_drain(self):
+        resp = self.book("2024-01-01", "2024-01-03")
+        self.assertEqual(resp.status_code, 202)
+        token = resp.json()["token"]
+        self.assertEqual(resp.json()["status"], "pending")
+        self.assertFalse(Booking.objects.exists())
+
+        # Пересечение с принятой бронью отклоняется сразу, до записи в БД
+        self.assertEqual(self.book("2024-01-03", "2024-01-04").status_code, 400)
+        self.assertEqual(
+            self.client.post(
+                "/api/bookings/create",
+                {"room_id": 999999, "date_start": "2024-01-01", "date_end": "2024-01-02"},
+            ).status_code,
+            404,
+        )
+
+        resp = self.client.get(f"/api/bookings/status?token={token}")
+        self.assertEqual(resp.json(), {"token": token, "status": "pending"})
+
+        self.assertEqual(self.queue.drain(), (1, 0))
+        booking = Booking.objects.get()
+        self.assertEqual(
+            (booking.date_start, booking.date_end), (date(2024, 1, 1), date(2024, 1, 3))
+        )
+        resp = self.client.get(f"/api/bookings/status?token={token}")
+        self.assertEqual(
+            resp.json(), {"token": token, "status": "created", "booking_id": booking.id}
+        )
+        room = Room.objects.get(pk=self.room.pk)
+        self.assertFalse(calendars.is_free(room.calendar, date(2024, 1, 2), date(2024, 1, 2)))
+        # Записанная бронь по-прежнему занимает период
+        self.assertEqual(self.book("2024-01-02", "2024-01-02").status_code, 400)
+
+    def test_rejected_on_write(self):
+        """Конфликт с записью в обход очереди обнаруживается при записи пачки"""
+        token = self.book("2024-02-01", "2024-02-05").json()["token"]
+        # Запись другого процесса, о которой очередь не знала при приёме
+        create_booking(self.room.id, date(2024, 2, 4), date(2024, 2, 6))
+        self.assertEqual(self.queue.drain(), (0, 1))
+        status = self.queue.status(token)
+        self.assertEqual(status["status"], "rejected")
+        self.assertIn("already booked", status["error"])
+
+    def test_spool_replay(self):
+        """Принятые, но не записанные брони переживают перезапуск процесса"""
+        first = self.book("2024-03-01", "2024-03-02").json()["token"]
+        second = self.book("2024-03-05", "2024-03-06").json()["token"]
+        self.queue.stop()
+        # Недописанная строка при падении процесса игнорируется
+        with open(self.spool, "a", encoding="utf-8") as file:
+            file.write('{"put": {"tok')
+
+        restarted = self.new_queue()
+        restarted.start()
+        self.assertEqual(restarted.status(first), {"status": "pending"})
+        self.assertEqual(restarted.drain(), (2, 0))
+        self.assertEqual(restarted.status(second)["status"], "created")
+        self.assertEqual(Booking.objects.count(), 2)
+        self.assertEqual(self.spool.read_text(), "")
+
+        restarted.stop()
+        self.assertEqual(self.new_queue().drain(), (0, 0))
+
+    def test_status_shared_between_workers(self):
+        """Статус токена отдаёт любая очередь с общим кэшем, в том числе после перезапуска"""
+        token = self.book("2024-04-01", "2024-04-02").json()["token"]
+        self.queue.drain()
+        booking_id = Booking.objects.get().id
+        self.queue.stop()
+
+        other = BookingQueue(spool_path=str(self.spool) + ".other", start_worker=False)
+        with mock.patch.object(ingest, "booking_queue", other):
+            resp = self.client.get(f"/api/bookings/status?token={token}")
+        self.assertEqual(
+            resp.json(), {"token": token, "status": "created", "booking_id": booking_id}
+        )
+
+        # Без хранения в кэше статус известен только принявшей очереди
+        with override_settings(
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+        ):
+            self.assertIsNone(other.status(token))
+            self.assertEqual(self.queue.status(token)["status"], "created")
+
+    def test_replay_skips_written_tokens(self):
+        """Брони с итоговым статусом в кэше не повторяются после перезапуска"""
+        token = self.book("2024-04-10", "2024-04-11").json()["token"]
+        # Пачка записана, процесс упал до отметки в журнале
+        with mock.patch.object(self.queue._spool, "done"):
+            self.queue.drain()
+        self.queue.stop()
+
+        restarted = self.new_queue()
+        self.assertEqual(restarted.drain(), (0, 0))
+        self.assertEqual(restarted.status(token)["status"], "created")
+        self.assertEqual(self.spool.read_text(), "")
+
+    def test_spool_is_locked(self):
+        """Журнал с явным путём не открывается второй очередью"""
+        self.queue.start()
+        with self.assertRaises(ingest.SpoolLockedError):
+            self.new_queue().start()
+        with self.assertRaises(CommandError):
+            call_command("drain_booking_queue", "--spool", str(self.spool), stdout=StringIO())
+
+        self.queue.stop()
+        self.new_queue().start()
+
+    def test_spool_slots(self):
+        """Очереди с общим API_BOOKING_QUEUE_SPOOL занимают разные журналы"""
+        first, second = BookingQueue(start_worker=False), BookingQueue(start_worker=False)
+        for queue in (first, second):
+            self.addCleanup(queue.stop)
+        with override_settings(API_BOOKING_QUEUE_SPOOL=str(self.spool)):
+            first.start()
+            second.start()
+            self.assertEqual(first._spool.path, str(self.spool))
+            self.assertEqual(second._spool.path, str(self.spool.with_suffix(".1.jsonl")))
+
+            with mock.patch.object(ingest, "booking_queue", second):
+                token = self.book("2024-05-01", "2024-05-02").json()["token"]
+            second.stop()
+            # Журнал работающей очереди пропускается, остановленной - записывается
+            out = StringIO()
+            call_command("drain_booking_queue", stdout=out)
+            self.assertIn("Пропущен журнал", out.getvalue())
+            self.assertIn("Записано броней: 1", out.getvalue())
+        # Статус, записанный командой, виден и принявшей бронь очереди
+        booking = Booking.objects.get(room=self.room)
+        self.assertEqual(second.status(token), {"status": "created", "booking_id": booking.id})
+
+    def test_write_errors(self):
+        """Ошибки соединения повторяются, остальные отклоняют пачку"""
+        first = self.book("2024-06-01", "2024-06-02").json()["token"]
+        with (
+            mock.patch("api.bulk.bulk_create_bookings", side_effect=ValueError("bad row")),
+            self.assertLogs("api.ingest", "ERROR"),
+        ):
+            self.assertEqual(self.queue.drain(), (0, 1))
+        self.assertEqual(
+            self.queue.status(first), {"status": "rejected", "error": ingest.WRITE_FAILED}
+        )
+        self.assertEqual(self.spool.read_text(), "")
+        # Период отклонённой брони снова свободен
+        second = self.book("2024-06-01", "2024-06-02").json()["token"]
+
+        errors = [OperationalError("database is locked")]
+
+        def locked_once(items):
+            if errors:
+                raise errors.pop()
+            return bulk_create_bookings(items)
+
+        with (
+            mock.patch("api.bulk.bulk_create_bookings", side_effect=locked_once),
+            mock.patch.object(ingest.time, "sleep") as sleep,
+            self.assertLogs("api.ingest", "ERROR"),
+        ):
+            self.assertEqual(self.queue.drain(), (1, 0))
+        sleep.assert_called_once_with(ingest.RETRY_DELAY)
+        self.assertEqual(self.queue.status(second)["status"], "created")
+
+    def test_dates_before_epoch_are_synchronous(self):
+        resp = self.book("2019-12-30", "2020-01-02")
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("booking_id", resp.json())
+
+    def test_status_errors(self):
+        self.assertEqual(self.client.get("/api/bookings/status").status_code, 400)
+        resp = self.client.get("/api/bookings/status?token=unknown")
+        self.assertEqual(resp.status_code, 404)
+        self.assertEqual(resp.json(), {"error": "token not found"})
+
+
+@override_settings(API_BOOKING_QUEUE=True, API_BOOKING_QUEUE_FLUSH_INTERVAL=0.01)
+class BookingQueueWorkerTest(_QueueMixin, TransactionTestCase):
+    """Фоновый поток записывает принятые брони пачками"""
+
+    start_worker = True
+
+    def test_worker_writes_batches(self):
+        tokens = [
+            self.book(f"2024-04-{day:02d}", f"2024-04-{day:02d}").json()["token"]
+            for day in range(1, 11)
+        ]
+        self.queue.join()
+        statuses = [self.queue.status(token)["status"] for token in tokens]
+        self.assertEqual(statuses, ["created"] * 10)
+        self.assertEqual(Booking.objects.filter(room=self.room).count(), 10)
@@ -0,0 +1,72 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path
+from rest_framework.test import APIClient
+
+from api.metrics import metrics_view, registry
+from api.models import Room
+
+urlpatterns = [
+    path("api/", include("api.urls")),
+    path("metrics", metrics_view, name="metrics"),
+]
+
+
+@override_settings(
+    ROOT_URLCONF=__name__,
+    MIDDLEWARE=["api.middleware.RequestMetricsMiddleware", *settings.MIDDLEWARE],
+)
+class RequestMetricsTest(TestCase):
+    """Тесты middleware метрик запросов"""
+
+    def setUp(self):
+        self.client = APIClient()
+        registry.reset()
+        self.room = Room.objects.create(description="Room", price=100)
+
+    def test_server_timing_header(self):
+        """Заголовок Server-Timing с числом SQL-запросов"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/rooms/list")
+
+        timing = response["Server-Timing"]
+        self.assertIn(f'desc="{len(queries)} queries"', timing)
+        for name in ("db", "serialize", "render", "total"):
+            self.assertRegex(timing, rf"{name};dur=\d+\.\d\d")
+
+    def test_drf_render_time(self):
+        """Время рендеринга ответа DRF учитывается отдельно от представления"""
+        response = self.client.post(
+            "/api/bookings/create",
+            {"room_id": self.room.id, "date_start": "2023-01-10", "date_end": "2023-01-15"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        render = float(re.search(r"render;dur=([\d.]+)", response["Server-Timing"]).group(1))
+        self.assertGreater(render, 0)
+
+    def test_prometheus_endpoint(self):
+        """Агрегированные метрики по представлениям"""
+        self.client.get("/api/rooms/list")
+        self.client.get("/api/rooms/list")
+        self.client.get(f"/api/bookings/list?room_id={self.room.id}")
+
+        response = self.client.get("/metrics")
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+
+        self.assertIn('api_requests_total{view="api:room_list",method="GET",status="200"} 2', body)
+        self.assertIn('api_request_duration_seconds_count{view="api:booking_list"} 1', body)
+        self.assertIn('api_request_duration_seconds_bucket{view="api:room_list",le="+Inf"} 2', body)
+        # Второй запрос списка отдаётся из кэша без обращения к БД
+        self.assertIn('api_db_queries_total{view="api:room_list"} 1', body)
+        self.assertIn("# TYPE api_request_duration_seconds histogram", body)
+
+    def test_unmatched_requests(self):
+        """Запросы без представления (404) учитываются отдельно"""
+        self.client.get("/missing")
+        self.assertIn('view="unmatched",method="GET",status="404"', registry.render())
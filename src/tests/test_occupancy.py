@@ -0,0 +1,150 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.bulk import bulk_create_bookings
+from api.models import Booking, Room, RoomNight
+
+
+class OccupancyTest(TestCase):
+    """Тесты таблицы занятости RoomNight и отчёта occupancy"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.room = Room.objects.create(description="Room", price=100)
+        self.other = Room.objects.create(description="Other", price=250)
+
+    def nights(self, room=None):
+        nights = RoomNight.objects.order_by("room_id", "date")
+        if room is not None:
+            nights = nights.filter(room=room)
+        return [(night.date.isoformat(), str(night.price)) for night in nights]
+
+    def test_booking_create_update_delete(self):
+        """Дни занятости следуют за созданием, изменением и удалением брони"""
+        resp = self.client.post(
+            "/api/bookings/create",
+            {"room_id": self.room.id, "date_start": "2024-01-01", "date_end": "2024-01-03"},
+        )
+        booking = Booking.objects.get(id=resp.json()["booking_id"])
+        self.assertEqual(
+            self.nights(),
+            [("2024-01-01", "100.00"), ("2024-01-02", "100.00"), ("2024-01-03", "100.00")],
+        )
+
+        booking.room = self.other
+        booking.date_start, booking.date_end = date(2024, 2, 1), date(2024, 2, 2)
+        booking.save()
+        self.assertEqual(self.nights(), [("2024-02-01", "250.00"), ("2024-02-02", "250.00")])
+
+        self.client.post("/api/bookings/delete", {"booking_id": booking.id})
+        self.assertEqual(self.nights(), [])
+
+    def test_bulk_create_and_room_delete(self):
+        """Пакетное создание дополняет таблицу, удаление комнаты очищает её дни"""
+        results = bulk_create_bookings(
+            [
+                {"room_id": self.room.id, "date_start": "2024-01-01", "date_end": "2024-01-02"},
+                {"room_id": self.other.id, "date_start": "2024-01-02", "date_end": "2024-01-02"},
+            ]
+        )
+        self.assertTrue(all("booking_id" in result for result in results))
+        self.assertEqual(len(self.nights(self.room)), 2)
+        self.assertEqual(self.nights(self.other), [("2024-01-02", "250.00")])
+
+        self.client.post("/api/rooms/delete", {"room_id": self.room.id})
+        self.assertEqual(self.nights(), [("2024-01-02", "250.00")])
+
+    def test_booking_length_is_bounded(self):
+        """Длина новой брони ограничена, дни вне календаря в таблицу не попадают"""
+        resp = self.client.post(
+            "/api/bookings/create",
+            {"room_id": self.room.id, "date_start": "1900-01-01", "date_end": "2199-12-31"},
+        )
+        self.assertEqual(resp.status_code, 400)
+        results = bulk_create_bookings(
+            [{"room_id": self.room.id, "date_start": "2024-01-01", "date_end": "2025-01-01"}]
+        )
+        self.assertIn("error", results[0])
+        self.assertFalse(Booking.objects.exists())
+
+        # Брони в обход API разворачиваются только в пределах календаря
+        Booking.objects.create(room=self.room, date_start="2019-12-30", date_end="2020-01-02")
+        Booking.objects.create(room=self.other, date_start="2049-12-31", date_end="2199-12-31")
+        expected = [
+            ("2020-01-01", "100.00"),
+            ("2020-01-02", "100.00"),
+            ("2049-12-31", "250.00"),
+        ]
+        self.assertEqual(self.nights(), expected)
+        call_command("rebuild_occupancy", stdout=StringIO())
+        self.assertEqual(self.nights(), expected)
+
+    def test_room_price_change(self):
+        """Новая цена комнаты попадает в её дни занятости"""
+        Booking.objects.create(room=self.room, date_start="2024-01-01", date_end="2024-01-02")
+        self.room.price = 120
+        self.room.save()
+        self.assertEqual(self.nights(), [("2024-01-01", "120.00"), ("2024-01-02", "120.00")])
+
+    def test_rebuild_command(self):
+        """Команда rebuild_occupancy восстанавливает таблицу по броням"""
+        Booking.objects.create(room=self.room, date_start="2024-01-01", date_end="2024-01-02")
+        Booking.objects.create(room=self.other, date_start="2024-01-05", date_end="2024-01-05")
+        expected = self.nights()
+
+        RoomNight.objects.all().delete()
+        out = StringIO()
+        call_command("rebuild_occupancy", stdout=out)
+        self.assertIn("3", out.getvalue())
+        self.assertEqual(self.nights(), expected)
+
+        RoomNight.objects.filter(room=self.other).update(price=1)
+        call_command("rebuild_occupancy", "--room", str(self.other.id), stdout=StringIO())
+        self.assertEqual(self.nights(), expected)
+
+    def test_occupancy_report(self):
+        """Занятость и выручка по дням без чтения броней"""
+        Booking.objects.create(room=self.room, date_start="2024-01-01", date_end="2024-01-02")
+        Booking.objects.create(room=self.other, date_start="2024-01-02", date_end="2024-01-03")
+
+        # Число комнат и агрегат по таблице занятости
+        with self.assertNumQueries(2):
+            resp = self.client.get("/api/occupancy?from=2023-12-31&to=2024-01-03")
+        self.assertEqual(resp.status_code, 200)
+        report = resp.json()
+
+        self.assertEqual(report["rooms"], 2)
+        self.assertEqual(
+            [(day["date"], day["occupied"], day["revenue"]) for day in report["days"]],
+            [
+                ("2023-12-31", 0, "0.00"),
+                ("2024-01-01", 1, "100.00"),
+                ("2024-01-02", 2, "350.00"),
+                ("2024-01-03", 1, "250.00"),
+            ],
+        )
+        self.assertEqual(report["days"][2]["occupancy"], 1.0)
+        self.assertEqual(report["total"], {"room_nights": 4, "occupancy": 0.5, "revenue": "700.00"})
+
+        resp = self.client.get(
+            f"/api/occupancy?from=2024-01-01&to=2024-01-02&room_id={self.other.id}"
+        )
+        self.assertEqual(resp.json()["rooms"], 1)
+        self.assertEqual(resp.json()["total"]["revenue"], "250.00")
+
+    def test_occupancy_invalid_params(self):
+        """Ошибки параметров отчёта"""
+        for query in (
+            "",
+            "?from=2024-01-10&to=2024-01-01",
+            "?from=2024-01-01&to=bad",
+            f"?from=2024-01-01&to={date(2030, 1, 1).isoformat()}",
+            "?from=2019-12-01&to=2020-01-31",
+        ):
+            resp = self.client.get(f"/api/occupancy{query}")
+            self.assertEqual(resp.status_code, 400, query)
+            self.assertIn("error", resp.json())
@@ -0,0 +1,133 @@
+import base64
+import json
+
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.models import Booking, Room
+from api.pagination import KeysetPagination
+
+
+@override_settings(API_PAGINATION={"DEFAULT_PAGE_SIZE": 2, "MAX_PAGE_SIZE": 3})
+class KeysetPaginationTest(TestCase):
+    """Тесты keyset-пагинации списков"""
+
+    def setUp(self):
+        self.client = APIClient()
+        # Повторяющиеся цены проверяют разрешение равенства по id
+        self.rooms = [
+            Room.objects.create(description=f"Room {i}", price=price)
+            for i, price in enumerate([300, 100, 200, 100, 200, 100, 300])
+        ]
+
+    def walk(self, url):
+        """Обход всех страниц списка"""
+        items, pages = [], 0
+        cursor = None
+        while True:
+            page_url = f"{url}&cursor={cursor}" if cursor else url
+            resp = self.client.get(page_url)
+            self.assertEqual(resp.status_code, 200)
+            body = resp.json()
+            items.extend(body["results"])
+            pages += 1
+            cursor = body["next_cursor"]
+            if cursor is None:
+                return items, pages
+
+    def test_rooms_pages_follow_sort_order(self):
+        """Страницы в сумме дают полный отсортированный список без повторов"""
+        for sort_by, order in [("price", "asc"), ("price", "desc"), ("id", "desc")]:
+            items, pages = self.walk(f"/api/rooms/list?sort_by={sort_by}&order={order}&page_size=2")
+
+            expected = sorted(
+                self.rooms,
+                key=lambda room: (getattr(room, sort_by), room.id),
+                reverse=order == "desc",
+            )
+            self.assertEqual([item["room_id"] for item in items], [room.id for room in expected])
+            self.assertEqual(pages, 4)
+
+    def test_rooms_created_at_cursor(self):
+        """Курсор по дате создания"""
+        items, _ = self.walk("/api/rooms/list?sort_by=created_at&order=desc&page_size=3")
+        self.assertEqual([item["room_id"] for item in items], [r.id for r in reversed(self.rooms)])
+
+    def test_default_and_max_page_size(self):
+        """Размер страницы берётся из настроек API и ограничен максимумом"""
+        resp = self.client.get("/api/rooms/list?cursor=")
+        self.assertEqual(len(resp.json()["results"]), 2)
+
+        resp = self.client.get("/api/rooms/list?page_size=1000")
+        self.assertEqual(len(resp.json()["results"]), 3)
+
+    def test_no_offset_in_queries(self):
+        """Следующая страница выбирается без OFFSET"""
+        first = self.client.get("/api/rooms/list?sort_by=price&page_size=2").json()
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(f"/api/rooms/list?sort_by=price&cursor={first['next_cursor']}")
+
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertNotIn("OFFSET", ctx.captured_queries[0]["sql"].upper())
+
+    def test_cursor_reads_index_range(self):
+        """Страница с курсором читается из индекса (price, id) с позиции курсора"""
+        rows = Room.objects.values_list("id", "price")
+        for ordering, condition in (("price", "(price>?)"), ("-price", "(price<?)")):
+            paginator = KeysetPagination(ordering, columns=("id", "price"))
+            request = RequestFactory().get("/api/rooms/list", {"page_size": 2})
+            paginator.paginate_queryset(rows, request)
+
+            params = {"page_size": 2, "cursor": paginator.next_cursor}
+            request = RequestFactory().get("/api/rooms/list", params)
+            page, _ = paginator._page_queryset(rows, request)
+            # explain() передаёт значения курсора параметрами, как и сам запрос страницы
+            plan = page.explain()
+            self.assertIn("SEARCH api_room USING COVERING INDEX", plan, ordering)
+            self.assertIn(condition, plan, ordering)
+            self.assertNotIn("SCAN", plan, ordering)
+
+    def test_invalid_parameters(self):
+        """Некорректный курсор или размер страницы"""
+        self.assertEqual(self.client.get("/api/rooms/list?cursor=garbage").status_code, 400)
+        self.assertEqual(self.client.get("/api/rooms/list?page_size=abc").status_code, 400)
+        self.assertEqual(self.client.get("/api/rooms/list?page_size=0").status_code, 400)
+
+    def test_tampered_cursor(self):
+        """Курсор с недопустимыми типами значений - 400, а не ошибка сервера"""
+        for sort_by, raw in (
+            ("created_at", [{"a": 1}, 1]),
+            ("created_at", [[1, 2], 1]),
+            ("created_at", [1.5, 1]),
+            ("price", [True, 1]),
+            ("price", ["100.00", True]),
+        ):
+            cursor = base64.urlsafe_b64encode(json.dumps(raw).encode()).decode()
+            with self.subTest(raw=raw):
+                resp = self.client.get(f"/api/rooms/list?sort_by={sort_by}&cursor={cursor}")
+                self.assertEqual(resp.status_code, 400)
+                self.assertEqual(resp.json(), {"error": "invalid cursor"})
+
+    def test_unpaginated_list_unchanged(self):
+        """Без параметров пагинации возвращается полный список"""
+        resp = self.client.get("/api/rooms/list")
+        self.assertEqual(len(resp.json()), len(self.rooms))
+
+    def test_bookings_pages(self):
+        """Пагинация списка бронирований комнаты"""
+        room = self.rooms[0]
+        for day in (20, 1, 10, 5, 15):
+            Booking.objects.create(
+                room=room, date_start=f"2023-01-{day:02d}", date_end=f"2023-01-{day:02d}"
+            )
+
+        items, pages = self.walk(f"/api/bookings/list?room_id={room.id}&page_size=2")
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(
+            [item["date_start"] for item in items],
+            ["2023-01-01", "2023-01-05", "2023-01-10", "2023-01-15", "2023-01-20"],
+        )
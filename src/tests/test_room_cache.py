@@ -0,0 +1,101 @@
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.metrics import render_room_cache
+from api.models import Booking, Room
+from api.room_cache import RoomCache, RoomInfo, room_cache
+
+
+class RoomCacheTest(TestCase):
+    """Тесты кэша метаданных комнат"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.room = Room.objects.create(description="Room", price=100)
+
+    def test_hits_and_misses(self):
+        cache = RoomCache(size=10, ttl=60)
+        with self.assertNumQueries(1):
+            info = cache.get(self.room.id)
+            self.assertEqual(cache.get(self.room.id), info)
+        self.assertEqual(info, RoomInfo(self.room.id, Decimal("100.00"), "Room"))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "size": 1})
+
+        # Отсутствие комнаты не кэшируется
+        with self.assertNumQueries(2):
+            self.assertFalse(cache.exists(999999))
+            self.assertFalse(cache.exists(999999))
+        self.assertEqual(cache.stats()["misses"], 3)
+
+    def test_async_lookup(self):
+        cache = RoomCache(size=10, ttl=60)
+        self.assertTrue(async_to_sync(cache.aexists)(self.room.id))
+        self.assertFalse(async_to_sync(cache.aexists)(999999))
+        with self.assertNumQueries(0):
+            self.assertEqual(cache.get(self.room.id).description, "Room")
+
+    def test_lru_and_ttl(self):
+        other = Room.objects.create(description="Other", price=200)
+        third = Room.objects.create(description="Third", price=300)
+        cache = RoomCache(size=2, ttl=60)
+        cache.get(self.room.id)
+        cache.get(other.id)
+        cache.get(self.room.id)
+        # Вытесняется давно не использованная комната other
+        cache.get(third.id)
+        with self.assertNumQueries(0):
+            cache.get(self.room.id)
+            cache.get(third.id)
+        with self.assertNumQueries(1):
+            cache.get(other.id)
+
+        expired = RoomCache(size=10, ttl=-1)
+        expired.get(self.room.id)
+        with self.assertNumQueries(1):
+            expired.get(self.room.id)
+
+    def test_disabled(self):
+        cache = RoomCache(size=0, ttl=60)
+        cache.get(self.room.id)
+        with self.assertNumQueries(1):
+            cache.get(self.room.id)
+
+    def test_invalidated_by_signals(self):
+        room_cache.get(self.room.id)
+        self.room.price = 150
+        self.room.save()
+        self.assertEqual(room_cache.get(self.room.id).price, Decimal("150.00"))
+
+        Room.objects.get(pk=self.room.pk).delete()
+        self.assertIsNone(room_cache.get(self.room.id))
+
+    def test_bookings_list_existence_check(self):
+        """Список броней проверяет существование комнаты по кэшу, без SQL"""
+        self.assertEqual(self.client.get(f"/api/bookings/list?room_id={self.room.id}").json(), [])
+        Booking.objects.create(room=self.room, date_start="2024-01-01", date_end="2024-01-02")
+
+        # Только выборка броней: версия кэша ответов сменилась, комната - в кэше
+        with self.assertNumQueries(1):
+            resp = self.client.get(f"/api/bookings/list?room_id={self.room.id}")
+        self.assertEqual(len(resp.json()), 1)
+        self.assertEqual(room_cache.stats()["hits"], 1)
+
+    def test_room_delete_view(self):
+        self.client.get(f"/api/bookings/list?room_id={self.room.id}")
+        self.assertEqual(room_cache.stats()["size"], 1)
+        self.client.post("/api/rooms/delete", {"room_id": self.room.id})
+        self.assertEqual(room_cache.stats()["size"], 0)
+
+        resp = self.client.get(f"/api/bookings/list?room_id={self.room.id}")
+        self.assertEqual(resp.status_code, 404)
+
+    def test_metrics(self):
+        room_cache.get(self.room.id)
+        room_cache.get(self.room.id)
+        text = render_room_cache()
+        self.assertIn("api_room_cache_hits_total 1", text)
+        self.assertIn("api_room_cache_misses_total 1", text)
+        self.assertIn("api_room_cache_entries 1", text)
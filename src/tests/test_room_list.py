@@ -0,0 +1,93 @@
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+
+from api.models import Room
+from api.pagination import encode_cursor
+from benchmarks.room_list import CASES, deep_cursor, page_query, reads_index_range, uses_sort
+
+ASYNC_URLS = "tests.test_async_views"
+CREATED = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+class RoomListFiltersTest(TestCase):
+    """Тесты фильтров по цене и дате создания в GET /api/rooms/list"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Room.objects.bulk_create(
+            [Room(description=f"Room {i}", price=Decimal(50 + 10 * i)) for i in range(10)]
+        )
+        cls.rooms = list(Room.objects.order_by("id"))
+        for i, room in enumerate(cls.rooms):
+            room.created_at = CREATED + timedelta(days=i)
+        Room.objects.bulk_update(cls.rooms, ["created_at"])
+
+    def prices(self, query):
+        resp = self.client.get(f"/api/rooms/list?{query}")
+        self.assertEqual(resp.status_code, 200)
+        return [item["price"] for item in resp.json()]
+
+    def test_price_range(self):
+        self.assertEqual(
+            self.prices("sort_by=price&order=desc&min_price=70&max_price=90"),
+            ["90.00", "80.00", "70.00"],
+        )
+        self.assertEqual(self.prices("sort_by=price&min_price=130"), ["130.00", "140.00"])
+
+    def test_created_range(self):
+        self.assertEqual(
+            self.prices("sort_by=created&created_from=2024-01-03&created_to=2024-01-04T00:00:00Z"),
+            ["70.00", "80.00"],
+        )
+
+    def test_filters_with_pagination(self):
+        resp = self.client.get("/api/rooms/list?sort_by=price&max_price=100&page_size=4")
+        page = resp.json()
+        self.assertEqual(len(page["results"]), 4)
+        resp = self.client.get(
+            f"/api/rooms/list?sort_by=price&max_price=100&page_size=4&cursor={page['next_cursor']}"
+        )
+        self.assertEqual([item["price"] for item in resp.json()["results"]], ["90.00", "100.00"])
+        self.assertIsNone(resp.json()["next_cursor"])
+
+    def test_filters_cached_separately(self):
+        self.assertEqual(len(self.prices("max_price=60")), 2)
+        self.assertEqual(len(self.prices("max_price=80")), 4)
+        self.assertEqual(len(self.prices("")), 10)
+
+    def test_invalid_filters(self):
+        for query in ("min_price=abc", "min_price=100&max_price=50", "created_from=yesterday"):
+            resp = self.client.get(f"/api/rooms/list?{query}")
+            self.assertEqual(resp.status_code, 400)
+            self.assertIn("error", resp.json())
+
+    @override_settings(ROOT_URLCONF=ASYNC_URLS)
+    def test_async_view(self):
+        self.assertEqual(self.prices("sort_by=price&min_price=125"), ["130.00", "140.00"])
+        self.assertEqual(self.client.get("/api/rooms/list?max_price=-").status_code, 400)
+
+    def test_order_from_index(self):
+        """Страницы rooms/list читаются в порядке индекса, без сортировки"""
+        for name, ordering, filters in CASES:
+            with self.subTest(name):
+                self.assertFalse(uses_sort(page_query(ordering, filters, 20).explain()))
+
+    def test_cursor_page_from_index(self):
+        """Страница с курсором читается диапазоном индекса с позиции курсора"""
+        room = self.rooms[5]
+        for name, ordering, filters in CASES:
+            field = ordering.lstrip("-")
+            cursor = encode_cursor(getattr(room, field), room.id)
+            with self.subTest(name):
+                plan = page_query(ordering, filters, 20, cursor).explain()
+                self.assertFalse(uses_sort(plan), plan)
+                self.assertTrue(reads_index_range(plan), plan)
+
+    def test_deep_cursor(self):
+        """Курсор глубокой страницы указывает на строку в конце отфильтрованного списка"""
+        cursor = deep_cursor("price", {"max_price": Decimal("100")})
+        page = list(page_query("price", {"max_price": Decimal("100")}, 20, cursor))
+        self.assertEqual([row[0] for row in page], [self.rooms[5].id])
+        self.assertIsNone(deep_cursor("price", {"min_price": Decimal("1000")}))
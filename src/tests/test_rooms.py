@@ -0,0 +1,107 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api import calendars, rooms
+from api.bookings import RoomNotFoundError, create_booking
+from api.ingest import booking_queue
+from api.models import Booking, Room, RoomNight
+from api.occupancy import rebuild
+from api.room_cache import room_cache
+
+
+class RoomDeleteTest(TestCase):
+    """Тесты удаления комнаты с бронями без коллектора ORM"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.room = Room.objects.create(description="Room", price=100)
+        self.other = Room.objects.create(description="Other", price=200)
+        start = date(2024, 1, 1)
+        Booking.objects.bulk_create(
+            Booking(
+                room=room,
+                date_start=start + timedelta(days=3 * i),
+                date_end=start + timedelta(days=3 * i + 1),
+            )
+            for room in (self.room, self.other)
+            for i in range(5)
+        )
+        rebuild()
+
+    def assert_room_deleted(self):
+        self.assertFalse(Room.objects.filter(pk=self.room.pk).exists())
+        self.assertFalse(Booking.objects.filter(room_id=self.room.pk).exists())
+        self.assertFalse(RoomNight.objects.filter(room_id=self.room.pk).exists())
+        # Брони и дни другой комнаты не тронуты
+        self.assertEqual(Booking.objects.filter(room=self.other).count(), 5)
+        self.assertEqual(RoomNight.objects.filter(room=self.other).count(), 10)
+
+    def test_delete_room_query_budget(self):
+        """Три DELETE независимо от числа броней"""
+        # SAVEPOINT, DELETE комнаты, DELETE дней занятости, DELETE броней, RELEASE
+        with self.assertNumQueries(5):
+            self.assertEqual(rooms.delete_room(self.room.pk), 5)
+        self.assert_room_deleted()
+
+        with self.assertRaises(RoomNotFoundError):
+            rooms.delete_room(self.room.pk)
+
+    def test_derived_data_invalidated(self):
+        url = f"/api/bookings/list?room_id={self.room.pk}"
+        self.assertEqual(len(self.client.get(url).json()), 5)
+        self.client.get("/api/rooms/list")
+        self.assertEqual(room_cache.stats()["size"], 1)
+
+        reservations = booking_queue.reservations
+        with mock.patch.object(reservations, "invalidate") as invalidate:
+            resp = self.client.post("/api/rooms/delete", {"room_id": self.room.pk})
+        self.assertEqual(resp.json(), {"ok": True})
+        invalidate.assert_called_with(self.room.pk)
+
+        self.assertEqual(room_cache.stats()["size"], 0)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        ids = [room["room_id"] for room in self.client.get("/api/rooms/list").json()]
+        self.assertEqual(ids, [self.other.pk])
+
+    def test_not_found(self):
+        for room_id in (999999, "abc"):
+            resp = self.client.post("/api/rooms/delete", {"room_id": room_id})
+            self.assertEqual(resp.status_code, 404)
+            self.assertEqual(resp.json(), {"detail": "No Room matches the given query."})
+
+    def test_delete_in_batches(self):
+        self.assertEqual(rooms.delete_room_in_batches(self.room.pk, batch_size=2), 5)
+        self.assert_room_deleted()
+
+    def test_interrupted_batches_free_calendar(self):
+        """Прерванное пачечное удаление оставляет календарь без удалённых броней"""
+        calendars.rebuild([self.room.pk])
+        with mock.patch.object(rooms, "delete_room", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                rooms.delete_room_in_batches(self.room.pk, batch_size=2)
+
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.calendar, b"")
+        booking = create_booking(self.room.pk, date(2024, 1, 1), date(2024, 1, 14))
+        self.assertEqual(booking.room_id, self.room.pk)
+
+    def test_background_mode(self):
+        """Фоновое удаление отвечает 202 и удаляет комнату пачками"""
+        with mock.patch.object(rooms, "_spawn") as spawn:
+            resp = self.client.post(
+                "/api/rooms/delete", {"room_id": self.room.pk, "background": True}, format="json"
+            )
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(resp.json(), {"ok": True, "background": True})
+        spawn.assert_called_once_with(rooms._delete_in_background, self.room.pk, None)
+
+        # Поток запускается вне транзакции теста: выполняем его работу здесь
+        with self.settings(API_ROOM_DELETE_BATCH_SIZE=3):
+            rooms.delete_room_in_batches(self.room.pk)
+        self.assert_room_deleted()
+
+        resp = self.client.post("/api/rooms/delete", {"room_id": self.room.pk, "background": "1"})
+        self.assertEqual(resp.status_code, 404)
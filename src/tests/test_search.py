@@ -0,0 +1,132 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import include, path
+from rest_framework.test import APIClient
+
+from api import search
+from api.models import Room
+
+urlpatterns = [
+    path("api/", include("api.async_urls")),
+]
+
+
+class RoomSearchTest(TestCase):
+    """Тесты полнотекстового поиска комнат"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.sea = Room.objects.create(description="Suite with sea view", price=300)
+        self.city = Room.objects.create(description="Standard, city view", price=100)
+        # Через bulk_create, без сигналов: индекс обновляют триггеры
+        Room.objects.bulk_create(
+            [
+                Room(description="Sea view, sea breeze, sea sounds", price=200),
+                Room(description="Standard room", price=50),
+            ]
+        )
+        self.sea_only = Room.objects.get(description__startswith="Sea view")
+
+    def search(self, query):
+        resp = self.client.get(f"/api/rooms/search?{query}")
+        self.assertEqual(resp.status_code, 200)
+        return [room["room_id"] for room in resp.json()]
+
+    def test_backend(self):
+        self.assertEqual(search.backend(), "fts5")
+
+    def test_ranked_results(self):
+        # Больше совпадений "sea" - выше ранг
+        self.assertEqual(self.search("q=sea"), [self.sea_only.id, self.sea.id])
+        self.assertEqual(self.search("q=VIEW+sea"), [self.sea_only.id, self.sea.id])
+        # При равном числе совпадений выше короткое описание (bm25)
+        self.assertEqual(self.search("q=view"), [self.city.id, self.sea.id, self.sea_only.id])
+        self.assertEqual(self.search("q=mountain"), [])
+
+    def test_response_format(self):
+        resp = self.client.get("/api/rooms/search?q=suite")
+        self.assertEqual(
+            resp.json(),
+            [
+                {
+                    "room_id": self.sea.id,
+                    "description": "Suite with sea view",
+                    "price": "300.00",
+                    "created_at": resp.json()[0]["created_at"],
+                }
+            ],
+        )
+
+    def test_price_sort_and_limit(self):
+        self.assertEqual(self.search("q=view&max_price=250"), [self.city.id, self.sea_only.id])
+        self.assertEqual(self.search("q=view&min_price=150&max_price=250"), [self.sea_only.id])
+        self.assertEqual(
+            self.search("q=view&sort_by=price"), [self.city.id, self.sea_only.id, self.sea.id]
+        )
+        self.assertEqual(
+            self.search("q=view&sort_by=price&order=desc&limit=2"),
+            [self.sea.id, self.sea_only.id],
+        )
+
+    def test_query_syntax_is_escaped(self):
+        self.assertEqual(self.search('q="sea"+OR+city*'), [])
+        self.assertEqual(self.search("q=sea-view"), [self.sea_only.id, self.sea.id])
+        self.assertEqual(self.search("q=..."), [])
+
+    def test_index_follows_changes(self):
+        Room.objects.filter(pk=self.city.pk).update(description="Mountain view")
+        self.assertEqual(self.search("q=mountain"), [self.city.id])
+        self.assertEqual(self.search("q=city"), [])
+
+        resp = self.client.post("/api/rooms/delete", {"room_id": self.sea.id})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.search("q=sea"), [self.sea_only.id])
+
+    def test_cache_invalidated_on_create(self):
+        self.assertEqual(self.search("q=garden"), [])
+        resp = self.client.post("/api/rooms/create", {"description": "Garden view", "price": 80})
+        self.assertEqual(self.search("q=garden"), [resp.json()["room_id"]])
+
+    def test_invalid_params(self):
+        self.assertEqual(self.client.get("/api/rooms/search").status_code, 400)
+        self.assertEqual(self.client.get("/api/rooms/search?q=sea&limit=0").status_code, 400)
+        self.assertEqual(self.client.get("/api/rooms/search?q=sea&limit=1000").status_code, 400)
+
+    def test_index_is_used(self):
+        rooms = search.search_rooms("sea view", max_price=500).values_list("id")
+        sql, params = rooms.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn(f"{search.FTS_TABLE} VIRTUAL TABLE INDEX", plan)
+        self.assertNotIn("SCAN api_room ", plan + " ")
+
+    def test_icontains_fallback(self):
+        with mock.patch.object(search, "backend", return_value="icontains"):
+            self.assertEqual(self.search("q=sea+view"), [self.sea.id, self.sea_only.id])
+
+    def test_triggers_restored(self):
+        """Триггеры, удалённые пересозданием таблицы при миграции, восстанавливаются"""
+        with connection.cursor() as cursor:
+            for name in search._SQLITE_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER {name}")
+        room = Room.objects.create(description="Lake view", price=10)
+        self.assertFalse(search.search_rooms("lake").exists())
+
+        search.ensure_index_after_migrate(sender=None, using="default")
+        self.assertEqual(list(search.search_rooms("lake")), [room])
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncRoomSearchTest(TestCase):
+    """Поиск через асинхронное представление"""
+
+    async def test_search(self):
+        room = await Room.objects.acreate(description="Suite with sea view", price=300)
+        await Room.objects.acreate(description="City view", price=100)
+        resp = await self.async_client.get("/api/rooms/search?q=sea")
+        self.assertEqual([item["room_id"] for item in resp.json()], [room.id])
+        resp = await self.async_client.get("/api/rooms/search")
+        self.assertEqual(resp.status_code, 400)
@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from django.test import Client, TestCase, override_settings
+
+from api.models import Booking
+from benchmarks.profiles import profile_settings
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+
+
+@override_settings(**profile_settings("api"))
+class ApiProfileTest(TestCase):
+    """Тесты профиля настроек "api" (без админки, сессий и CSRF)"""
+
+    def setUp(self):
+        # Проверка CSRF как у настоящего клиента: эндпоинтам API она не нужна
+        self.client = Client(enforce_csrf_checks=True)
+
+    def test_endpoints(self):
+        resp = self.client.post(
+            "/api/rooms/create",
+            {"description": "Lean room", "price": 100},
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        room_id = resp.json()["room_id"]
+
+        resp = self.client.get("/api/rooms/list")
+        self.assertEqual([room["room_id"] for room in resp.json()], [room_id])
+        resp = self.client.post(
+            "/api/bookings/create",
+            {"room_id": room_id, "date_start": "2024-01-01", "date_end": "2024-01-02"},
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(Booking.objects.filter(room_id=room_id).exists())
+        self.assertEqual(self.client.get("/").status_code, 200)
+
+    def test_no_admin_and_frame_options(self):
+        self.assertEqual(self.client.get("/admin/").status_code, 404)
+        resp = self.client.get("/api/rooms/list")
+        self.assertNotIn("X-Frame-Options", resp)
+
+    def test_settings_module(self):
+        """Профиль загружается целиком: без админки и сессий в INSTALLED_APPS"""
+        result = subprocess.run(
+            [
+                sys.executable,
+                "manage.py",
+                "shell",
+                "-c",
+                "from django.apps import apps; from django.core.management import call_command; "
+                "call_command('check'); "
+                "print(apps.is_installed('django.contrib.admin'), "
+                "apps.is_installed('django.contrib.sessions'), apps.is_installed('api'))",
+            ],
+            cwd=SRC_DIR,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": "hotel_booking.settings_api"},
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("False False True", result.stdout)
@@ -0,0 +1,50 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from django.db import connection
+from django.test import TestCase
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+
+
+class SQLiteProfileTest(TestCase):
+    """Тесты профиля соединений SQLite"""
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas(self):
+        """PRAGMA из OPTIONS.init_command выполняются на каждом соединении"""
+        self.assertEqual(self.pragma("synchronous"), 1)  # NORMAL
+        self.assertEqual(self.pragma("cache_size"), -64 * 1024)
+        self.assertEqual(self.pragma("busy_timeout"), 20_000)
+        self.assertEqual(connection.transaction_mode, "IMMEDIATE")
+
+    def test_concurrent_writers(self):
+        """Процессы-воркеры пишут брони без ошибок блокировки и пересечений"""
+        result = subprocess.run(
+            [
+                sys.executable,
+                "manage.py",
+                "benchmark",
+                "sqlite_writers",
+                "--profile",
+                "tuned",
+                "--workers",
+                "1",
+                "--workers",
+                "4",
+                "--bookings",
+                "20",
+            ],
+            cwd=SRC_DIR,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("workers=4", result.stdout)
+        self.assertIn("locked=0 overlaps=0", result.stdout)
@@ -0,0 +1,51 @@
+from datetime import date
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from api import calendars
+from benchmarks.startup import by_package, parse_importtime
+from hotel_booking.warmup import warmup
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       150 |        150 |     _io
+import time:      2000 |       2500 |   django.utils.functional
+import time:       500 |       3000 | django
+import time:      1000 |       1000 | numpy
+"""
+
+
+class StartupTest(SimpleTestCase):
+    """Тесты ленивой загрузки и разбора -X importtime"""
+
+    def test_parse_importtime(self):
+        modules = parse_importtime(IMPORTTIME + "unrelated line\n")
+        self.assertEqual(modules[0], ("_io", 0.00015, 0.00015))
+        self.assertEqual(modules[2], ("django", 0.0005, 0.003))
+        self.assertEqual(by_package(modules)[:2], [("django", 0.0025), ("numpy", 0.001)])
+
+    def test_numpy_is_loaded_on_demand(self):
+        calendar = calendars.with_range(b"", date(2024, 1, 1), date(2024, 1, 2))
+        with mock.patch.object(calendars, "np", calendars._NOT_LOADED):
+            # Мало комнат: проверка на целых числах Python, NumPy не нужен
+            self.assertEqual(
+                calendars.free_flags([calendar, b""], date(2024, 1, 2), date(2024, 1, 3)),
+                [False, True],
+            )
+            self.assertIs(calendars.np, calendars._NOT_LOADED)
+
+
+class WarmupTest(SimpleTestCase):
+    """Прогрев приложения при запуске"""
+
+    def test_warmup(self):
+        with (
+            mock.patch("hotel_booking.warmup.gc") as gc,
+            mock.patch("hotel_booking.warmup.connections") as connections,
+        ):
+            self.assertGreater(warmup(), 0)
+        gc.freeze.assert_called_once_with()
+        # Соединения прогрева не переходят в воркеры после fork
+        connections.close_all.assert_called_once_with()
+        self.assertIsNot(calendars.np, calendars._NOT_LOADED)
@@ -0,0 +1,57 @@
+import json
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.models import Booking, Room
+
+
+@override_settings(API_STREAM_CHUNK_SIZE=2)
+class StreamingListTest(TestCase):
+    """Тесты потоковой выгрузки списков"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.room = Room.objects.create(description="Люкс с видом на море", price="150.50")
+        for i in range(4):
+            Room.objects.create(description=f"Room {i}", price=100 + i)
+        for day in (1, 10, 20):
+            Booking.objects.create(
+                room=self.room, date_start=f"2023-01-{day:02d}", date_end=f"2023-01-{day + 2:02d}"
+            )
+
+    def read(self, resp):
+        self.assertTrue(resp.streaming)
+        return b"".join(resp.streaming_content).decode()
+
+    def test_rooms_stream_matches_list(self):
+        """Потоковый JSON совпадает с обычным ответом, включая сортировку"""
+        for query in ("", "?sort_by=price&order=desc"):
+            expected = self.client.get(f"/api/rooms/list{query}").json()
+            sep = "&" if query else "?"
+            resp = self.client.get(f"/api/rooms/list{query}{sep}stream=1")
+
+            self.assertEqual(resp["Content-Type"], "application/json")
+            self.assertEqual(json.loads(self.read(resp)), expected)
+
+    def test_rooms_stream_ndjson(self):
+        """NDJSON: одна комната на строку"""
+        expected = self.client.get("/api/rooms/list").json()
+        resp = self.client.get("/api/rooms/list?stream=ndjson")
+
+        self.assertEqual(resp["Content-Type"], "application/x-ndjson")
+        lines = self.read(resp).splitlines()
+        self.assertEqual([json.loads(line) for line in lines], expected)
+
+    def test_bookings_stream_matches_list(self):
+        """Потоковая выгрузка броней комнаты"""
+        expected = self.client.get(f"/api/bookings/list?room_id={self.room.id}").json()
+        resp = self.client.get(f"/api/bookings/list?room_id={self.room.id}&stream=1")
+
+        self.assertEqual(json.loads(self.read(resp)), expected)
+
+    def test_empty_stream(self):
+        """Пустой список выгружается как пустой массив"""
+        Room.objects.all().delete()
+        resp = self.client.get("/api/rooms/list?stream=1")
+        self.assertEqual(json.loads(self.read(resp)), [])